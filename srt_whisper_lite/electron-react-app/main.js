@@ -242,6 +242,9 @@ app.on('window-all-closed', () => {
   if (pythonProcess) {
     pythonProcess.kill()
   }
+  if (backendServer) {
+    backendServer.process.kill()
+  }
   
   if (process.platform !== 'darwin') {
     app.quit()
@@ -260,6 +263,9 @@ app.on('before-quit', () => {
   if (pythonProcess) {
     pythonProcess.kill()
   }
+  if (backendServer) {
+    backendServer.process.kill()
+  }
 })
 
 // IPC 處理
@@ -368,6 +374,211 @@ ipcMain.handle('select-folder', async () => {
 // 暫停標誌
 let isPaused = false;
 let currentProcess = null;
+// 目前任務的檢查點目錄與開始時間，停止時據此判斷是否可續傳
+let currentCheckpoint = null;
+
+// 後端在 sinceMs 之後是否寫入過檢查點 (檢查點在轉錄完成後即被移除)
+function checkpointWrittenSince(directory, sinceMs) {
+  if (!directory) {
+    return false;
+  }
+  try {
+    return fs.readdirSync(directory).some(name =>
+      name.endsWith('.json') && fs.statSync(path.join(directory, name)).mtimeMs >= sinceMs);
+  } catch (e) {
+    return false;
+  }
+}
+
+// 常駐後端服務 (backend_server.py)，模型在任務之間保持載入
+let backendServer = null;
+let backendJobCounter = 0;
+
+// 解析後端輸出的單行事件並轉發到前端，返回事件類型
+// 事件行以 `KIND:{json}` 開頭 (job_id 在 JSON 內)；只比對行首，日誌或段落文字中出現的前綴不會被誤判
+function forwardBackendEvent(line) {
+  const channels = [
+    ['SEGMENT:', 'segment', 'processing-segment'],
+    ['DURATION:', 'duration', 'processing-duration'],
+    ['PROGRESS:', 'progress', 'processing-progress'],
+    ['COMPLETE:', 'complete', 'processing-complete'],
+    ['ERROR:', 'error', 'processing-error']
+  ];
+  
+  const event = line.trim();
+  for (const [prefix, type, channel] of channels) {
+    if (!event.startsWith(prefix)) continue;
+    const data = event.slice(prefix.length);
+    try {
+      const payload = JSON.parse(data);
+      console.log(`Backend ${type}:`, payload);
+      mainWindow.webContents.send(channel, payload);
+      return type;
+    } catch (e) {
+      console.log(`Failed to parse ${type}:`, data, e);
+      return null;
+    }
+  }
+  return null;
+}
+
+// 處理超時：預設 30 分鐘；已知媒體時長 (DURATION 事件) 時每個檔案保留 2 分鐘啟動餘裕
+// 加上時長的 4 倍，長音頻不會被固定超時中斷。無法探測的檔案以 30 分鐘計
+const DEFAULT_PROCESSING_TIMEOUT_MS = 30 * 60 * 1000;
+function processingTimeoutMs(durationLine) {
+  try {
+    const { files } = JSON.parse(durationLine.trim().slice('DURATION:'.length));
+    const budget = files.reduce((sum, file) => sum + 2 * 60 * 1000 +
+      (typeof file.duration === 'number' ? file.duration * 4 * 1000 : DEFAULT_PROCESSING_TIMEOUT_MS), 0);
+    return Math.max(DEFAULT_PROCESSING_TIMEOUT_MS, budget);
+  } catch (e) {
+    console.log('Failed to parse duration:', durationLine, e);
+    return DEFAULT_PROCESSING_TIMEOUT_MS;
+  }
+}
+
+// 啟動或重用常駐後端服務；backendScript 為每個任務實際執行的後端腳本，改變時重新啟動
+function getBackendServer(command, serverScript, backendScript, workingDir) {
+  if (backendServer && backendServer.command === command && backendServer.script === serverScript &&
+      backendServer.backend === backendScript) {
+    return backendServer;
+  }
+  if (backendServer) {
+    backendServer.process.kill();
+  }
+  
+  console.log('啟動常駐後端服務:', serverScript, '後端腳本:', backendScript);
+  const child = spawn(command, [serverScript, '--backend', backendScript], {
+    cwd: workingDir,
+    stdio: ['pipe', 'pipe', 'pipe'],
+    windowsHide: true,
+    shell: false
+  });
+  const server = {
+    process: child, command, script: serverScript, backend: backendScript,
+    buffer: '', lineHandler: null, onClose: null
+  };
+  
+  // 常駐進程的輸出會跨多個 data 事件，需按行緩衝
+  child.stdout.on('data', (data) => {
+    server.buffer += data.toString('utf8');
+    let newlineIndex;
+    while ((newlineIndex = server.buffer.indexOf('\n')) >= 0) {
+      const line = server.buffer.slice(0, newlineIndex).replace(/\r$/, '');
+      server.buffer = server.buffer.slice(newlineIndex + 1);
+      if (server.lineHandler) {
+        server.lineHandler(line);
+      } else if (line.trim()) {
+        console.log('Backend server:', line);
+      }
+    }
+  });
+  child.stderr.on('data', (data) => {
+    console.log('Backend server stderr:', data.toString('utf8'));
+  });
+  
+  const handleExit = (code, err) => {
+    if (backendServer === server) {
+      backendServer = null;
+    }
+    if (server.onClose) {
+      server.onClose(code, err);
+    }
+  };
+  child.on('close', (code) => {
+    console.log('常駐後端服務已結束，代碼:', code);
+    handleExit(code, null);
+  });
+  child.on('error', (err) => {
+    console.error('常駐後端服務啟動失敗:', err);
+    handleExit(null, err);
+  });
+  
+  backendServer = server;
+  return server;
+}
+
+// 透過常駐後端服務執行單一任務
+function runJobOnBackendServer(server, job) {
+  return new Promise((resolve, reject) => {
+    const jobId = `job-${++backendJobCounter}`;
+    const startTime = Date.now();
+    let hasCompleted = false;
+    currentProcess = server.process;
+    
+    const finish = () => {
+      clearTimeout(timeoutId);
+      server.lineHandler = null;
+      server.onClose = null;
+      if (currentProcess === server.process) {
+        currentProcess = null;
+      }
+    };
+    
+    // 與單次執行模式相同的超時；收到 DURATION 事件後依媒體時長重新計算
+    const onTimeout = () => {
+      console.error('Processing timeout - killing backend server');
+      mainWindow.webContents.send('processing-error', {
+        success: false,
+        message: 'Processing timeout - the operation took too long'
+      });
+      hasCompleted = true;
+      server.process.kill('SIGTERM');
+    };
+    let timeoutId = setTimeout(onTimeout, DEFAULT_PROCESSING_TIMEOUT_MS);
+    
+    server.lineHandler = (line) => {
+      if (line.startsWith('JOB_DONE:')) {
+        finish();
+        let exitCode = 0;
+        try {
+          exitCode = JSON.parse(line.slice('JOB_DONE:'.length)).exit_code;
+        } catch (e) {
+          console.log('Failed to parse job result:', line, e);
+        }
+        if (!hasCompleted) {
+          if (exitCode === 0) {
+            mainWindow.webContents.send('processing-complete', { success: true, message: '所有字幕檔案已成功生成' });
+          } else {
+            mainWindow.webContents.send('processing-error', { success: false, message: '處理過程中發生未知錯誤' });
+          }
+        }
+        if (exitCode === 0) {
+          resolve({ success: true });
+        } else {
+          reject({ success: false, error: `Backend job exited with code ${exitCode}` });
+        }
+        return;
+      }
+      
+      const eventType = forwardBackendEvent(line);
+      if (eventType === 'duration') {
+        clearTimeout(timeoutId);
+        timeoutId = setTimeout(onTimeout, Math.max(0, processingTimeoutMs(line) - (Date.now() - startTime)));
+      } else if (eventType === 'complete' || eventType === 'error') {
+        hasCompleted = true;
+      } else if (!eventType && line.trim() && !line.includes('INFO') && !line.includes('WARNING')) {
+        console.log('Unexpected backend output:', line);
+      }
+    };
+    
+    server.onClose = (code, err) => {
+      finish();
+      if (isPaused) {
+        resolve({ success: false, stopped: true, message: '處理已停止' });
+        return;
+      }
+      const message = err ? `無法啟動Python進程: ${err.message}` : `後端服務意外結束 (代碼: ${code})`;
+      if (!hasCompleted) {
+        mainWindow.webContents.send('processing-error', { success: false, message });
+      }
+      reject({ success: false, error: message });
+    };
+    
+    console.log('提交任務到常駐後端服務:', jobId);
+    server.process.stdin.write(JSON.stringify({ id: jobId, ...job }) + '\n');
+  });
+}
 
 // 停止處理
 ipcMain.handle('pause-processing', async () => {
@@ -401,7 +612,10 @@ ipcMain.handle('pause-processing', async () => {
     }
     
     console.log('停止處理完成');
-    return { success: true, message: '處理已停止' };
+    // 只有後端實際保存了本次任務的檢查點時，以相同檔案與設定重新處理才會從中斷處續傳
+    const resumable = currentCheckpoint !== null &&
+      checkpointWrittenSince(currentCheckpoint.dir, currentCheckpoint.since);
+    return { success: true, message: '處理已停止', resumable };
   } catch (error) {
     console.error('停止處理時發生錯誤:', error);
     // 即使出現錯誤，也返回成功，因為功能上已經停止
@@ -459,7 +673,13 @@ ipcMain.handle('process-files', async (event, options) => {
   
   return new Promise((resolve, reject) => {
     try {
-      const { files, settings, corrections } = options
+      const { files, corrections } = options
+      // 檢查點目錄放在使用者資料夾，讓停止或中斷後的任務可以續傳
+      const settings = {
+        checkpointDir: path.join(app.getPath('userData'), 'checkpoints'),
+        ...options.settings
+      }
+      currentCheckpoint = { dir: settings.checkpointDir, since: Date.now() }
       console.log('Processing files:', files.length)
       console.log('Settings:', settings)
 
@@ -940,6 +1160,22 @@ ipcMain.handle('process-files', async (event, options) => {
       console.log('  工作目錄:', workingDir);
       console.log('  參數:', args.map(arg => arg.length > 100 ? arg.substring(0, 100) + '...' : arg));
       
+      // 常駐後端服務：模型與選擇器決策在任務之間保持載入，避免每個任務重新冷啟動
+      const serverScript = safePath(path.dirname(pythonScript), 'backend_server.py');
+      if (settings.persistentBackend !== false && fs.existsSync(serverScript)) {
+        const server = getBackendServer(command, serverScript, pythonScript, workingDir);
+        if (!server.lineHandler) {
+          console.log('使用常駐後端服務處理任務');
+          runJobOnBackendServer(server, {
+            files: files.map(f => normalizePath(f.path)),
+            settings,
+            corrections: corrections || []
+          }).then(resolve, reject);
+          return;
+        }
+        console.log('常駐後端服務忙碌中，改用單次執行模式');
+      }
+      
       // 啟動Python進程
       currentProcess = spawn(command, args, {
         cwd: workingDir,
@@ -954,9 +1190,10 @@ ipcMain.handle('process-files', async (event, options) => {
       let error = '';
       let hasCompleted = false;
       let lastProgressTime = Date.now();
+      const startTime = Date.now();
       
-      // 設置處理超時檢查 (30分鐘)
-      const timeoutId = setTimeout(() => {
+      // 設置處理超時檢查 (預設 30 分鐘，收到 DURATION 事件後依媒體時長調整)
+      const onTimeout = () => {
         if (!hasCompleted && currentProcess) {
           console.error('Processing timeout - killing process');
           mainWindow.webContents.send('processing-error', {
@@ -967,7 +1204,8 @@ ipcMain.handle('process-files', async (event, options) => {
           currentProcess.kill('SIGTERM');
           reject({ success: false, error: 'Processing timeout' });
         }
-      }, 30 * 60 * 1000); // 30分鐘
+      };
+      let timeoutId = setTimeout(onTimeout, DEFAULT_PROCESSING_TIMEOUT_MS);
       
       // 處理stdout輸出
       subtitleProcess.stdout.on('data', (data) => {
@@ -978,38 +1216,15 @@ ipcMain.handle('process-files', async (event, options) => {
         // 解析進度信息
         const lines = dataStr.split('\n');
         lines.forEach(line => {
-          if (line.includes('PROGRESS:')) {
-            const progressData = line.replace('PROGRESS:', '').trim()
-            try {
-              const progress = JSON.parse(progressData)
-              console.log('Progress update:', progress)
-              lastProgressTime = Date.now() // 更新最後進度時間
-              mainWindow.webContents.send('processing-progress', progress)
-            } catch (e) {
-              console.log('Failed to parse progress:', progressData, e)
-            }
-          } else if (line.includes('COMPLETE:')) {
-            const completeData = line.replace('COMPLETE:', '').trim()
-            try {
-              const completion = JSON.parse(completeData)
-              console.log('Processing complete:', completion)
-              console.log('Setting hasCompleted to true')
-              mainWindow.webContents.send('processing-complete', completion)
-              hasCompleted = true
-            } catch (e) {
-              console.log('Failed to parse completion:', completeData, e)
-            }
-          } else if (line.includes('ERROR:')) {
-            const errorData = line.replace('ERROR:', '').trim()
-            try {
-              const errorInfo = JSON.parse(errorData)
-              console.log('Processing error from Python:', errorInfo)
-              mainWindow.webContents.send('processing-error', errorInfo)
-              hasCompleted = true
-            } catch (e) {
-              console.log('Failed to parse error:', errorData, e)
-            }
-          } else if (line.trim() && !line.includes('INFO') && !line.includes('WARNING')) {
+          const eventType = forwardBackendEvent(line)
+          if (eventType === 'duration') {
+            clearTimeout(timeoutId)
+            timeoutId = setTimeout(onTimeout, Math.max(0, processingTimeoutMs(line) - (Date.now() - startTime)))
+          } else if (eventType === 'progress' || eventType === 'segment') {
+            lastProgressTime = Date.now() // 更新最後進度時間
+          } else if (eventType === 'complete' || eventType === 'error') {
+            hasCompleted = true
+          } else if (!eventType && line.trim() && !line.includes('INFO') && !line.includes('WARNING')) {
             // 記錄未預期的輸出
             console.log('Unexpected Python output:', line)
           }
@@ -24,6 +24,16 @@ contextBridge.exposeInMainWorld('electronAPI', {
     ipcRenderer.on('processing-progress', (event, data) => callback(data))
   },
   
+  // 串流模式下每完成一個字幕段落觸發一次
+  onSegment: (callback) => {
+    ipcRenderer.on('processing-segment', (event, data) => callback(data))
+  },
+  
+  // 任務開始前的媒體時長 (秒)，可用於估算剩餘時間
+  onDuration: (callback) => {
+    ipcRenderer.on('processing-duration', (event, data) => callback(data))
+  },
+  
   onComplete: (callback) => {
     ipcRenderer.on('processing-complete', (event, data) => callback(data))
   },
@@ -39,6 +49,8 @@ contextBridge.exposeInMainWorld('electronAPI', {
   
   removeProgressListeners: () => {
     ipcRenderer.removeAllListeners('processing-progress')
+    ipcRenderer.removeAllListeners('processing-segment')
+    ipcRenderer.removeAllListeners('processing-duration')
     ipcRenderer.removeAllListeners('processing-complete')
     ipcRenderer.removeAllListeners('processing-error')
   },
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解碼音頻快取 - SRT GO
+Decoded-audio cache: 以內容雜湊保存 16kHz 單聲道 PCM，重新處理時跳過解碼
+
+快取以 .npy 儲存，載入時以 memory-map 開啟，不需要把整段音頻讀入記憶體。
+快取總量超過上限時，依最後使用時間淘汰 (LRU)。
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+HASH_SAMPLE_BYTES = 1024 * 1024
+
+# 解碼器行為改變時遞增，使舊快取失效
+DECODER_VERSION = 1
+
+
+def default_cache_dir(name: str) -> Path:
+    """SRT GO 快取根目錄下的子目錄 (可由 SRT_GO_CACHE_DIR 覆寫)"""
+    root = os.environ.get("SRT_GO_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "srt_go_cache")
+    return Path(root) / name
+
+
+def fast_content_hash(path: str, sample_bytes: int = HASH_SAMPLE_BYTES) -> str:
+    """快速內容雜湊：檔案大小 + 開頭/中段/結尾各 sample_bytes
+
+    多 GB 的影片只讀取 3MB，仍能區分重新編碼或剪輯過的檔案。
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(str(size).encode("ascii"), digest_size=16)
+    with open(path, "rb") as f:
+        if size <= sample_bytes * 3:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2 - sample_bytes // 2, size - sample_bytes):
+                f.seek(offset)
+                digest.update(f.read(sample_bytes))
+    return digest.hexdigest()
+
+
+class DecodedAudioCache:
+    """以 (內容雜湊, 解碼參數) 為鍵的 .npy 快取"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory else default_cache_dir("audio")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(content_hash: str, params: Dict[str, Any]) -> str:
+        encoded = json.dumps({"decoder": DECODER_VERSION, **params}, sort_keys=True)
+        return hashlib.blake2b(f"{content_hash}|{encoded}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def get(self, source: str, params: Dict[str, Any],
+            content_hash: Optional[str] = None) -> Optional[np.ndarray]:
+        """返回 memory-mapped 的快取音頻，未命中時返回 None"""
+        key = self.cache_key(content_hash or fast_content_hash(source), params)
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            audio = np.load(path, mmap_mode="r")
+        except (ValueError, OSError) as e:
+            logger.warning(f"音頻快取損壞，移除: {path} ({e})")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # 更新修改時間作為 LRU 依據
+        os.utime(path)
+        self.hits += 1
+        return audio
+
+    def put(self, source: str, params: Dict[str, Any], audio: np.ndarray,
+            content_hash: Optional[str] = None) -> Path:
+        """寫入快取 (原子取代)，並在超過容量時淘汰舊項目"""
+        key = self.cache_key(content_hash or fast_content_hash(source), params)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.directory), suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(audio), allow_pickle=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict(keep=path)
+        return path
+
+    def get_or_decode(self, source: str, decode: Callable[[str], np.ndarray],
+                      params: Dict[str, Any]) -> np.ndarray:
+        """命中時返回快取，否則解碼並寫入快取"""
+        content_hash = fast_content_hash(source)
+        cached = self.get(source, params, content_hash)
+        if cached is not None:
+            logger.info(f"使用解碼快取: {source}")
+            return cached
+
+        audio = decode(source)
+        try:
+            self.put(source, params, audio, content_hash)
+        except OSError as e:
+            # 快取寫入失敗 (例如磁碟已滿) 不影響處理
+            logger.warning(f"無法寫入解碼快取: {e}")
+        return audio
+
+    def total_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*.npy"))
+
+    def evict(self, keep: Optional[Path] = None):
+        evict_lru(self.directory, "*.npy", self.max_bytes, keep)
+
+
+def evict_lru(directory: Path, pattern: str, max_bytes: int, keep: Optional[Path] = None):
+    """依最後使用時間 (mtime) 淘汰檔案，直到總量不超過 max_bytes"""
+    entries = sorted(directory.glob(pattern), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in entries)
+    for path in entries:
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        size = path.stat().st_size
+        try:
+            path.unlink()
+            total -= size
+            logger.info(f"淘汰快取: {path.name} ({size / 1024 ** 2:.1f}MB)")
+        except OSError as e:
+            # Windows 上仍被 memory-map 的檔案無法刪除，略過
+            logger.debug(f"無法淘汰 {path}: {e}")
@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常駐後端服務 - SRT GO
+Persistent backend server: 以 JSON Lines 從 stdin 接收任務，模型常駐於記憶體
+
+每個任務仍透過後端腳本的 main() 執行 (預設 electron_backend.py，以 --backend 指定前端
+實際選擇的腳本)，輸出相同的 PROGRESS:/COMPLETE:/ERROR: 事件；差別在於 Python 啟動、
+重量級套件匯入、WhisperModel 載入與智能選擇器的決策只在服務啟動後發生一次。
+
+輸入 (每行一個 JSON):
+    {"id": "job-1", "files": [...], "settings": {...}, "corrections": [...]}
+    {"command": "ping"}
+    {"command": "shutdown"}
+
+輸出:
+    READY:{"pid": ...}                 服務就緒
+    DURATION:{"job_id": ..., "files": [...], "total_duration": ...}  任務開始前由標頭探測的媒體時長
+    PROGRESS:/SEGMENT:/COMPLETE:/ERROR:{...}  與單次執行模式相同，並附加 job_id
+    JOB_DONE:{"job_id": ..., "exit_code": ...}  任務結束標記
+"""
+
+import os
+import sys
+import io
+import json
+import copy
+import logging
+import argparse
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple
+
+from media_probe import MediaProbeCache, probe_files
+from model_pool import ModelKey, ModelPool
+from model_preloader import VAD, WHISPER, Preloader, model_key_from_decision, model_settings, start_preload
+from selector_cache import SelectorCache
+
+logger = logging.getLogger(__name__)
+
+# 會被附加 job_id 的事件前綴
+EVENT_PREFIXES = ("PROGRESS:", "SEGMENT:", "COMPLETE:", "ERROR:")
+
+# 代表任務已回報結果的事件
+TERMINAL_PREFIXES = ("COMPLETE:", "ERROR:")
+
+# 未指定 --backend 時執行的後端腳本
+DEFAULT_BACKEND = "electron_backend.py"
+
+
+def emit_event(kind: str, payload: Dict[str, Any], stream: Optional[IO[str]] = None):
+    """輸出一行 `KIND:{json}` 事件並立即 flush"""
+    stream = stream or sys.stdout
+    stream.write(f"{kind}:{json.dumps(payload, ensure_ascii=False)}\n")
+    stream.flush()
+
+
+class ResidentState:
+    """跨任務常駐的狀態：模型池、智能選擇器決策與各設定實際使用的模型鍵
+
+    指定 selector_cache 時，決策也以硬體指紋保存到磁碟，服務重新啟動後仍可重用，
+    CPU 決策並套用同一快取中的自動調校結果；模型鍵同樣保存，重新啟動後的第一個任務即可預載。
+    模型鍵未知的任務在取得選擇器決策時，依決策開始預載。
+    """
+
+    def __init__(self, model_pool: Optional[ModelPool] = None,
+                 selector_cache: Optional[SelectorCache] = None):
+        self._lock = threading.RLock()
+        self.model_pool = model_pool if model_pool is not None else ModelPool()
+        self.selector_cache = selector_cache
+        self.model_factory: Optional["ResidentModelFactory"] = None
+        self._selector_decisions: Dict[str, Any] = {}
+        self._model_keys: Dict[str, ModelKey] = {}
+        self._preload: Optional[Tuple[Optional[ModelKey], Preloader]] = None
+        self._preload_loader: Optional[Callable] = None
+        self.job_model_keys: List[ModelKey] = []
+        self.job_settings: Dict[str, Any] = {}
+        self.stats = {"selector_reuses": 0}
+
+    def get_model(self, key: Tuple, loader: Callable[[], Any]):
+        """從模型池取得常駐模型，未命中時載入"""
+        return self.model_pool.get(key, loader)
+
+    @staticmethod
+    def _model_key_preferences(settings: Dict[str, Any]) -> Dict[str, Any]:
+        return {"resident_model_key": model_settings(settings)}
+
+    def known_model_key(self, settings: Dict[str, Any]) -> Optional[ModelKey]:
+        """相同模型設定的任務上次實際建立的模型鍵；未知時返回 None"""
+        preferences = self._model_key_preferences(settings)
+        cache_key = json.dumps(preferences, sort_keys=True)
+        with self._lock:
+            if cache_key not in self._model_keys and self.selector_cache is not None:
+                stored = self.selector_cache.get(preferences)
+                if isinstance(stored, list) and len(stored) == len(ModelKey._fields):
+                    self._model_keys[cache_key] = ModelKey(*stored)
+            return self._model_keys.get(cache_key)
+
+    def remember_model_key(self, settings: Dict[str, Any], key: ModelKey):
+        preferences = self._model_key_preferences(settings)
+        with self._lock:
+            self._model_keys[json.dumps(preferences, sort_keys=True)] = key
+        if self.selector_cache is not None:
+            try:
+                self.selector_cache.put(preferences, list(key))
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"無法保存模型鍵: {e}")
+
+    def begin_job(self, preload: Optional[Tuple[Optional[ModelKey], Preloader]] = None,
+                  settings: Optional[Dict[str, Any]] = None, model_loader: Optional[Callable] = None):
+        """開始任務；preload 為 (預載的模型鍵或 None, Preloader)，model_loader 供依決策預載時使用"""
+        with self._lock:
+            self._preload = preload
+            self._preload_loader = model_loader
+            self.job_model_keys = []
+            self.job_settings = dict(settings or {})
+
+    def end_job(self) -> List[ModelKey]:
+        """結束任務並返回任務期間建立的模型鍵"""
+        with self._lock:
+            self._preload = None
+            self._preload_loader = None
+            self.job_settings = {}
+            keys, self.job_model_keys = self.job_model_keys, []
+            return keys
+
+    def preload_key(self) -> Optional[ModelKey]:
+        """目前任務預載的模型鍵"""
+        with self._lock:
+            return self._preload[0] if self._preload is not None else None
+
+    def preload_from_decision(self, decision: Any):
+        """任務尚未預載模型且後端尚未建立模型時，依選擇器決策開始預載"""
+        key = model_key_from_decision(decision)
+        with self._lock:
+            if (key is None or self._preload is None or self._preload[0] is not None
+                    or self._preload_loader is None or self.job_model_keys):
+                return
+            preloader = self._preload[1]
+            self._preload = (key, preloader)
+            loader = self._preload_loader
+        start_preload(key, preloader, model_factory=loader)
+
+    def claim_model(self, key: ModelKey) -> Any:
+        """記錄任務建立的模型鍵；與預載的鍵相同時等待並返回預載的模型，否則返回 None"""
+        with self._lock:
+            self.job_model_keys.append(key)
+            preload = self._preload
+        if preload is None or preload[0] != key:
+            return None
+        try:
+            return preload[1].get(WHISPER)
+        except Exception as e:
+            logger.warning(f"預載的模型無法使用，改為直接載入: {e}")
+            return None
+
+    def get_selector_decision(self, preferences: Optional[Dict], selector: Callable[[], Any]):
+        """取得智能選擇器決策；相同偏好設定只計算一次"""
+        cache_key = json.dumps(preferences or {}, sort_keys=True, default=str)
+        with self._lock:
+            if cache_key in self._selector_decisions:
+                self.stats["selector_reuses"] += 1
+            elif self.selector_cache is not None:
+                self._selector_decisions[cache_key] = self.selector_cache.get_or_select(preferences, selector)
+            else:
+                self._selector_decisions[cache_key] = selector()
+            decision = copy.deepcopy(self._selector_decisions[cache_key])
+        if self.selector_cache is not None:
+            # CPU 決策改用 cpu_autotuner 保存的實測設定；cpu_autotuner 會匯入 numpy，需要時才載入
+            from cpu_autotuner import apply_tuned_config
+            decision = apply_tuned_config(decision, self.selector_cache)
+        self.preload_from_decision(decision)
+        return decision
+
+
+class CheckpointingModel:
+    """常駐模型的代理：任務設定含 checkpointDir 且以檔案路徑轉錄時，段落迴圈寫入檢查點
+
+    服務被停止 (pause-processing 會終止行程) 後，以相同檔案與設定重新執行的任務
+    先取回檢查點中的段落，再從檢查點位置繼續解碼。其他屬性與呼叫直接轉給原模型。
+    """
+
+    def __init__(self, model, state: ResidentState):
+        self.model = model
+        self.state = state
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def transcribe(self, audio, *args, **kwargs):
+        settings = self.state.job_settings
+        if args or not isinstance(audio, (str, os.PathLike)) or not settings.get("checkpointDir"):
+            return self.model.transcribe(audio, *args, **kwargs)
+        from transcription_checkpoint import checkpointed_transcribe
+        return checkpointed_transcribe(self.model.transcribe, os.fspath(audio), settings, **kwargs)
+
+
+class ResidentModelFactory:
+    """取代 faster_whisper.WhisperModel 的工廠，讓後端建立模型時重用常駐實例"""
+
+    def __init__(self, model_cls, state: ResidentState):
+        self.model_cls = model_cls
+        self.state = state
+
+    def __call__(self, model_size_or_path, device: str = "auto", device_index=0,
+                 compute_type: str = "default", cpu_threads: int = 0, num_workers: int = 1,
+                 **kwargs):
+        key = ModelKey(str(model_size_or_path), compute_type, device, cpu_threads)
+        preloaded = self.state.claim_model(key)
+        if preloaded is not None:
+            return preloaded
+        return self.load(model_size_or_path, device, device_index, compute_type, cpu_threads,
+                         num_workers, **kwargs)
+
+    def load(self, model_size_or_path, device: str = "auto", device_index=0,
+             compute_type: str = "default", cpu_threads: int = 0, num_workers: int = 1,
+             **kwargs):
+        """經由模型池載入，不經過預載 (預載執行緒本身使用)"""
+        key = ModelKey(str(model_size_or_path), compute_type, device, cpu_threads)
+
+        def load():
+            return CheckpointingModel(self.model_cls(
+                model_size_or_path,
+                device=device,
+                device_index=device_index,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+                **kwargs
+            ), self.state)
+
+        return self.state.get_model(key, load)
+
+
+def install_resident_hooks(state: ResidentState):
+    """在匯入 electron_backend 之前安裝常駐掛鉤
+
+    - faster_whisper.WhisperModel → ResidentModelFactory
+    - intelligent_model_selector.get_intelligent_selector → 決策快取
+    """
+    try:
+        import faster_whisper
+        if not isinstance(faster_whisper.WhisperModel, ResidentModelFactory):
+            faster_whisper.WhisperModel = ResidentModelFactory(faster_whisper.WhisperModel, state)
+        state.model_factory = faster_whisper.WhisperModel
+    except ImportError:
+        logger.warning("faster_whisper 不可用，模型將不會常駐")
+
+    try:
+        import intelligent_model_selector
+    except ImportError:
+        logger.warning("intelligent_model_selector 不可用，選擇器決策不快取")
+        return
+
+    original_factory = intelligent_model_selector.get_intelligent_selector
+    if getattr(original_factory, "_resident", False):
+        return
+
+    def resident_selector_factory(*args, **kwargs):
+        selector = original_factory(*args, **kwargs)
+        if not getattr(selector, "_resident", False):
+            original_select = selector.select_optimal_config
+
+            def select_optimal_config(preferences=None, *select_args, **select_kwargs):
+                return state.get_selector_decision(
+                    preferences,
+                    lambda: original_select(preferences, *select_args, **select_kwargs)
+                )
+
+            selector.select_optimal_config = select_optimal_config
+            selector._resident = True
+        return selector
+
+    resident_selector_factory._resident = True
+    intelligent_model_selector.get_intelligent_selector = resident_selector_factory
+
+
+class _JobEventStream(io.TextIOBase):
+    """任務執行期間替代 sys.stdout，為事件行附加 job_id"""
+
+    def __init__(self, output: IO[str], job_id: Any,
+                 transform: Optional[Callable[[str, Dict], Dict]] = None):
+        self.output = output
+        self.job_id = job_id
+        self.transform = transform
+        self._buffer = ""
+        self.terminal_event_seen = False
+
+    def writable(self):
+        return True
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._write_line(line)
+        return len(text)
+
+    def flush(self):
+        self.output.flush()
+
+    def close_job(self):
+        if self._buffer:
+            self._write_line(self._buffer)
+            self._buffer = ""
+        self.output.flush()
+
+    def _write_line(self, line: str):
+        for prefix in EVENT_PREFIXES:
+            if line.startswith(prefix):
+                try:
+                    payload = json.loads(line[len(prefix):])
+                except ValueError:
+                    break
+                if isinstance(payload, dict):
+                    payload.setdefault("job_id", self.job_id)
+                    if self.transform:
+                        payload = self.transform(prefix[:-1], payload)
+                    line = prefix + json.dumps(payload, ensure_ascii=False)
+                if prefix in TERMINAL_PREFIXES:
+                    self.terminal_event_seen = True
+                break
+        self.output.write(line + "\n")
+        self.output.flush()
+
+
+def backend_entry_point(script: str = DEFAULT_BACKEND) -> Callable[[List[str]], Optional[int]]:
+    """返回以指定參數執行後端腳本 main() 的入口
+
+    script 為腳本路徑 (例如前端選擇的 enhanced_electron_backend.py) 或模組名稱；
+    腳本所在目錄加入 sys.path 後以檔名匯入，模組在第一個任務時才匯入並於之後重用。
+    """
+    directory, name = os.path.split(script)
+    module_name = name[:-3] if name.endswith(".py") else name
+    directory = os.path.abspath(directory) if directory else ""
+
+    def entry_point(argv: List[str]) -> Optional[int]:
+        if directory and directory not in sys.path:
+            sys.path.insert(0, directory)
+        module = importlib.import_module(module_name)
+        original_argv = sys.argv
+        sys.argv = argv
+        try:
+            return module.main()
+        finally:
+            sys.argv = original_argv
+
+    return entry_point
+
+
+class BackendServer:
+    """JSON Lines 任務迴圈
+
+    preload 為 True 時，收到任務後立即在背景載入 VAD session；若相同模型設定的任務曾經執行過
+    (模型鍵已知)，同時將該模型載入模型池，否則在後端取得智能選擇器決策時依決策開始預載。
+    electron_backend 解碼音頻的同時模型已在載入，建立相同模型時等待預載完成並直接取用。
+    需搭配 install_resident_hooks (或指定 model_factory)。
+
+    resident_hooks 為 True 時在第一個任務開始前才安裝常駐掛鉤，selector_cache_factory 也在
+    那時才建立磁碟決策快取：faster_whisper、intelligent_model_selector 與 numpy (audio_cache)
+    的匯入都不在 READY 之前發生，服務啟動保持輕量。
+
+    任務開始前只讀標頭探測各檔案時長並輸出 DURATION 事件，前端據此估算 ETA 與設定超時；
+    COMPLETE 事件附加 media_duration 與以實際時長計算的 rtf。
+    """
+
+    def __init__(self, entry_point: Callable[[List[str]], Optional[int]] = None,
+                 input_stream: Optional[IO[str]] = None,
+                 output_stream: Optional[IO[str]] = None,
+                 state: Optional[ResidentState] = None,
+                 preload: bool = False,
+                 model_factory: Optional[ResidentModelFactory] = None,
+                 probe_cache: Optional[MediaProbeCache] = None,
+                 resident_hooks: bool = False,
+                 backend: str = DEFAULT_BACKEND,
+                 selector_cache_factory: Optional[Callable[[], SelectorCache]] = None):
+        self.backend = backend
+        self.entry_point = entry_point or backend_entry_point(backend)
+        self.input_stream = input_stream or sys.stdin
+        self.output_stream = output_stream or sys.stdout
+        self.state = state or ResidentState()
+        self.preload = preload
+        self.model_factory = model_factory
+        self.probe_cache = probe_cache
+        self.resident_hooks = resident_hooks
+        self.selector_cache_factory = selector_cache_factory
+        self._prepared = False
+        self._preloader: Optional[Preloader] = None
+        self._job_media: Optional[Dict[str, Any]] = None
+        self._job_start = 0.0
+        self.jobs_completed = 0
+
+    def serve(self) -> int:
+        """處理任務直到 stdin 關閉或收到 shutdown"""
+        emit_event("READY", {"pid": os.getpid()}, self.output_stream)
+        for line in self.input_stream:
+            if not self.handle_line(line):
+                break
+        return 0
+
+    def handle_line(self, line: str) -> bool:
+        """處理一行輸入，返回 False 表示應停止服務"""
+        line = line.strip()
+        if not line:
+            return True
+
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            emit_event("ERROR", {"success": False, "message": f"無效的任務格式: {e}"}, self.output_stream)
+            return True
+
+        command = message.get("command", "process")
+        if command == "shutdown":
+            return False
+        if command == "ping":
+            emit_event("PONG", {"jobs_completed": self.jobs_completed,
+                                "model_pool": self.state.model_pool.stats(), **self.state.stats},
+                       self.output_stream)
+            return True
+
+        self.run_job(message)
+        return True
+
+    def job_argv(self, job: Dict[str, Any]) -> List[str]:
+        """將任務轉為後端腳本的命令列參數"""
+        return [
+            self.backend,
+            "--files", json.dumps(job.get("files", []), ensure_ascii=False),
+            "--settings", json.dumps(job.get("settings", {}), ensure_ascii=False),
+            "--corrections", json.dumps(job.get("corrections", []), ensure_ascii=False),
+        ]
+
+    def transform_event(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """事件輸出前的擴充點：COMPLETE 事件附加模型池計數"""
+        if kind == "COMPLETE":
+            payload["model_pool"] = self.state.model_pool.stats()
+            if self._preloader is not None:
+                stats = self._preloader.stats()
+                key = self.state.preload_key()
+                payload["preload"] = {"key": list(key) if key is not None else None, **stats.get(WHISPER, {}),
+                                      "vad": stats.get(VAD)}
+            if self._job_media and self._job_media["complete"] and self._job_media["total_duration"] > 0:
+                duration = self._job_media["total_duration"]
+                payload["media_duration"] = round(duration, 3)
+                payload["rtf"] = round((time.perf_counter() - self._job_start) / duration, 4)
+        return payload
+
+    def probe_job_media(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """只讀標頭探測任務檔案的時長；沒有檔案或全部無法探測時返回 None"""
+        files = job.get("files") or []
+        if not files:
+            return None
+        media = probe_files(files, self.probe_cache)
+        if all(f["duration"] is None for f in media["files"]):
+            return None
+        return media
+
+    def start_preload(self, settings: Dict[str, Any]):
+        """在背景預載 VAD session；模型鍵已知時同時預載模型，否則等到選擇器決策時再預載
+
+        返回 (已知的模型鍵或 None, 常駐模型工廠或 None)。
+        """
+        factory = self.model_factory or self.state.model_factory
+        key = self.state.known_model_key(settings) if factory is not None else None
+        self._preloader = start_preload(key, model_factory=factory.load if factory is not None else None,
+                                        vad=True)
+        return key, factory
+
+    def prepare_resident(self):
+        """第一個任務開始前建立決策快取並安裝常駐掛鉤 (只執行一次)"""
+        if self._prepared:
+            return
+        self._prepared = True
+        if self.selector_cache_factory is not None and self.state.selector_cache is None:
+            try:
+                self.state.selector_cache = self.selector_cache_factory()
+            except OSError as e:
+                logger.warning(f"無法建立選擇器決策快取: {e}")
+        if self.resident_hooks:
+            install_resident_hooks(self.state)
+
+    def run_job(self, job: Dict[str, Any]) -> int:
+        """執行單一任務，任務失敗不會終止服務"""
+        job_id = job.get("id")
+        self._job_start = time.perf_counter()
+        self._job_media = self.probe_job_media(job)
+        if self._job_media is not None:
+            emit_event("DURATION", {"job_id": job_id, **self._job_media}, self.output_stream)
+        settings = job.get("settings") or {}
+        self.prepare_resident()
+        if self.preload:
+            key, factory = self.start_preload(settings)
+            self.state.begin_job((key, self._preloader), settings,
+                                 model_loader=factory.load if factory is not None else None)
+        else:
+            self.state.begin_job(None, settings)
+        events = _JobEventStream(self.output_stream, job_id, self.transform_event)
+        original_stdout = sys.stdout
+        sys.stdout = events
+        exit_code = 0
+        try:
+            result = self.entry_point(self.job_argv(job))
+            exit_code = result if isinstance(result, int) else 0
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            logger.exception(f"任務 {job_id} 執行失敗")
+            exit_code = 1
+            if not events.terminal_event_seen:
+                emit_event("ERROR", {"success": False, "message": str(e)}, events)
+        finally:
+            sys.stdout = original_stdout
+            events.close_job()
+            used_keys = self.state.end_job()
+            if used_keys:
+                self.state.remember_model_key(settings, used_keys[0])
+            if self._preloader is not None:
+                self._preloader.shutdown(wait=False)
+                self._preloader = None
+            self._job_media = None
+
+        self.jobs_completed += 1
+        emit_event("JOB_DONE", {"job_id": job_id, "exit_code": exit_code}, self.output_stream)
+        return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SRT GO 常駐後端服務")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND,
+                        help="每個任務執行的後端腳本路徑或模組 (前端選擇的腳本)")
+    parser.add_argument("--no-resident-model", action="store_true", help="不安裝模型常駐掛鉤")
+    parser.add_argument("--no-preload", action="store_true", help="不在收到任務時背景預載模型")
+    parser.add_argument("--no-selector-cache", action="store_true", help="不將選擇器決策保存到磁碟")
+    parser.add_argument("--model-pool-mb", type=float, default=None,
+                        help="模型池記憶體預算 (MB)，預設為可用記憶體的一半")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # stdin/stdout 統一使用 UTF-8，避免 Windows 預設編碼造成路徑亂碼
+    for stream in (sys.stdin, sys.stdout):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8")
+
+    server = BackendServer(state=ResidentState(ModelPool(budget_mb=args.model_pool_mb)),
+                           preload=not (args.no_preload or args.no_resident_model),
+                           resident_hooks=not args.no_resident_model,
+                           backend=args.backend,
+                           selector_cache_factory=None if args.no_selector_cache else SelectorCache)
+    return server.serve()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
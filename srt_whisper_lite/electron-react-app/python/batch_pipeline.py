@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多檔案批次管線 - SRT GO
+Pipelined batch execution: 解碼/預處理、推理、字幕寫出三個階段重疊執行
+
+    prepare (工作執行緒/進程池) ──有界佇列──> infer (呼叫端執行緒) ──有界佇列──> write (背景執行緒)
+
+檔案 N 推理時，檔案 N+1 已在工作池中解碼與預處理，檔案 N-1 的字幕在背景寫出。
+推理固定在呼叫端執行緒執行，模型不需要是執行緒安全的。
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WRITER_STOP = object()
+
+
+@dataclass
+class FileResult:
+    """單一檔案的管線執行結果"""
+    index: int
+    path: str
+    success: bool = False
+    stage: str = ""
+    error: Optional[str] = None
+    output: Any = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class BatchPipeline:
+    """三階段批次管線
+
+    Args:
+        prepare: prepare(path) -> 已解碼/預處理的資料，在工作池中執行
+        infer: infer(path, prepared) -> 推理結果，在呼叫端執行緒執行
+        write: write(path, result) -> 輸出 (例如字幕檔路徑)，在背景執行緒執行
+        prepare_workers: 工作池大小
+        max_prefetch: 最多預先準備的檔案數 (限制解碼後音頻佔用的記憶體)
+        write_queue_size: 等待寫出的結果上限
+        use_processes: 以進程池執行 prepare (prepare 必須可被 pickle)
+        on_event: on_event(stage, FileResult) 進度回調
+    """
+
+    def __init__(self, prepare: Callable[[str], Any],
+                 infer: Callable[[str, Any], Any],
+                 write: Callable[[str, Any], Any],
+                 prepare_workers: int = 2,
+                 max_prefetch: int = 2,
+                 write_queue_size: int = 4,
+                 use_processes: bool = False,
+                 on_event: Optional[Callable[[str, FileResult], None]] = None):
+        self.prepare = prepare
+        self.infer = infer
+        self.write = write
+        self.prepare_workers = max(1, prepare_workers)
+        self.max_prefetch = max(1, max_prefetch)
+        self.write_queue_size = max(1, write_queue_size)
+        self.use_processes = use_processes
+        self.on_event = on_event
+        self.stats: Dict[str, float] = {}
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.prepare_workers)
+        return ThreadPoolExecutor(max_workers=self.prepare_workers, thread_name_prefix="prepare")
+
+    def _notify(self, stage: str, result: FileResult):
+        if self.on_event:
+            try:
+                self.on_event(stage, result)
+            except Exception as e:
+                logger.warning(f"管線進度回調失敗: {e}")
+
+    def run(self, files: List[str]) -> List[FileResult]:
+        """執行管線，返回與 files 順序一致的結果"""
+        results = [FileResult(index=i, path=str(path)) for i, path in enumerate(files)]
+        if not results:
+            return results
+
+        start_time = time.perf_counter()
+        write_queue: "queue.Queue" = queue.Queue(maxsize=self.write_queue_size)
+        writer = threading.Thread(target=self._writer_loop, args=(write_queue,),
+                                  name="subtitle-writer", daemon=True)
+        writer.start()
+
+        infer_time = 0.0
+        with self._create_executor() as executor:
+            pending = deque()
+            next_index = 0
+
+            def submit_next():
+                nonlocal next_index
+                if next_index < len(results):
+                    pending.append(executor.submit(_timed_call, self.prepare, results[next_index].path))
+                    next_index += 1
+
+            for _ in range(self.max_prefetch):
+                submit_next()
+
+            for result in results:
+                future = pending.popleft()
+                try:
+                    prepared, elapsed = future.result()
+                    result.timings["prepare"] = elapsed
+                except Exception as e:
+                    # 取得結果後才補充新任務，確保預取數量有上限
+                    submit_next()
+                    self._fail(result, "prepare", e)
+                    continue
+                finally:
+                    # 已完成的 future 仍持有解碼結果，需先釋放才能在推理後回收音頻
+                    del future
+                submit_next()
+                self._notify("prepared", result)
+
+                try:
+                    infer_start = time.perf_counter()
+                    output = self.infer(result.path, prepared)
+                    result.timings["infer"] = time.perf_counter() - infer_start
+                    infer_time += result.timings["infer"]
+                except Exception as e:
+                    self._fail(result, "infer", e)
+                    continue
+                finally:
+                    del prepared
+
+                self._notify("inferred", result)
+                write_queue.put((result, output))
+
+        write_queue.put(_WRITER_STOP)
+        writer.join()
+
+        wall_time = time.perf_counter() - start_time
+        serial_time = sum(sum(r.timings.values()) for r in results)
+        self.stats = {
+            "wall_time": wall_time,
+            "serial_time": serial_time,
+            "infer_time": infer_time,
+            # 推理階段佔總時間的比例，越接近 1 代表模型越少閒置
+            "infer_utilization": infer_time / wall_time if wall_time > 0 else 0.0,
+        }
+        logger.info(f"批次管線完成 {len(results)} 個檔案，耗時 {wall_time:.2f}s "
+                    f"(各階段合計 {serial_time:.2f}s)")
+        return results
+
+    def _writer_loop(self, write_queue: "queue.Queue"):
+        while True:
+            item = write_queue.get()
+            if item is _WRITER_STOP:
+                return
+            result, output = item
+            try:
+                write_start = time.perf_counter()
+                result.output = self.write(result.path, output)
+                result.timings["write"] = time.perf_counter() - write_start
+                result.success = True
+                result.stage = "written"
+                self._notify("written", result)
+            except Exception as e:
+                self._fail(result, "write", e)
+
+    def _fail(self, result: FileResult, stage: str, error: Exception):
+        logger.error(f"{stage} 階段失敗 {result.path}: {error}")
+        result.success = False
+        result.stage = stage
+        result.error = str(error)
+        self._notify("failed", result)
+
+
+def _timed_call(func: Callable[[str], Any], path: str):
+    """在工作池中執行並量測耗時 (模組層級以便進程池 pickle)"""
+    start = time.perf_counter()
+    value = func(path)
+    return value, time.perf_counter() - start
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VAD 驅動的批次轉錄 - SRT GO
+Batched transcription: 將語音區段打包成 30 秒視窗，跨檔案批次送入 faster-whisper
+
+- 每個視窗只含同一檔案的語音片段 (片段之間留短暫靜音)，靜音不再佔用解碼時間
+- 多個檔案的視窗排成一條「打包時間軸」，以 clip_timestamps 交給 BatchedInferencePipeline，
+  一次解碼 batch_size 個視窗
+- 片段表記錄每個片段在打包時間軸與原始檔案中的起點，解碼結果以 searchsorted 映射回原始時間
+- faster-whisper 沒有 BatchedInferencePipeline (< 1.1) 時逐視窗解碼，輸出相同
+"""
+
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from transcription_cache import deserialize_segments, serialize_segments
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30.0
+PIECE_GAP_SECONDS = 0.1
+DEFAULT_BATCH_SIZE = 8
+
+
+def pack_regions(regions: np.ndarray, window_seconds: float = WINDOW_SECONDS,
+                 gap_seconds: float = PIECE_GAP_SECONDS) -> List[List[Tuple[float, float]]]:
+    """將語音區段 (N, 2 秒數) 依序裝入不超過 window_seconds 的視窗
+
+    長於一個視窗的區段會被切開；返回每個視窗的片段 [(原始起點, 原始終點), ...]。
+    """
+    windows: List[List[Tuple[float, float]]] = []
+    current: List[Tuple[float, float]] = []
+    used = 0.0
+    for start, end in np.asarray(regions, dtype=np.float64).reshape(-1, 2):
+        while end - start > 1e-6:
+            needed = gap_seconds if current else 0.0
+            room = window_seconds - used - needed
+            if current and room <= 0.5:
+                windows.append(current)
+                current, used = [], 0.0
+                continue
+            take = min(end - start, room)
+            current.append((float(start), float(start + take)))
+            used += needed + take
+            start += take
+    if current:
+        windows.append(current)
+    return windows
+
+
+class PackedTimeline:
+    """多個檔案的語音視窗依序排列成的打包音頻與片段表"""
+
+    def __init__(self, gap_seconds: float = PIECE_GAP_SECONDS, sample_rate: int = SAMPLE_RATE):
+        self.gap_seconds = gap_seconds
+        self.sample_rate = sample_rate
+        self._chunks: List[np.ndarray] = []
+        self._length = 0
+        # 視窗範圍為打包音頻的樣本索引 (BatchedInferencePipeline 以 audio[start:end] 切片)
+        self.clips: List[Dict[str, int]] = []
+        # 片段表各欄：打包起點、原始起點、原始終點 (秒) 與檔案索引
+        self._packed_starts: List[float] = []
+        self._original_starts: List[float] = []
+        self._original_ends: List[float] = []
+        self._file_indices: List[int] = []
+
+    @property
+    def duration(self) -> float:
+        return self._length / self.sample_rate
+
+    def add_window(self, file_index: int, audio: np.ndarray, pieces: Sequence[Tuple[float, float]]):
+        window_start = self._length
+        gap = np.zeros(int(round(self.gap_seconds * self.sample_rate)), dtype=np.float32)
+        for i, (start, end) in enumerate(pieces):
+            if i:
+                self._append(gap)
+            self._packed_starts.append(self._length / self.sample_rate)
+            self._original_starts.append(start)
+            self._original_ends.append(end)
+            self._file_indices.append(file_index)
+            self._append(audio[int(round(start * self.sample_rate)):int(round(end * self.sample_rate))])
+        self.clips.append({"start": window_start, "end": self._length})
+
+    def _append(self, samples: np.ndarray):
+        self._chunks.append(np.asarray(samples, dtype=np.float32))
+        self._length += len(samples)
+
+    def audio(self) -> np.ndarray:
+        return np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=np.float32)
+
+    def locate(self, times, side: str = "right") -> Tuple[np.ndarray, np.ndarray]:
+        """打包時間 → (檔案索引, 原始時間)；落在片段間隙的時間夾在前一片段的終點"""
+        times = np.asarray(times, dtype=np.float64)
+        starts = np.asarray(self._packed_starts)
+        index = np.clip(np.searchsorted(starts, times, side=side) - 1, 0, len(starts) - 1)
+        original = times - starts[index] + np.asarray(self._original_starts)[index]
+        original = np.minimum(original, np.asarray(self._original_ends)[index])
+        return np.asarray(self._file_indices)[index], original
+
+    def remap(self, segments: List[Dict[str, Any]], files: int) -> List[List[Dict[str, Any]]]:
+        """將打包時間軸上的段落分配回各檔案並換算為原始時間"""
+        results: List[List[Dict[str, Any]]] = [[] for _ in range(files)]
+        if not segments or not self._packed_starts:
+            return results
+        owners, starts = self.locate([s["start"] for s in segments], side="right")
+        _, ends = self.locate([s["end"] for s in segments], side="left")
+        for segment, owner, start, end in zip(segments, owners, starts, ends):
+            record = dict(segment, start=float(start), end=float(max(end, start)))
+            words = segment.get("words")
+            if words:
+                _, word_starts = self.locate([w["start"] for w in words], side="right")
+                _, word_ends = self.locate([w["end"] for w in words], side="left")
+                record["words"] = [dict(w, start=float(ws), end=float(max(we, ws)))
+                                   for w, ws, we in zip(words, word_starts, word_ends)]
+            results[int(owner)].append(record)
+        for file_segments in results:
+            file_segments.sort(key=lambda s: s["start"])
+        return results
+
+
+class BatchedTranscriber:
+    """VAD 驅動的批次轉錄
+
+    Args:
+        model: faster-whisper WhisperModel
+        batch_size: 每次解碼的視窗數
+        region_detector: audio -> (N, 2) 語音區段秒數；None 時使用 BatchedVad + speech_regions
+        vad_options: 傳給 speech_regions 的門檻設定
+    """
+
+    def __init__(self, model: Any, batch_size: int = DEFAULT_BATCH_SIZE,
+                 window_seconds: float = WINDOW_SECONDS, gap_seconds: float = PIECE_GAP_SECONDS,
+                 region_detector: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 vad_options: Optional[Dict[str, Any]] = None):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.window_seconds = window_seconds
+        self.gap_seconds = gap_seconds
+        self.region_detector = region_detector
+        self.vad_options = vad_options or {}
+        self._pipeline = None
+        self.stats: Dict[str, float] = {}
+
+    def detect_regions(self, audio: np.ndarray) -> np.ndarray:
+        if self.region_detector is not None:
+            return np.asarray(self.region_detector(audio), dtype=np.float64).reshape(-1, 2)
+        from onnx_vad import FRAME_SECONDS, BatchedVad
+        from vad_probability_cache import speech_regions
+        return speech_regions(BatchedVad()(audio), FRAME_SECONDS, **self.vad_options)
+
+    def pack(self, audios: Sequence[np.ndarray],
+             regions: Optional[Sequence[np.ndarray]] = None) -> PackedTimeline:
+        timeline = PackedTimeline(self.gap_seconds)
+        for file_index, audio in enumerate(audios):
+            file_regions = regions[file_index] if regions is not None else self.detect_regions(audio)
+            for pieces in pack_regions(file_regions, self.window_seconds, self.gap_seconds):
+                timeline.add_window(file_index, audio, pieces)
+        return timeline
+
+    def _batched_pipeline(self):
+        if self._pipeline is None:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+            except ImportError:
+                return None
+            self._pipeline = BatchedInferencePipeline(model=self.model)
+        return self._pipeline
+
+    def decode(self, timeline: PackedTimeline, **kwargs) -> List[Dict[str, Any]]:
+        """解碼打包音頻，返回打包時間軸上的段落字典"""
+        audio = timeline.audio()
+        if not timeline.clips:
+            return []
+        pipeline = self._batched_pipeline()
+        if pipeline is not None:
+            segments, _ = pipeline.transcribe(audio, clip_timestamps=timeline.clips, vad_filter=False,
+                                              batch_size=self.batch_size, **kwargs)
+            return deserialize_segments(serialize_segments(list(segments)))
+
+        # 舊版 faster-whisper：逐視窗解碼後平移到打包時間軸
+        logger.info("faster-whisper 不支援 BatchedInferencePipeline，改為逐視窗解碼")
+        results = []
+        for clip in timeline.clips:
+            offset = clip["start"] / timeline.sample_rate
+            segments, _ = self.model.transcribe(audio[clip["start"]:clip["end"]], vad_filter=False, **kwargs)
+            for segment in deserialize_segments(serialize_segments(list(segments))):
+                segment["start"] += offset
+                segment["end"] += offset
+                for word in segment["words"]:
+                    word["start"] += offset
+                    word["end"] += offset
+                results.append(segment)
+        return results
+
+    def transcribe(self, audios: Sequence[np.ndarray], regions: Optional[Sequence[np.ndarray]] = None,
+                   **kwargs) -> List[List[Dict[str, Any]]]:
+        """轉錄多個 16kHz 音頻，返回各檔案在原始時間軸上的段落"""
+        total_seconds = sum(len(a) for a in audios) / SAMPLE_RATE
+        start_time = time.perf_counter()
+        timeline = self.pack(audios, regions)
+        packed_time = time.perf_counter()
+        segments = self.decode(timeline, **kwargs)
+        results = timeline.remap(segments, len(audios))
+        elapsed = time.perf_counter() - start_time
+
+        self.stats = {
+            "audio_seconds": total_seconds,
+            "packed_seconds": timeline.duration,
+            "windows": len(timeline.clips),
+            "pack_time": packed_time - start_time,
+            "total_time": elapsed,
+            "rtf": elapsed / total_seconds if total_seconds else 0.0,
+        }
+        logger.info(f"批次轉錄: {total_seconds:.0f}s 音頻打包為 {timeline.duration:.0f}s "
+                    f"({len(timeline.clips)} 個視窗), RTF {self.stats['rtf']:.3f}")
+        return results
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重疊分段拼接 - SRT GO
+Chunk stitcher: 合併帶重疊區的分段轉錄結果，消除切點附近重複或被截斷的詞
+
+1. 以詞級時間戳將兩段在重疊區內的詞依時間排序，雙指標 (有限前瞻) 對齊文字相同或相近的詞，
+   整個對齊為線性時間
+2. 在對齊的錨點中選一個接縫：接縫前用前段的詞、接縫後用後段的詞。選擇保留下來的重疊區詞
+   平均信心度最高的錨點 (被切點截斷的詞通常信心度較低)，相同時取最靠近重疊區中點者
+3. 依詞所屬的原始段落重建段落；接縫兩側都是被切開的段落時合併回同一個段落，
+   跨越接縫的句子不會被拆成多個字幕。沒有詞級時間戳時退回在重疊區中點切開
+4. stitch_chunks 只以前一結果尾端與重疊區相交的段落參與拼接，總成本與詞數成正比
+"""
+
+import logging
+import unicodedata
+from typing import Any, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOLERANCE = 0.5
+LOOKAHEAD = 3
+
+
+def normalize_word(text: str) -> str:
+    """去除空白與標點並轉小寫"""
+    return "".join(ch for ch in str(text).strip().lower()
+                   if not unicodedata.category(ch).startswith(("P", "Z")))
+
+
+def words_similar(a: str, b: str) -> bool:
+    """相同，或其中一個是另一個的前綴 (切點截斷的詞)"""
+    a, b = normalize_word(a), normalize_word(b)
+    if not a or not b:
+        return False
+    if a == b:
+        return True
+    shorter, longer = sorted((a, b), key=len)
+    return len(shorter) >= 3 and longer.startswith(shorter)
+
+
+def _mid(word: Dict[str, Any]) -> float:
+    return (word["start"] + word["end"]) / 2
+
+
+def align_words(left: Sequence[Dict[str, Any]], right: Sequence[Dict[str, Any]],
+                tolerance: float = DEFAULT_TOLERANCE, lookahead: int = LOOKAHEAD) -> List[Tuple[int, int]]:
+    """對齊兩串依時間排序的詞，返回錨點 (left 索引, right 索引)
+
+    每一步只檢查固定數量的前瞻詞，總比較次數與詞數成正比。
+    """
+    anchors: List[Tuple[int, int]] = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        match = None
+        for k in range(j, min(j + lookahead, len(right))):
+            if abs(_mid(left[i]) - _mid(right[k])) <= tolerance and words_similar(left[i]["word"], right[k]["word"]):
+                match = k
+                break
+        if match is not None:
+            anchors.append((i, match))
+            i, j = i + 1, match + 1
+        elif _mid(left[i]) < _mid(right[j]):
+            i += 1
+        else:
+            j += 1
+    return anchors
+
+
+def _flatten(segments: Sequence[Dict[str, Any]], source: int) -> List[Dict[str, Any]]:
+    words = []
+    for index, segment in enumerate(segments):
+        for word in segment.get("words") or []:
+            words.append(dict(word, _owner=(source, index)))
+    return words
+
+
+def _confidence(words: Sequence[Dict[str, Any]]) -> float:
+    if not words:
+        return 0.0
+    return sum(float(w.get("probability") or 0.0) for w in words) / len(words)
+
+
+def _rebuild(words: Sequence[Dict[str, Any]],
+             owners: Dict[Tuple[int, int], Dict[str, Any]]) -> List[Tuple[Dict[str, Any], bool]]:
+    """依詞所屬的原始段落重組段落，返回 (段落, 是否保留原段落全部的詞)"""
+    segments: List[Tuple[Dict[str, Any], bool]] = []
+    group: List[Dict[str, Any]] = []
+
+    def emit():
+        if not group:
+            return
+        source = owners[group[0]["_owner"]]
+        clean = [{k: v for k, v in w.items() if k != "_owner"} for w in group]
+        complete = len(clean) == len(source.get("words") or [])
+        segments.append((dict(source, start=clean[0]["start"], end=clean[-1]["end"], words=clean,
+                              text=source["text"] if complete else "".join(w["word"] for w in clean).strip()),
+                         complete))
+
+    for word in words:
+        if group and word["_owner"] != group[-1]["_owner"]:
+            emit()
+            group = []
+        group.append(word)
+    emit()
+    return segments
+
+
+def _join_at_seam(before: List[Tuple[Dict[str, Any], bool]],
+                  after: List[Tuple[Dict[str, Any], bool]]) -> List[Dict[str, Any]]:
+    """接縫兩側都是被切開的段落時合併成一個段落"""
+    if before and after and not before[-1][1] and not after[0][1]:
+        left, right = before[-1][0], after[0][0]
+        words = left["words"] + right["words"]
+        joined = dict(left, end=right["end"], words=words, text="".join(w["word"] for w in words).strip())
+        before, after = before[:-1] + [(joined, False)], after[1:]
+    return [segment for segment, _ in before + after]
+
+
+def _stitch_by_midpoint(left: Sequence[Dict[str, Any]], right: Sequence[Dict[str, Any]],
+                        center: float) -> List[Dict[str, Any]]:
+    return ([s for s in left if (s["start"] + s["end"]) / 2 < center]
+            + [s for s in right if (s["start"] + s["end"]) / 2 >= center])
+
+
+def stitch_pair(left: Sequence[Dict[str, Any]], right: Sequence[Dict[str, Any]],
+                overlap_start: float, overlap_end: float,
+                tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """拼接前後兩段的段落；重疊區為 [overlap_start, overlap_end]"""
+    center = (overlap_start + overlap_end) / 2
+    if any(not s.get("words") for s in list(left) + list(right)):
+        return _stitch_by_midpoint(left, right, center)
+
+    owners = {(0, i): s for i, s in enumerate(left)}
+    owners.update({(1, i): s for i, s in enumerate(right)})
+    left_words = _flatten(left, 0)
+    right_words = _flatten(right, 1)
+
+    head = [w for w in left_words if _mid(w) < overlap_start]
+    left_overlap = [w for w in left_words if _mid(w) >= overlap_start]
+    right_overlap = [w for w in right_words if _mid(w) <= overlap_end]
+    tail = [w for w in right_words if _mid(w) > overlap_end]
+
+    anchors = align_words(left_overlap, right_overlap, tolerance)
+    if anchors:
+        a, b = _choose_seam(left_overlap, right_overlap, anchors, center)
+        before = head + left_overlap[:a + 1]
+        after = right_overlap[b + 1:] + tail
+    else:
+        before = head + [w for w in left_overlap if _mid(w) < center]
+        after = [w for w in right_overlap if _mid(w) >= center] + tail
+    return _join_at_seam(_rebuild(before, owners), _rebuild(after, owners))
+
+
+def _choose_seam(left: Sequence[Dict[str, Any]], right: Sequence[Dict[str, Any]],
+                 anchors: Sequence[Tuple[int, int]], center: float) -> Tuple[int, int]:
+    """選擇保留的重疊區詞平均信心度最高的錨點；相同時取最靠近中點者"""
+    def prefix(words):
+        sums = [0.0]
+        for word in words:
+            sums.append(sums[-1] + float(word.get("probability") or 0.0))
+        return sums
+
+    left_sums, right_sums = prefix(left), prefix(right)
+
+    def key(anchor):
+        a, b = anchor
+        kept = (a + 1) + (len(right) - b - 1)
+        score = (left_sums[a + 1] + right_sums[-1] - right_sums[b + 1]) / kept
+        return round(score, 6), -abs(_mid(left[a]) - center)
+
+    return max(anchors, key=key)
+
+
+def stitch_chunks(chunks: Sequence[Tuple[List[Dict[str, Any]], float, float]],
+                  tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """依序拼接 (段落, 分段起點, 分段終點) 列表；相鄰分段的重疊區為 [後段起點, 前段終點]"""
+    if not chunks:
+        return []
+    stitched, _, previous_end = chunks[0]
+    stitched = list(stitched)
+    for segments, start, end in chunks[1:]:
+        if start < previous_end:
+            # 在重疊區之前結束的段落不受拼接影響，只取尾端參與
+            cut = len(stitched)
+            while cut > 0 and stitched[cut - 1]["end"] >= start:
+                cut -= 1
+            recent = stitched[cut:]
+            del stitched[cut:]
+            stitched.extend(stitch_pair(recent, segments, start, previous_end, tolerance))
+        else:
+            stitched.extend(segments)
+        previous_end = end
+    return stitched
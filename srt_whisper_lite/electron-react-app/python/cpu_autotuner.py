@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CPU 參數自動調校 - SRT GO
+CPU autotuner: 在本機實測 compute_type × cpu_threads × num_workers 組合，選出最快且準確度足夠的設定
+
+1. 以固定種子產生的合成音頻 (或 SRT_GO_AUTOTUNE_CLIP 指定的檔案) 做確定性解碼
+   (beam_size=1、temperature=0、固定語言)
+2. 以 float32 / 最多執行緒的結果作為參考：encoder 輸出的相對誤差超過 encoder_tolerance，
+   或文字相似度低於 1 - tolerance 的組合不列入選擇。合成音頻沒有真正的語音，Whisper
+   常輸出空白或幻覺文字，文字比較可能形同虛設；encoder 輸出不依賴語音內容，量化誤差一定可見
+3. num_workers > 1 時同時送出 num_workers 個解碼，RTF 以總音頻長度計算 (吞吐量)
+4. 結果以硬體指紋存入 SelectorCache；apply_tuned_config 讓選擇器的 CPU 設定改用實測值
+"""
+
+import os
+import sys
+import time
+import difflib
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from model_pool import ModelKey
+from parallel_transcriber import SAMPLE_RATE, load_whisper_model
+from selector_cache import SelectorCache
+
+logger = logging.getLogger(__name__)
+
+COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+REFERENCE_COMPUTE_TYPE = "float32"
+DEFAULT_TOLERANCE = 0.05
+# encoder 輸出與 float32 參考的相對 L2 誤差上限
+DEFAULT_ENCODER_TOLERANCE = 0.1
+CLIP_SECONDS = 8.0
+CLIP_SEED = 20240601
+DECODE_OPTIONS = {"beam_size": 1, "temperature": 0.0, "language": "en", "vad_filter": False,
+                  "condition_on_previous_text": False}
+
+
+class TuneConfig(NamedTuple):
+    """一組待測的 CPU 解碼參數"""
+    compute_type: str
+    cpu_threads: int
+    num_workers: int
+
+
+def synthetic_clip(seconds: float = CLIP_SECONDS, sample_rate: int = SAMPLE_RATE,
+                   seed: int = CLIP_SEED) -> np.ndarray:
+    """固定種子的類語音合成音頻：帶共振峰的諧波音節與短暫停頓"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    audio = np.zeros_like(t)
+    position = 0.2
+    while position < seconds - 0.3:
+        length = rng.uniform(0.15, 0.35)
+        mask = (t >= position) & (t < position + length)
+        local = t[mask] - position
+        f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * 3 * local))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        formants = rng.uniform([300, 900, 2200], [800, 1800, 3000])
+        voiced = sum(np.sin(k * phase) / k * np.exp(-((k * f0 - formants[:, None]) ** 2).min(axis=0) / 2e5)
+                     for k in range(1, 16))
+        audio[mask] = voiced * np.sin(np.pi * local / length)
+        position += length + rng.uniform(0.03, 0.25)
+    audio += rng.normal(0, 0.003, len(audio))
+    return (0.5 * audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+def tuning_clip() -> np.ndarray:
+    """SRT_GO_AUTOTUNE_CLIP 指定的音頻 (建議實際語音)，否則為合成音頻"""
+    path = os.environ.get("SRT_GO_AUTOTUNE_CLIP")
+    if path and os.path.exists(path):
+        from streaming_decoder import decode_to_array
+        return decode_to_array(path)
+    return synthetic_clip()
+
+
+def physical_cores() -> int:
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    except ImportError:
+        return os.cpu_count() or 1
+
+
+def candidate_grid(logical: Optional[int] = None, physical: Optional[int] = None,
+                   compute_types: Sequence[str] = COMPUTE_TYPES) -> List[TuneConfig]:
+    """compute_type × cpu_threads × num_workers
+
+    單一副本測試半數實體核心、全部實體核心與全部邏輯核心；多副本時實體核心平均分配。
+    """
+    logical = logical or os.cpu_count() or 1
+    physical = physical or physical_cores()
+    grid = []
+    for compute_type in compute_types:
+        for threads in sorted({max(1, physical // 2), physical, logical}):
+            grid.append(TuneConfig(compute_type, threads, 1))
+        for workers in (2, 4):
+            if physical // workers >= 1:
+                grid.append(TuneConfig(compute_type, physical // workers, workers))
+    return grid
+
+
+def text_similarity(reference: str, candidate: str) -> float:
+    if not reference and not candidate:
+        return 1.0
+    return difflib.SequenceMatcher(None, reference, candidate, autojunk=False).ratio()
+
+
+def encoder_output(model: Any, audio: np.ndarray) -> Optional[np.ndarray]:
+    """模型對音頻第一個 30 秒視窗的 encoder 輸出；模型沒有 feature_extractor/encode 時返回 None"""
+    extractor = getattr(model, "feature_extractor", None)
+    if extractor is None or not hasattr(model, "encode"):
+        return None
+    frames = extractor.nb_max_frames
+    features = np.asarray(extractor(audio))[..., :frames]
+    if features.shape[-1] < frames:
+        features = np.pad(features, [(0, 0)] * (features.ndim - 1) + [(0, frames - features.shape[-1])])
+    # ctranslate2.StorageView 在 CPU 上支援 array interface
+    return np.asarray(model.encode(features), dtype=np.float32)
+
+
+def encoder_error(reference: Optional[np.ndarray], candidate: Optional[np.ndarray]) -> Optional[float]:
+    """encoder 輸出的相對 L2 誤差；任一方不可用時返回 None"""
+    if reference is None or candidate is None or reference.shape != candidate.shape:
+        return None
+    scale = float(np.linalg.norm(reference))
+    return float(np.linalg.norm(candidate - reference)) / scale if scale else 0.0
+
+
+def _decode_text(model: Any, audio: np.ndarray, options: Dict[str, Any]) -> str:
+    segments, _ = model.transcribe(audio, **options)
+    return " ".join(segment.text.strip() for segment in segments)
+
+
+def benchmark_config(model: Any, config: TuneConfig, audio: np.ndarray, repeats: int = 1,
+                     options: Optional[Dict[str, Any]] = None,
+                     timer: Callable[[], float] = time.perf_counter) -> Dict[str, Any]:
+    """量測單一設定的 RTF；先解碼一次暖機 (同時取得文字與 encoder 輸出)，再取 repeats 次中最快的一次"""
+    options = dict(DECODE_OPTIONS, **(options or {}))
+    duration = len(audio) / SAMPLE_RATE
+    text = _decode_text(model, audio, options)
+    encoder = encoder_output(model, audio)
+    best = float("inf")
+    with ThreadPoolExecutor(max_workers=config.num_workers) as executor:
+        for _ in range(max(1, repeats)):
+            start = timer()
+            list(executor.map(lambda _: _decode_text(model, audio, options), range(config.num_workers)))
+            best = min(best, timer() - start)
+    return {**config._asdict(), "text": text, "encoder": encoder, "time": best,
+            "rtf": best / (duration * config.num_workers) if duration else 0.0}
+
+
+def autotune(model_size: str, loader: Callable = load_whisper_model,
+             grid: Optional[Sequence[TuneConfig]] = None, audio: Optional[np.ndarray] = None,
+             tolerance: float = DEFAULT_TOLERANCE, repeats: int = 1,
+             options: Optional[Dict[str, Any]] = None,
+             timer: Callable[[], float] = time.perf_counter,
+             encoder_tolerance: float = DEFAULT_ENCODER_TOLERANCE) -> Dict[str, Any]:
+    """實測所有組合，返回最快且與參考一致的設定
+
+    一致的條件：文字相似度 ≥ 1 - tolerance，且 encoder 輸出相對誤差 ≤ encoder_tolerance
+    (模型不提供 encoder 輸出時只比較文字)。
+    """
+    audio = tuning_clip() if audio is None else np.asarray(audio, dtype=np.float32)
+    grid = list(grid) if grid is not None else candidate_grid()
+    # 參考設定 (float32、最多執行緒) 排在最前面，其文字作為準確度基準
+    grid.sort(key=lambda c: (c.compute_type != REFERENCE_COMPUTE_TYPE, -c.cpu_threads, c.num_workers))
+
+    results = []
+    models: Dict[Any, Any] = {}
+    for config in grid:
+        key = ModelKey(model_size, config.compute_type, "cpu", config.cpu_threads)
+        model_key = (key, config.num_workers)
+        if model_key not in models:
+            models.clear()
+            models[model_key] = loader(key, config.num_workers)
+        result = benchmark_config(models[model_key], config, audio, repeats, options, timer)
+        results.append(result)
+        logger.info(f"自動調校 {config}: RTF {result['rtf']:.3f}")
+    models.clear()
+
+    reference = results[0]["text"] if results else ""
+    reference_encoder = results[0]["encoder"] if results else None
+    for result in results:
+        result["similarity"] = text_similarity(reference, result["text"])
+        result["encoder_error"] = encoder_error(reference_encoder, result["encoder"])
+        result["accepted"] = (result["similarity"] >= 1.0 - tolerance
+                              and (result["encoder_error"] is None or result["encoder_error"] <= encoder_tolerance))
+    accepted = [r for r in results if r["accepted"]]
+    best = min(accepted, key=lambda r: r["rtf"]) if accepted else None
+    return {
+        "model_size": model_size,
+        "tolerance": tolerance,
+        "encoder_tolerance": encoder_tolerance,
+        "clip_seconds": len(audio) / SAMPLE_RATE,
+        "best": {k: best[k] for k in TuneConfig._fields} if best else None,
+        "best_rtf": best["rtf"] if best else None,
+        "results": [{k: v for k, v in r.items() if k not in ("text", "encoder")} for r in results],
+        "tuned_at": time.time(),
+    }
+
+
+def _preferences(model_size: Optional[str]) -> Dict[str, Any]:
+    return {"cpu_autotune": model_size or "default"}
+
+
+def store_tuning(result: Dict[str, Any], cache: Optional[SelectorCache] = None) -> SelectorCache:
+    """以目前硬體指紋保存調校結果 (同時作為未指定模型時的預設值)"""
+    cache = cache or SelectorCache()
+    cache.put(_preferences(result["model_size"]), result)
+    cache.put(_preferences(None), result)
+    return cache
+
+
+def tuned_config(model_size: Optional[str] = None,
+                 cache: Optional[SelectorCache] = None) -> Optional[Dict[str, Any]]:
+    """返回保存的最佳設定 {compute_type, cpu_threads, num_workers}；未調校時返回 None"""
+    cache = cache or SelectorCache()
+    result = cache.get(_preferences(model_size)) if model_size else None
+    result = result or cache.get(_preferences(None))
+    return result.get("best") if isinstance(result, dict) else None
+
+
+def apply_tuned_config(decision: Any, cache: Optional[SelectorCache] = None) -> Any:
+    """選擇器決策為 CPU 時以實測設定覆寫 compute_type、cpu_threads 與 num_workers
+
+    decision 可以是設定字典或 select_optimal_config 返回的 (設定, 說明)。
+    """
+    config = decision[0] if isinstance(decision, tuple) else decision
+    if not isinstance(config, dict) or config.get("device", "cpu") != "cpu":
+        return decision
+    best = tuned_config(config.get("model_size"), cache)
+    if not best:
+        return decision
+    config = dict(config, **best, tuned=True)
+    return (config,) + tuple(decision[1:]) if isinstance(decision, tuple) else config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU 解碼參數自動調校")
+    parser.add_argument("--model", default="small", help="Whisper 模型大小")
+    parser.add_argument("--compute-types", nargs="+", default=list(COMPUTE_TYPES))
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允許的文字相似度落差")
+    parser.add_argument("--encoder-tolerance", type=float, default=DEFAULT_ENCODER_TOLERANCE,
+                        help="允許的 encoder 輸出相對誤差")
+    parser.add_argument("--repeats", type=int, default=1, help="每個組合的量測次數")
+    parser.add_argument("--no-store", action="store_true", help="不保存結果")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    result = autotune(args.model, grid=candidate_grid(compute_types=args.compute_types),
+                      tolerance=args.tolerance, repeats=args.repeats,
+                      encoder_tolerance=args.encoder_tolerance)
+    for row in sorted(result["results"], key=lambda r: r["rtf"]):
+        mark = "*" if row["accepted"] else " "
+        print(f"{mark} {row['compute_type']:<13} threads={row['cpu_threads']:<3} workers={row['num_workers']} "
+              f"RTF {row['rtf']:.3f}  相似度 {row['similarity']:.3f}  encoder 誤差 {row['encoder_error']}")
+    print(f"最佳設定: {result['best']}")
+    if not args.no_store and result["best"]:
+        store_tuning(result)
+    return 0 if result["best"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
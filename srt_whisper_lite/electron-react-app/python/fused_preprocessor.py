@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+融合式音頻預處理 - SRT GO
+Fused preprocessing: 正規化、動態範圍壓縮、語音頻段增強與降噪在單一緩衝區內完成
+
+- 時域步驟 (正規化、壓縮) 以固定大小區塊原地處理
+- 頻域步驟 (語音頻段增強、降噪) 合併為一次 STFT/重疊相加，每幀只做一次 FFT
+
+與 AudioProcessor 逐步串接的做法相比，整個流程只有一份 float32 完整長度的陣列。
+"""
+
+import logging
+from typing import Callable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TIME_BLOCK = 65536
+
+
+def sqrt_hann(frame_size: int) -> np.ndarray:
+    """週期性 Hann 視窗的平方根；分析與合成各用一次，50% 重疊時完美重建"""
+    n = np.arange(frame_size)
+    return np.sqrt(0.5 - 0.5 * np.cos(2 * np.pi * n / frame_size)).astype(np.float32)
+
+
+class StreamingSTFT:
+    """STFT/重疊相加引擎，支援原地處理與串流處理
+
+    每批次先將輸入幀複製出來做 FFT，再輸出已完成重疊相加的樣本。
+    原地模式下寫回位置總在讀取位置之前，因此可以直接覆寫輸入陣列；
+    串流模式 (push/flush) 只保留 frame_size - hop 個樣本的狀態，記憶體用量固定。
+    兩種模式的輸出都與輸入對齊。
+
+    Args:
+        frame_size: FFT 長度
+        gain_stages: 依序套用的頻域處理 stage(spectra, power) -> 增益 (frames, bins)
+        frames_per_batch: 每批次處理的幀數
+    """
+
+    def __init__(self, frame_size: int = 512, gain_stages: Optional[List[Callable]] = None,
+                 frames_per_batch: int = 256):
+        self.frame_size = frame_size
+        self.hop = frame_size // 2
+        self.delay = frame_size - self.hop
+        self.gain_stages = gain_stages or []
+        self.frames_per_batch = frames_per_batch
+        self.window = sqrt_hann(frame_size)
+        self.reset()
+
+    def reset(self):
+        self._carry = np.zeros(self.delay, dtype=np.float32)      # 上一批次尾端的輸入
+        self._pending = np.zeros(self.delay, dtype=np.float32)    # 尚未完成重疊相加的輸出
+        self._remainder = np.zeros(0, dtype=np.float32)           # 不足一個 hop 的輸入
+        self._to_skip = self.delay                                # 串流開頭的內部延遲
+        self._received = 0
+        self._emitted = 0
+
+    def _transform(self, block: np.ndarray) -> np.ndarray:
+        """處理 hop 整數倍長度的輸入，返回等長、延遲 delay 個樣本的輸出"""
+        hop, size, delay = self.hop, self.frame_size, self.delay
+        staging = np.concatenate((self._carry, block))
+        frames = np.lib.stride_tricks.sliding_window_view(staging, size)[::hop]
+        spectra = np.fft.rfft(frames * self.window, axis=1)
+        power = spectra.real ** 2 + spectra.imag ** 2
+        for stage in self.gain_stages:
+            spectra *= stage(spectra, power)
+
+        synthesized = np.fft.irfft(spectra, n=size, axis=1).astype(np.float32)
+        synthesized *= self.window
+
+        ola = np.zeros(len(staging), dtype=np.float32)
+        # 50% 重疊：偶數幀與奇數幀各自不重疊，可直接攤平相加
+        for parity in (0, 1):
+            rows = synthesized[parity::2]
+            start = parity * hop
+            ola[start:start + rows.size] += rows.reshape(-1)
+        ola[:delay] += self._pending
+
+        self._pending = ola[len(block):len(block) + delay].copy()
+        self._carry = staging[-delay:].copy()
+        return ola[:len(block)]
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """原地處理 float32 陣列並返回同一個陣列"""
+        n = len(audio)
+        if n == 0 or not self.gain_stages:
+            return audio
+
+        self.reset()
+        delay = self.delay
+        block_len = self.hop * self.frames_per_batch
+        position = 0
+        # 讀取到輸入結尾後再多處理 delay 個零，讓最後的樣本完成重疊相加
+        total = n + delay
+
+        while position < total:
+            take = min(block_len, total - position)
+            take = -(-take // self.hop) * self.hop
+            block = np.zeros(take, dtype=np.float32)
+            available = max(0, min(take, n - position))
+            block[:available] = audio[position:position + available]
+            ola = self._transform(block)
+
+            # ola 對應輸入位置 position - delay 起
+            out_start = position - delay
+            write_from = max(0, -out_start)
+            write_to = min(take, n - out_start)
+            if write_to > write_from:
+                audio[out_start + write_from:out_start + write_to] = ola[write_from:write_to]
+            position += take
+
+        self.reset()
+        return audio
+
+    def push(self, block: np.ndarray) -> np.ndarray:
+        """串流輸入一個區塊，返回目前已完成的輸出樣本"""
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        self._received += len(block)
+        data = np.concatenate((self._remainder, block)) if len(self._remainder) else block
+        usable = len(data) // self.hop * self.hop
+        self._remainder = data[usable:].copy()
+        if usable == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self._emit(self._transform(data[:usable]))
+
+    def flush(self) -> np.ndarray:
+        """以零補足並輸出剩餘樣本，之後可處理下一段音頻"""
+        missing = self._received - self._emitted
+        padded = len(self._remainder) + self.delay
+        padded = -(-padded // self.hop) * self.hop
+        block = np.zeros(padded, dtype=np.float32)
+        block[:len(self._remainder)] = self._remainder
+        output = self._emit(self._transform(block))[:missing]
+        self.reset()
+        return output
+
+    def _emit(self, output: np.ndarray) -> np.ndarray:
+        if self._to_skip:
+            skipped = min(self._to_skip, len(output))
+            output = output[skipped:]
+            self._to_skip -= skipped
+        output = output[:self._received - self._emitted]
+        self._emitted += len(output)
+        return output
+
+
+class SpeechBandGain:
+    """語音頻段 (預設 300-3000 Hz) 增益，邊緣以半餘弦平滑過渡"""
+
+    def __init__(self, sample_rate: int, frame_size: int, gain_db: float = 3.0,
+                 low_hz: float = 300.0, high_hz: float = 3000.0, transition_hz: float = 100.0):
+        freqs = np.fft.rfftfreq(frame_size, 1.0 / sample_rate)
+        rise = np.clip((freqs - (low_hz - transition_hz)) / transition_hz, 0, 1)
+        fall = np.clip(((high_hz + transition_hz) - freqs) / transition_hz, 0, 1)
+        shape = (0.5 - 0.5 * np.cos(np.pi * np.minimum(rise, fall))).astype(np.float32)
+        self.gain = 1.0 + (10 ** (gain_db / 20.0) - 1.0) * shape
+
+    def __call__(self, spectra: np.ndarray, power: np.ndarray) -> np.ndarray:
+        return self.gain
+
+
+class SpectralSubtraction:
+    """功率譜相減降噪
+
+    噪音底噪以頻率方向分組中位數估計 (窄頻的語音諧波與音調不會被當成噪音)，
+    再沿時間方向以最小值追蹤平滑，整個過程只需要目前批次的頻譜。
+
+    Args:
+        strength: 0~1，越大減去越多噪音
+        floor: 最小增益，避免音樂噪音
+        median_bins: 每組頻率 bin 數
+        rise: 噪音估計每幀允許上升的比例
+    """
+
+    # 指數分佈的中位數為平均值的 ln 2 倍
+    MEDIAN_TO_MEAN = 1.0 / np.log(2.0)
+
+    def __init__(self, strength: float = 0.5, floor: float = 0.1, median_bins: int = 15,
+                 rise: float = 1.02):
+        self.over_subtraction = 1.0 + max(0.0, float(strength))
+        self.floor_sq = floor ** 2
+        self.median_bins = median_bins
+        self.rise = rise
+        self.noise: Optional[np.ndarray] = None
+
+    def noise_floor(self, power: np.ndarray) -> np.ndarray:
+        """每幀在頻率方向分組取中位數的底噪 (frames, groups)"""
+        frames, bins = power.shape
+        groups = -(-bins // self.median_bins)
+        padded = np.pad(power, ((0, 0), (0, groups * self.median_bins - bins)), mode="edge")
+        return np.median(padded.reshape(frames, groups, self.median_bins), axis=2) * self.MEDIAN_TO_MEAN
+
+    def __call__(self, spectra: np.ndarray, power: np.ndarray) -> np.ndarray:
+        floors = self.noise_floor(power)
+        noise = floors[0] if self.noise is None else self.noise
+        estimates = np.empty_like(floors)
+        for i, floor in enumerate(floors):
+            noise = np.maximum(np.minimum(noise * self.rise, floor), floor * 0.5)
+            estimates[i] = noise
+        self.noise = noise
+
+        expanded = np.repeat(estimates, self.median_bins, axis=1)[:, :power.shape[1]]
+        ratio = expanded / np.maximum(power, 1e-12)
+        return np.sqrt(np.maximum(1.0 - self.over_subtraction * ratio, self.floor_sq)).astype(np.float32)
+
+
+class FusedPreprocessor:
+    """單一緩衝區的預處理引擎"""
+
+    def __init__(self, sample_rate: int = 16000,
+                 enable_normalize: bool = True,
+                 enable_compression: bool = True,
+                 enable_enhancement: bool = True,
+                 enable_denoise: bool = True,
+                 noise_reduce_strength: float = 0.5,
+                 target_peak: float = 0.95,
+                 compression_threshold: float = 0.5,
+                 compression_ratio: float = 4.0,
+                 speech_gain_db: float = 3.0,
+                 frame_size: int = 512):
+        self.sample_rate = sample_rate
+        self.enable_normalize = enable_normalize
+        self.enable_compression = enable_compression
+        self.enable_enhancement = enable_enhancement
+        self.enable_denoise = enable_denoise
+        self.noise_reduce_strength = noise_reduce_strength
+        self.target_peak = target_peak
+        self.compression_threshold = compression_threshold
+        self.compression_ratio = compression_ratio
+        self.speech_gain_db = speech_gain_db
+        self.frame_size = frame_size
+
+    def spectral_stages(self, sample_rate: int) -> List[Callable]:
+        """依設定建立頻域處理階段 (子類別可替換降噪器)"""
+        stages: List[Callable] = []
+        if self.enable_enhancement:
+            stages.append(SpeechBandGain(sample_rate, self.frame_size, self.speech_gain_db))
+        if self.enable_denoise:
+            stages.append(SpectralSubtraction(self.noise_reduce_strength))
+        return stages
+
+    def process(self, audio: np.ndarray, sample_rate: Optional[int] = None,
+                inplace: bool = False) -> np.ndarray:
+        """執行完整預處理
+
+        inplace=True 且輸入為可寫入的 float32 陣列時，直接覆寫輸入，不配置新陣列。
+        """
+        sample_rate = sample_rate or self.sample_rate
+        audio = np.asarray(audio)
+        if inplace and audio.dtype == np.float32 and audio.flags.writeable and audio.ndim == 1:
+            buffer = audio
+        else:
+            buffer = np.array(audio, dtype=np.float32).reshape(-1)
+
+        if buffer.size == 0:
+            return buffer
+
+        self.process_block(buffer, sample_rate, self.normalize_gain(buffer))
+        self.limit(buffer)
+        return buffer
+
+    def normalize_gain(self, buffer: np.ndarray) -> float:
+        """正規化所需的整體增益 (依全段峰值)"""
+        if not self.enable_normalize:
+            return 1.0
+        peak = self._peak(buffer)
+        return self.target_peak / peak if peak > 0 else 1.0
+
+    def process_block(self, buffer: np.ndarray, sample_rate: int, gain: float = 1.0) -> np.ndarray:
+        """套用增益、壓縮與頻域處理；不依賴全段統計，可用於分塊平行處理"""
+        if gain != 1.0:
+            buffer *= np.float32(gain)
+        if self.enable_compression:
+            self._compress(buffer)
+
+        stages = self.spectral_stages(sample_rate)
+        if stages:
+            StreamingSTFT(self.frame_size, stages).process(buffer)
+        return buffer
+
+    def limit(self, buffer: np.ndarray):
+        """頻域增益可能推高峰值，最後限制在 [-1, 1] 內"""
+        if self._peak(buffer) > 1.0:
+            self._scale_to_peak(buffer, self.target_peak)
+
+    @staticmethod
+    def _peak(buffer: np.ndarray) -> float:
+        return max((float(np.max(np.abs(buffer[i:i + TIME_BLOCK])))
+                    for i in range(0, len(buffer), TIME_BLOCK)), default=0.0)
+
+    def _scale_to_peak(self, buffer: np.ndarray, target: float):
+        peak = self._peak(buffer)
+        if peak > 0:
+            buffer *= np.float32(target / peak)
+
+    def _compress(self, buffer: np.ndarray):
+        """超過門檻的部分依比例壓縮，逐區塊原地處理"""
+        threshold = np.float32(self.compression_threshold)
+        inverse_ratio = np.float32(1.0 / self.compression_ratio)
+        scratch = np.empty(min(TIME_BLOCK, len(buffer)), dtype=np.float32)
+        for start in range(0, len(buffer), TIME_BLOCK):
+            block = buffer[start:start + TIME_BLOCK]
+            magnitude = np.abs(block, out=scratch[:len(block)])
+            over = magnitude > threshold
+            if np.any(over):
+                block[over] = np.sign(block[over]) * (threshold + (magnitude[over] - threshold) * inverse_ratio)
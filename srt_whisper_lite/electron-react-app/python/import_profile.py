@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+匯入時間報告 - SRT GO
+Import profile: 以 `python -X importtime` 在子行程中匯入模組，輸出機器可讀的匯入耗時
+
+- 每個模組的自身耗時與累計耗時 (微秒) 及巢狀深度
+- 依頂層套件彙總，列出啟動時就被匯入的重量級依賴 (torch、faster_whisper、onnxruntime 等)
+- 後端啟動路徑應只匯入標準函式庫與必要的 numpy；重量級依賴在第一次使用時才載入
+- profile_until_event 執行整個腳本直到輸出第一個事件 (例如 READY:)，量測的是該時間點
+  實際已載入的模組，而不只是匯入模組本身
+
+用法:
+    python import_profile.py backend_server --top 15 --json report.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from typing import Any, Dict, List, Optional, Sequence
+
+HEAVY_MODULES = ("torch", "torchaudio", "librosa", "scipy", "faster_whisper", "ctranslate2",
+                 "onnxruntime", "transformers", "av", "numba")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """解析 -X importtime 的 stderr 輸出，依完成順序返回記錄"""
+    records = []
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append({
+            "module": module,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": max(0, (len(indent) - 1) // 2),
+        })
+    return records
+
+
+def summarize(records: Sequence[Dict[str, Any]], top: int = 20,
+              heavy: Sequence[str] = HEAVY_MODULES) -> Dict[str, Any]:
+    """依頂層套件彙總自身耗時，並列出被匯入的重量級依賴"""
+    packages: Dict[str, int] = {}
+    for record in records:
+        root = record["module"].split(".")[0]
+        packages[root] = packages.get(root, 0) + record["self_us"]
+    total = sum(r["cumulative_us"] for r in records if r["depth"] == 0)
+    imported = {r["module"].split(".")[0] for r in records}
+    return {
+        "total_us": total,
+        "module_count": len(records),
+        "slowest_modules": sorted(records, key=lambda r: r["self_us"], reverse=True)[:top],
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]),
+        "heavy_imported": sorted(name for name in heavy if name in imported),
+    }
+
+
+def profile_imports(module: str, python: Optional[str] = None, cwd: Optional[str] = None,
+                    top: int = 20, timeout: float = 120.0) -> Dict[str, Any]:
+    """在全新子行程中匯入 module 並返回匯入時間報告"""
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [cwd, os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run([python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=cwd, env=env, capture_output=True, text=True, timeout=timeout)
+    records = parse_importtime(completed.stderr)
+    # total_us 含直譯器啟動時的 site/encodings；module_us 只計算目標模組本身的累計耗時
+    target = next((r for r in records if r["module"] == module and r["depth"] == 0), None)
+    report = {"module": module, "ok": completed.returncode == 0,
+              "module_us": target["cumulative_us"] if target else None, **summarize(records, top)}
+    if completed.returncode != 0:
+        report["error"] = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else ""
+    return report
+
+
+def wait_for_event(process: subprocess.Popen, prefix: str, timeout: float,
+                   start: Optional[float] = None) -> Optional[float]:
+    """等待子行程的 stdout 輸出以 prefix 開頭的行，返回從 start (預設為呼叫時) 到收到事件的秒數
+
+    讀取在背景執行緒中進行，子行程不輸出任何內容時也會在 timeout 後返回 None。
+    """
+    start = time.perf_counter() if start is None else start
+    found = threading.Event()
+    elapsed: List[float] = []
+
+    def reader():
+        try:
+            for line in process.stdout:
+                if line.startswith(prefix):
+                    elapsed.append(time.perf_counter() - start)
+                    found.set()
+                    return
+        except (OSError, ValueError):
+            # 逾時後呼叫端關閉了 stdout
+            return
+
+    threading.Thread(target=reader, daemon=True).start()
+    found.wait(timeout)
+    return elapsed[0] if elapsed else None
+
+
+def profile_until_event(args: Sequence[str], prefix: str, python: Optional[str] = None,
+                        cwd: Optional[str] = None, top: int = 20, timeout: float = 120.0,
+                        heavy: Sequence[str] = HEAVY_MODULES) -> Dict[str, Any]:
+    """以 -X importtime 執行 python args，收到第一個 prefix 事件時結束行程，返回到該時間點的匯入報告"""
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [cwd, os.environ.get("PYTHONPATH")])))
+    # stderr 寫入暫存檔，避免管線緩衝區塞滿使子行程阻塞
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as stderr:
+        process = subprocess.Popen([python or sys.executable, "-X", "importtime", *args], cwd=cwd, env=env,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+                                   text=True, encoding="utf-8")
+        try:
+            elapsed = wait_for_event(process, prefix, timeout)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            process.stdout.close()
+            process.stdin.close()
+        stderr.seek(0)
+        records = parse_importtime(stderr.read())
+    return {"command": list(args), "ok": elapsed is not None, "event_s": elapsed,
+            **summarize(records, top, heavy)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="機器可讀的模組匯入時間報告")
+    parser.add_argument("modules", nargs="+", help="要量測的模組名稱")
+    parser.add_argument("--top", type=int, default=20, help="列出最慢的模組數")
+    parser.add_argument("--json", dest="json_path", help="報告 JSON 輸出路徑 (- 為標準輸出)")
+    parser.add_argument("--fail-on-heavy", action="store_true", help="匯入重量級依賴時以非零狀態結束")
+    args = parser.parse_args()
+
+    reports = [profile_imports(module, top=args.top) for module in args.modules]
+    for report in reports:
+        status = "" if report["ok"] else f" (匯入失敗: {report.get('error')})"
+        print(f"{report['module']}: {(report['module_us'] or 0) / 1000:.1f}ms "
+              f"(含直譯器 {report['total_us'] / 1000:.1f}ms), {report['module_count']} 個模組{status}",
+              file=sys.stderr)
+        for record in report["slowest_modules"][:5]:
+            print(f"  {record['self_us'] / 1000:8.1f}ms  {record['module']}", file=sys.stderr)
+        if report["heavy_imported"]:
+            print(f"  重量級依賴: {', '.join(report['heavy_imported'])}", file=sys.stderr)
+
+    if args.json_path == "-":
+        json.dump(reports, sys.stdout, indent=2, ensure_ascii=False)
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+
+    if args.fail_on_heavy and any(r["heavy_imported"] for r in reports):
+        return 1
+    return 0 if all(r["ok"] for r in reports) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+媒體標頭探測 - SRT GO
+Media probe: 只讀容器標頭取得時長、取樣率與聲道數，不解碼音頻資料
+
+- WAV 直接解析 RIFF 標頭 (wav_mmap.read_wav_header)
+- 其他格式以 PyAV 開啟容器讀取串流中繼資料；時長缺失時才回退到容器時長
+- 結果以 (絕對路徑, mtime, 大小) 為鍵快取，檔案改變時自動失效
+
+用於在解碼前計算總時長 (ETA)、實際 RTF 與依時長決定的超時。
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 16 * 1024 ** 2
+# 探測邏輯改變時遞增，使舊快取失效
+PROBE_VERSION = 1
+
+
+class MediaInfo(NamedTuple):
+    """音訊串流的標頭資訊"""
+    duration: Optional[float]
+    sample_rate: Optional[int]
+    channels: Optional[int]
+    codec: Optional[str]
+    container: str
+
+
+def _probe_wav(path: str) -> Optional[MediaInfo]:
+    from wav_mmap import read_wav_header
+    info = read_wav_header(path)
+    if info is None:
+        return None
+    return MediaInfo(info.duration, info.sample_rate, info.channels, f"pcm_{info.bits_per_sample}", "wav")
+
+
+def _probe_container(path: str) -> Optional[MediaInfo]:
+    import av
+
+    with av.open(path) as container:
+        if not container.streams.audio:
+            return None
+        stream = container.streams.audio[0]
+        duration = None
+        if stream.duration is not None and stream.time_base is not None:
+            duration = float(stream.duration * stream.time_base)
+        elif container.duration is not None:
+            duration = container.duration / av.time_base
+        codec = stream.codec_context
+        channels = getattr(codec, "channels", None) or getattr(getattr(codec, "layout", None), "nb_channels", None)
+        return MediaInfo(duration, codec.sample_rate or stream.rate, channels, codec.name,
+                         container.format.name)
+
+
+def probe_media(path: str) -> Optional[MediaInfo]:
+    """讀取檔案的音訊標頭資訊；沒有音訊串流時返回 None"""
+    path = str(path)
+    if path.lower().endswith(".wav"):
+        info = _probe_wav(path)
+        if info is not None:
+            return info
+    return _probe_container(path)
+
+
+class MediaProbeCache:
+    """以 (路徑, mtime, 大小) 為鍵的探測結果快取，磁碟上每個項目一個小 JSON"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        from audio_cache import default_cache_dir
+        self.directory = Path(directory) if directory else default_cache_dir("probe")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._memory: Dict[str, Optional[MediaInfo]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(path: str) -> str:
+        stat = os.stat(path)
+        identity = f"{PROBE_VERSION}|{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.blake2b(identity.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, path: str) -> Optional[MediaInfo]:
+        """返回探測結果 (命中快取時不開啟媒體檔)"""
+        key = self.cache_key(path)
+        if key in self._memory:
+            self.hits += 1
+            return self._memory[key]
+
+        entry = self._path(key)
+        if entry.exists():
+            try:
+                with open(entry, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                info = MediaInfo(**data["info"]) if data.get("info") else None
+                os.utime(entry)
+                self.hits += 1
+                self._memory[key] = info
+                return info
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning(f"探測快取損壞，移除: {entry} ({e})")
+                entry.unlink(missing_ok=True)
+
+        self.misses += 1
+        info = probe_media(path)
+        self._memory[key] = info
+        try:
+            self._write(entry, info)
+        except OSError as e:
+            logger.warning(f"無法寫入探測快取: {e}")
+        return info
+
+    def _write(self, entry: Path, info: Optional[MediaInfo]):
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.directory), suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"info": info._asdict() if info else None}, f)
+            os.replace(tmp_path, entry)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        from audio_cache import evict_lru
+        evict_lru(self.directory, "*.json", self.max_bytes, keep=entry)
+
+
+_default_cache: Optional[MediaProbeCache] = None
+
+
+def default_probe_cache() -> MediaProbeCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MediaProbeCache()
+    return _default_cache
+
+
+def probe_duration(path: str, cache: Optional[MediaProbeCache] = None) -> Optional[float]:
+    """檔案時長 (秒)；無法探測時返回 None"""
+    try:
+        info = (cache or default_probe_cache()).get(str(path))
+    except Exception as e:
+        logger.warning(f"無法探測媒體時長 {path}: {e}")
+        return None
+    return info.duration if info else None
+
+
+def probe_files(paths: Sequence[str], cache: Optional[MediaProbeCache] = None) -> Dict[str, Any]:
+    """探測多個檔案，返回各檔資訊與總時長 (任一檔案未知時 total_duration 仍為已知部分的總和)"""
+    files: List[Dict[str, Any]] = []
+    for path in paths:
+        record: Dict[str, Any] = {"path": str(path), "duration": None, "sample_rate": None, "channels": None}
+        try:
+            info = (cache or default_probe_cache()).get(str(path))
+            if info is not None:
+                record.update(duration=info.duration, sample_rate=info.sample_rate, channels=info.channels)
+        except Exception as e:
+            logger.warning(f"無法探測媒體 {path}: {e}")
+            record["error"] = str(e)
+        files.append(record)
+    known = [f["duration"] for f in files if f["duration"] is not None]
+    return {"files": files, "total_duration": sum(known), "complete": len(known) == len(files)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="只讀標頭的媒體時長探測")
+    parser.add_argument("files", nargs="+", help="媒體檔案")
+    parser.add_argument("--no-cache", action="store_true", help="不使用探測快取")
+    args = parser.parse_args()
+
+    cache = MediaProbeCache(tempfile.mkdtemp()) if args.no_cache else None
+    json.dump(probe_files(args.files, cache), sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型常駐池 - SRT GO
+Model residency pool: 依 (模型大小, compute_type, device, cpu_threads) 快取已載入的模型
+
+在記憶體預算內保留最近使用的模型，超出預算時淘汰最久未使用 (LRU) 的項目。
+"""
+
+import gc
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# float16 權重的大約常駐記憶體 (MB)，實際載入後會以量測值取代
+MODEL_SIZE_ESTIMATES_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 485,
+    "medium": 1530,
+    "large": 3090,
+}
+
+# 各 compute_type 相對於 float16 的大小比例
+COMPUTE_TYPE_SCALE = {
+    "int8": 0.5,
+    "int8_float16": 0.5,
+    "int8_float32": 0.5,
+    "int8_bfloat16": 0.5,
+    "float16": 1.0,
+    "bfloat16": 1.0,
+    "float32": 2.0,
+}
+
+DEFAULT_BUDGET_MB = 4096
+
+
+class ModelKey(NamedTuple):
+    """模型池的快取鍵"""
+    model_size: str
+    compute_type: str
+    device: str
+    cpu_threads: int
+
+
+def estimate_model_mb(key: ModelKey) -> float:
+    """估算模型常駐記憶體 (MB)"""
+    name = os.path.basename(str(key.model_size).rstrip("/\\")).lower()
+    base = next((size for prefix, size in MODEL_SIZE_ESTIMATES_MB.items()
+                 if prefix in name), MODEL_SIZE_ESTIMATES_MB["medium"])
+    return base * COMPUTE_TYPE_SCALE.get(key.compute_type, 1.0)
+
+
+def default_budget_mb() -> float:
+    """預設預算：可用記憶體的一半"""
+    env_budget = os.environ.get("SRT_GO_MODEL_POOL_MB")
+    if env_budget:
+        try:
+            return float(env_budget)
+        except ValueError:
+            logger.warning(f"無效的 SRT_GO_MODEL_POOL_MB: {env_budget}")
+
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1024 ** 2 * 0.5
+    except ImportError:
+        return DEFAULT_BUDGET_MB
+
+
+def _process_rss_mb() -> Optional[float]:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        return None
+
+
+class _PoolEntry:
+    __slots__ = ("model", "size_mb", "loaded_at")
+
+    def __init__(self, model: Any, size_mb: float):
+        self.model = model
+        self.size_mb = size_mb
+        self.loaded_at = time.time()
+
+
+class ModelPool:
+    """LRU 模型池，以記憶體預算限制常駐模型總量"""
+
+    def __init__(self, budget_mb: Optional[float] = None,
+                 estimator: Callable[[ModelKey], float] = estimate_model_mb):
+        self.budget_mb = budget_mb if budget_mb is not None else default_budget_mb()
+        self.estimator = estimator
+        self._entries: "OrderedDict[ModelKey, _PoolEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        # 載入中的模型：同一鍵的其他請求等待此 Future，而非重複載入
+        self._loading: Dict[ModelKey, Future] = {}
+        self._reserved_mb = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def used_mb(self) -> float:
+        return sum(entry.size_mb for entry in self._entries.values())
+
+    def __contains__(self, key) -> bool:
+        return ModelKey(*key) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, loader: Callable[[], Any]) -> Any:
+        """取得模型，未命中時在騰出預算後呼叫 loader 載入
+
+        loader 在鎖外執行 (可能耗時數秒)，載入期間其他鍵的 get、淘汰與 stats
+        不會被阻塞；同一鍵的並行請求會等待同一次載入的結果。
+        """
+        key = ModelKey(*key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.model
+
+            pending = self._loading.get(key)
+            if pending is None:
+                self.misses += 1
+                estimate = self.estimator(key)
+                self._evict_for(estimate)
+                pending = Future()
+                self._loading[key] = pending
+                self._reserved_mb += estimate
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        try:
+            rss_before = _process_rss_mb() if key.device == "cpu" else None
+            start_time = time.time()
+            model = loader()
+            size_mb = estimate
+            if rss_before is not None:
+                measured = _process_rss_mb() - rss_before
+                # 量測值過小代表記憶體被延遲分配或重用，保留估算值
+                if measured > estimate * 0.25:
+                    size_mb = measured
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+                self._reserved_mb -= estimate
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[key]
+            self._reserved_mb -= estimate
+            self._entries[key] = _PoolEntry(model, size_mb)
+            logger.info(f"模型池載入 {tuple(key)}，耗時 {time.time() - start_time:.2f}s，"
+                        f"約 {size_mb:.0f}MB (使用 {self.used_mb:.0f}/{self.budget_mb:.0f}MB)")
+        pending.set_result(model)
+        return model
+
+    def _evict_for(self, required_mb: float):
+        """淘汰最久未使用的模型直到可容納 required_mb；池內只剩一個時也會淘汰
+
+        載入中模型的估算值 (_reserved_mb) 也計入預算。
+        """
+        evicted = False
+        while self._entries and self.used_mb + self._reserved_mb + required_mb > self.budget_mb:
+            key, entry = self._entries.popitem(last=False)
+            self.evictions += 1
+            evicted = True
+            logger.info(f"模型池淘汰 {tuple(key)} ({entry.size_mb:.0f}MB)")
+            del entry
+        if evicted:
+            gc.collect()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            gc.collect()
+
+    def stats(self) -> Dict[str, Any]:
+        """命中/未命中/淘汰計數，附加在 COMPLETE 事件中"""
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "resident": [list(key) for key in self._entries],
+            "loading": [list(key) for key in self._loading],
+            "used_mb": round(self.used_mb, 1),
+            "budget_mb": round(self.budget_mb, 1),
+        }
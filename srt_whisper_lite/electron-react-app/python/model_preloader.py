@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+背景模型預載 - SRT GO
+Model preloader: 收到任務後立即在背景執行緒載入 VAD session 與 WhisperModel
+
+探測輸入、解碼、重取樣與預處理在前景照常進行；推理第一次需要模型時才在 future 上等待。
+1-5 分鐘的音頻中，數秒的模型載入 (含 faster_whisper / ctranslate2 的匯入) 大多被已經
+必須進行的前處理時間覆蓋。stats() 回報載入耗時與實際等待時間。
+
+VAD session 經由 onnx_vad.get_session 載入 (lru_cache)，之後以相同參數建立的 BatchedVad
+直接取用同一個 session。WhisperModel 的鍵取自後端上次實際建立模型時的參數，或智能選擇器
+的決策 (model_key_from_decision)，不從設定猜測；兩者都沒有時不預載，避免多載入一個用不到的模型。
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from model_pool import ModelKey
+
+logger = logging.getLogger(__name__)
+
+WHISPER = "whisper"
+VAD = "vad"
+
+
+class Preloader:
+    """以名稱管理的背景載入工作；同名資源只載入一次"""
+
+    def __init__(self, max_workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preload")
+        self._futures: Dict[str, Future] = {}
+        self._load_times: Dict[str, float] = {}
+        self._wait_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, loader: Callable[[], Any]) -> Future:
+        """開始在背景載入；已啟動時返回既有的 future"""
+        with self._lock:
+            if name in self._futures:
+                return self._futures[name]
+
+            def run():
+                start_time = time.perf_counter()
+                try:
+                    return loader()
+                finally:
+                    self._load_times[name] = time.perf_counter() - start_time
+
+            future = self._executor.submit(run)
+            future.add_done_callback(lambda f: self._log_failure(name, f))
+            self._futures[name] = future
+            return future
+
+    @staticmethod
+    def _log_failure(name: str, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            # 錯誤保留在 future 中，真正需要該資源時才由 get() 拋出
+            logger.warning(f"背景預載 {name} 失敗: {future.exception()}")
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """等待並返回載入結果；載入失敗時拋出原本的例外"""
+        future = self._futures.get(name)
+        if future is None:
+            raise KeyError(f"未啟動預載: {name}")
+        start_time = time.perf_counter()
+        try:
+            return future.result(timeout)
+        finally:
+            self._wait_times[name] = self._wait_times.get(name, 0.0) + time.perf_counter() - start_time
+
+    def get_or_load(self, name: str, loader: Callable[[], Any]) -> Any:
+        return self.get(name) if name in self._futures else self.start(name, loader).result()
+
+    def ready(self, name: str) -> bool:
+        future = self._futures.get(name)
+        return future is not None and future.done()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._futures
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """各資源的載入耗時、前景等待時間與被覆蓋的時間 (秒)；未經 get() 取用時後兩者為 None"""
+        result = {}
+        for name in self._futures:
+            load = self._load_times.get(name)
+            wait = self._wait_times.get(name)
+            result[name] = {
+                "load_time": round(load, 4) if load is not None else None,
+                "wait_time": round(wait, 4) if wait is not None else None,
+                "hidden_time": (round(max(0.0, load - wait), 4)
+                                if load is not None and wait is not None else None),
+            }
+        return result
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def model_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """任務設定中影響智能選擇器決策 (進而影響模型鍵) 的部分，作為記錄實際模型鍵的索引"""
+    return {"model": settings.get("model"), "enable_gpu": bool(settings.get("enable_gpu", False))}
+
+
+def model_key_from_decision(decision: Any) -> Optional[ModelKey]:
+    """智能選擇器決策 (config 或 (config, 說明)) 對應的模型鍵；缺少模型、精度或裝置時返回 None"""
+    config = decision[0] if isinstance(decision, tuple) and decision else decision
+    if not isinstance(config, dict):
+        return None
+    size = config.get("model_size") or config.get("model")
+    if not size or not config.get("compute_type") or not config.get("device"):
+        return None
+    return ModelKey(str(size), config["compute_type"], config["device"], int(config.get("cpu_threads") or 0))
+
+
+def load_vad_session():
+    """載入 Silero VAD session (與 BatchedVad 預設參數相同，命中 get_session 的快取)；找不到模型時返回 None"""
+    from onnx_vad import default_intra_op_threads, find_vad_model, get_session
+    model_path = find_vad_model()
+    if model_path is None:
+        return None
+    return get_session(model_path, default_intra_op_threads())
+
+
+def _whisper_loader(key: ModelKey, model_factory: Optional[Callable]) -> Callable[[], Any]:
+    def load():
+        # faster_whisper / ctranslate2 的匯入本身也在背景執行緒完成
+        factory = model_factory
+        if factory is None:
+            from faster_whisper import WhisperModel
+            factory = WhisperModel
+        return factory(key.model_size, device=key.device, compute_type=key.compute_type,
+                       cpu_threads=key.cpu_threads)
+    return load
+
+
+def start_preload(key: Optional[ModelKey] = None, preloader: Optional[Preloader] = None,
+                  model_factory: Optional[Callable] = None, vad: bool = False) -> Preloader:
+    """開始在背景載入 VAD session (vad=True) 與 key 對應的 WhisperModel
+
+    返回的 Preloader 以 VAD / WHISPER 取得結果；key 為 None 時只預載 VAD，之後取得鍵
+    (例如智能選擇器決策) 時可再以同一個 preloader 呼叫。model_factory 預設為
+    faster_whisper.WhisperModel (常駐服務中為模型池的載入函式)。
+    """
+    preloader = preloader or Preloader(max_workers=2)
+    if vad:
+        preloader.start(VAD, load_vad_session)
+    if key is not None:
+        logger.info(f"背景預載模型: {tuple(key)}")
+        preloader.start(WHISPER, _whisper_loader(key, model_factory))
+    return preloader
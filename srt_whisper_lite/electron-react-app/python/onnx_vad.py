@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次 ONNX 語音偵測 - SRT GO
+Batched VAD: 以單一 ONNX Runtime session 批次執行 Silero VAD v5
+
+Silero 是遞迴模型，每個 512 樣本視窗依賴前一個視窗的狀態，不能任意打散成批次。
+這裡把音頻切成 B 條連續的「車道」，每一步同時推進所有車道的一個視窗：
+批次維度上的 B 個狀態各自延續，遞迴關係保持正確。
+車道起點向前多跑 warmup_frames 個視窗讓狀態收斂，這些輸出會被丟棄。
+
+模型輸入 (v5)：input [B, 64 + 512]、state [2, B, 128]、sr (int64)；
+輸出：output [B, 1]、stateN [2, B, 128]。
+faster-whisper ≥1.1 附帶的 v5 拆成 encoder (input → [B, 128, 1]) 與 decoder (input、state)
+兩個圖，以 SplitVadSession 包裝成相同介面。
+"""
+
+import os
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_SIZE = 512
+CONTEXT_SIZE = 64
+STATE_SHAPE = (2, 128)
+DETECTOR_NAME = "silero_v5"
+FRAME_SECONDS = WINDOW_SIZE / SAMPLE_RATE
+
+DEFAULT_LANES = 64
+DEFAULT_WARMUP_FRAMES = 32
+# 每條車道至少要有的視窗數，短檔案不需要切成太多車道
+MIN_LANE_FRAMES = 256
+
+# faster-whisper ≥1.1 附帶的 v5 模型；1.0.x 的 silero_vad.onnx 是 v4 (h/c 狀態、無上下文)，不適用
+ENCODER_FILE = "silero_encoder_v5.onnx"
+DECODER_FILE = "silero_decoder_v5.onnx"
+
+
+def split_decoder_path(model_path: str) -> Optional[str]:
+    """model_path 為拆分模型的 encoder 時返回同目錄的 decoder 路徑"""
+    if os.path.basename(model_path) != ENCODER_FILE:
+        return None
+    decoder = os.path.join(os.path.dirname(model_path), DECODER_FILE)
+    return decoder if os.path.exists(decoder) else None
+
+
+def find_vad_model() -> Optional[str]:
+    """尋找 Silero VAD v5 ONNX 模型
+
+    SRT_GO_VAD_MODEL (單一 v5 圖或拆分模型的 encoder)，其次為 faster-whisper 附帶的
+    encoder/decoder；返回單一圖或 encoder 的路徑。
+    """
+    env = os.environ.get("SRT_GO_VAD_MODEL")
+    if env and os.path.exists(env):
+        return env
+    try:
+        import faster_whisper
+    except ImportError:
+        return None
+    encoder = os.path.join(os.path.dirname(faster_whisper.__file__), "assets", ENCODER_FILE)
+    return encoder if split_decoder_path(encoder) else None
+
+
+def default_intra_op_threads() -> int:
+    """VAD 模型很小，超過 4 個執行緒的同步成本大於收益"""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+class SplitVadSession:
+    """將 encoder/decoder 兩個 session 包裝成單一 v5 圖的 run(output_names, feeds) 介面"""
+
+    def __init__(self, encoder: Any, decoder: Any):
+        self.encoder = encoder
+        self.decoder = decoder
+
+    def run(self, output_names, feeds):
+        window = feeds["input"]
+        features = self.encoder.run(None, {"input": window})[0].reshape(len(window), -1)
+        output, state = self.decoder.run(None, {"input": features, "state": feeds["state"]})
+        return np.asarray(output).reshape(len(window), 1), state
+
+
+@lru_cache(maxsize=4)
+def get_session(model_path: str, intra_op_threads: int, inter_op_threads: int = 1):
+    """建立並快取 ONNX Runtime session，同一程序內所有檔案共用
+
+    model_path 為拆分模型的 encoder 時返回 SplitVadSession。
+    """
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.log_severity_level = 3
+
+    def load(path):
+        return onnxruntime.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+    decoder_path = split_decoder_path(model_path)
+    if decoder_path:
+        decoder = load(decoder_path)
+        names = {i.name for i in decoder.get_inputs()}
+        if not {"input", "state"} <= names:
+            raise ValueError(f"不是 Silero VAD v5 decoder (輸入為 {sorted(names)}): {decoder_path}")
+        session = SplitVadSession(load(model_path), decoder)
+    else:
+        session = load(model_path)
+        names = {i.name for i in session.get_inputs()}
+        if not {"input", "state", "sr"} <= names:
+            raise ValueError(f"不是 Silero VAD v5 模型 (輸入為 {sorted(names)}): {model_path}")
+    logger.info(f"載入 VAD 模型: {model_path} (intra={intra_op_threads}, inter={inter_op_threads})")
+    return session
+
+
+class BatchedVad:
+    """批次語音機率計算
+
+    Args:
+        model_path: ONNX 模型路徑 (None 時自動尋找)
+        lanes: 最大車道數 (批次大小)
+        warmup_frames: 每條車道向前多跑的視窗數
+        intra_op_threads / inter_op_threads: ONNX Runtime 執行緒設定
+        session: 直接指定 session (需提供 run(output_names, feeds))
+    """
+
+    def __init__(self, model_path: Optional[str] = None, lanes: int = DEFAULT_LANES,
+                 warmup_frames: int = DEFAULT_WARMUP_FRAMES,
+                 intra_op_threads: Optional[int] = None, inter_op_threads: int = 1,
+                 session: Any = None):
+        self.lanes = max(1, lanes)
+        self.warmup_frames = max(0, warmup_frames)
+        if session is None:
+            model_path = model_path or find_vad_model()
+            if not model_path:
+                raise FileNotFoundError("找不到 Silero VAD ONNX 模型 (可設定 SRT_GO_VAD_MODEL)")
+            session = get_session(model_path, intra_op_threads or default_intra_op_threads(),
+                                  inter_op_threads)
+        self.session = session
+        self._sr = np.array(SAMPLE_RATE, dtype=np.int64)
+
+    def lane_plan(self, frames: int):
+        """返回每條車道的 (暖機起點, 輸出起點, 終點) 視窗索引"""
+        lanes = max(1, min(self.lanes, frames // MIN_LANE_FRAMES))
+        lane_frames = -(-frames // lanes)
+        plan = []
+        for lane in range(lanes):
+            start = lane * lane_frames
+            end = min(start + lane_frames, frames)
+            if start < end:
+                plan.append((max(0, start - self.warmup_frames), start, end))
+        return plan
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        return self.speech_probabilities(audio)
+
+    def speech_probabilities(self, audio: np.ndarray) -> np.ndarray:
+        """返回每個 512 樣本視窗的語音機率 (float32)"""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        frames = -(-len(audio) // WINDOW_SIZE)
+        if frames == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        # 前方補 64 個零作為第一個視窗的上下文，尾端補零到整數個視窗
+        padded = np.zeros(CONTEXT_SIZE + frames * WINDOW_SIZE, dtype=np.float32)
+        padded[CONTEXT_SIZE:CONTEXT_SIZE + len(audio)] = audio
+        windows = np.lib.stride_tricks.sliding_window_view(padded, CONTEXT_SIZE + WINDOW_SIZE)[::WINDOW_SIZE]
+
+        plan = self.lane_plan(frames)
+        begins = np.array([p[0] for p in plan])
+        firsts = np.array([p[1] for p in plan])
+        ends = np.array([p[2] for p in plan])
+        steps = int((ends - begins).max())
+
+        probabilities = np.zeros(frames, dtype=np.float32)
+        state = np.zeros((STATE_SHAPE[0], len(plan), STATE_SHAPE[1]), dtype=np.float32)
+        for step in range(steps):
+            index = begins + step
+            active = index < ends
+            # 已結束的車道以最後一個視窗填充，輸出不使用
+            batch = windows[np.minimum(index, ends - 1)]
+            output, state = self.session.run(None, {"input": batch, "state": state, "sr": self._sr})
+            keep = active & (index >= firsts)
+            probabilities[index[keep]] = np.asarray(output).reshape(-1)[keep]
+        return probabilities
+
+
+def cached_speech_probabilities(audio: np.ndarray, audio_hash: str, vad: Optional[BatchedVad] = None,
+                                cache=None) -> np.ndarray:
+    """經由 VadProbabilityCache 取得語音機率，未命中時才執行模型"""
+    from vad_probability_cache import VadProbabilityCache
+
+    cache = cache or VadProbabilityCache()
+    return cache.get_or_compute(audio_hash, lambda: (vad or BatchedVad())(audio),
+                                detector=DETECTOR_NAME, frame_seconds=FRAME_SECONDS)
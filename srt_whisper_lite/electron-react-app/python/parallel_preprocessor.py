@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多核心分塊預處理 - SRT GO
+Parallel preprocessing: 將波形放入共享記憶體，切成重疊區塊交由行程池處理後交叉淡化合併
+
+- 輸入與輸出各一塊 multiprocessing.shared_memory，工作行程不複製整段音頻
+- 區塊邊界對齊 STFT hop，並向前多讀一段暖機樣本，使頻域處理與串行路徑使用相同的幀網格
+- 相鄰區塊在重疊區以互補的 sin²/cos² 權重相加；偶數與奇數區塊分兩輪寫入，互不競爭
+- 正規化需要全段峰值，由主行程先算出後以增益傳給各區塊；最後的限幅同樣在主行程執行
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from fused_preprocessor import FusedPreprocessor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SECONDS = 30.0
+DEFAULT_OVERLAP_SECONDS = 0.5
+DEFAULT_WARMUP_SECONDS = 1.0
+
+
+def default_workers() -> int:
+    """預設工作行程數：環境變數 SRT_GO_PREPROCESS_WORKERS，否則為 CPU 核心數"""
+    env = os.environ.get("SRT_GO_PREPROCESS_WORKERS")
+    if env:
+        try:
+            return max(1, int(env))
+        except ValueError:
+            logger.warning(f"無效的 SRT_GO_PREPROCESS_WORKERS: {env}")
+    return max(1, os.cpu_count() or 1)
+
+
+class BlockTask(NamedTuple):
+    """單一區塊的處理參數 (傳給工作行程)"""
+    input_name: str
+    output_name: str
+    length: int
+    start: int             # 區塊核心範圍
+    end: int
+    half_overlap: int      # 交叉淡化區為邊界前後各 half_overlap 個樣本
+    lead: int              # 向前多讀的暖機樣本數
+    tail: int              # 向後多讀的樣本數
+    sample_rate: int
+    gain: float
+    preprocessor: FusedPreprocessor
+
+
+def plan_blocks(length: int, block_size: int, min_size: int = 0) -> List[tuple]:
+    """將 [0, length) 切成 block_size 大小的核心範圍；短於 min_size 的尾塊併入前一塊"""
+    blocks = [(start, min(start + block_size, length)) for start in range(0, length, block_size)]
+    if len(blocks) > 1 and blocks[-1][1] - blocks[-1][0] < min_size:
+        blocks[-2:] = [(blocks[-2][0], length)]
+    return blocks
+
+
+def crossfade_weights(task: BlockTask, out_start: int, out_end: int) -> np.ndarray:
+    """區塊輸出範圍 [out_start, out_end) 的權重，相鄰區塊的權重在重疊區相加為 1"""
+    weights = np.ones(out_end - out_start, dtype=np.float32)
+    overlap = 2 * task.half_overlap
+    if overlap == 0:
+        return weights
+    ramp = np.sin(0.5 * np.pi * (np.arange(overlap) + 0.5) / overlap) ** 2
+    if task.start > 0:
+        weights[:overlap] = ramp[:len(weights)]
+    if task.end < task.length:
+        # 淡出與下一區塊的淡入互補：1 - sin² = cos²
+        count = min(overlap, len(weights))
+        weights[-count:] *= (1.0 - ramp)[:count]
+    return weights
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """連接主行程建立的共享記憶體
+
+    工作行程與主行程共用同一個資源追蹤器，重複註冊不會產生第二筆記錄；
+    unlink 只由建立者執行。
+    """
+    return shared_memory.SharedMemory(name=name)
+
+
+def _process_block(task: BlockTask) -> int:
+    """工作行程：處理單一區塊並以交叉淡化權重累加到輸出"""
+    source = _attach(task.input_name)
+    target = _attach(task.output_name)
+    try:
+        audio = np.ndarray((task.length,), dtype=np.float32, buffer=source.buf)
+        output = np.ndarray((task.length,), dtype=np.float32, buffer=target.buf)
+
+        out_start = max(0, task.start - task.half_overlap)
+        out_end = min(task.length, task.end + task.half_overlap)
+        read_start = max(0, out_start - task.lead)
+        read_end = min(task.length, out_end + task.tail)
+
+        block = audio[read_start:read_end].copy()
+        task.preprocessor.process_block(block, task.sample_rate, task.gain)
+
+        weights = crossfade_weights(task, out_start, out_end)
+        output[out_start:out_end] += block[out_start - read_start:out_end - read_start] * weights
+        del audio, output
+        return task.end - task.start
+    finally:
+        source.close()
+        target.close()
+
+
+class ParallelPreprocessor:
+    """以行程池分塊執行 FusedPreprocessor
+
+    Args:
+        preprocessor: 預處理設定 (None 時使用預設值)
+        workers: 工作行程數 (None 時由 default_workers 決定；1 表示串行處理)
+        block_seconds: 每個區塊的核心長度
+        overlap_seconds: 相鄰區塊交叉淡化的長度
+        warmup_seconds: 每個區塊向前多處理的長度，讓降噪器的噪音估計收斂
+    """
+
+    def __init__(self, preprocessor: Optional[FusedPreprocessor] = None,
+                 workers: Optional[int] = None,
+                 block_seconds: float = DEFAULT_BLOCK_SECONDS,
+                 overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+                 warmup_seconds: float = DEFAULT_WARMUP_SECONDS):
+        self.preprocessor = preprocessor or FusedPreprocessor()
+        self.workers = workers if workers is not None else default_workers()
+        self.block_seconds = block_seconds
+        self.overlap_seconds = overlap_seconds
+        self.warmup_seconds = warmup_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _align(self, samples: float) -> int:
+        """向上取整到 STFT hop 的倍數，使各區塊與串行路徑共用幀網格"""
+        hop = self.preprocessor.frame_size // 2
+        return int(-(-int(np.ceil(samples)) // hop) * hop)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def process(self, audio: np.ndarray, sample_rate: Optional[int] = None) -> np.ndarray:
+        """處理整段音頻，返回新的 float32 陣列"""
+        sample_rate = sample_rate or self.preprocessor.sample_rate
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        block_size = self._align(self.block_seconds * sample_rate)
+
+        if self.workers <= 1 or len(audio) <= block_size:
+            return self.preprocessor.process(audio, sample_rate)
+
+        length = len(audio)
+        source = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+        target = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+        try:
+            shared_input = np.ndarray((length,), dtype=np.float32, buffer=source.buf)
+            shared_input[:] = audio
+            shared_output = np.ndarray((length,), dtype=np.float32, buffer=target.buf)
+            shared_output[:] = 0.0
+
+            half_overlap = self._align(self.overlap_seconds * sample_rate / 2)
+            frame_size = self.preprocessor.frame_size
+            lead = self._align(max(self.warmup_seconds * sample_rate, frame_size))
+            gain = self.preprocessor.normalize_gain(shared_input)
+
+            tasks = [BlockTask(source.name, target.name, length, start, end, half_overlap,
+                               lead, frame_size, sample_rate, gain, self.preprocessor)
+                     for start, end in plan_blocks(length, block_size, 2 * half_overlap)]
+
+            # 偶數與奇數區塊的輸出範圍各自不重疊，分兩輪累加即可避免寫入競爭
+            executor = self._get_executor()
+            for parity in (0, 1):
+                list(executor.map(_process_block, tasks[parity::2]))
+
+            result = shared_output.copy()
+            del shared_input, shared_output
+        finally:
+            for shm in (source, target):
+                shm.close()
+                shm.unlink()
+
+        self.preprocessor.limit(result)
+        logger.debug(f"平行預處理完成: {len(tasks)} 個區塊, {self.workers} 個工作行程")
+        return result
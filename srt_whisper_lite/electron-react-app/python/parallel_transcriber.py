@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+平行分段轉錄 - SRT GO
+Parallel chunk transcription: 在 VAD 偵測到的靜音處切開長音頻，由多個模型副本同時轉錄
+
+- backend="process"：N 個工作行程各自載入一份模型，音頻放在共享記憶體中不複製
+- backend="thread"：單一模型以 num_workers=N (CTranslate2 inter_threads) 載入，N 個執行緒同時呼叫
+- N 依可用記憶體與模型大小估計自動決定 (model_pool 的估計值)
+- 合併依分段順序進行，結果與完成順序無關；boundary_effects 量測切點附近與順序轉錄的差異
+- overlap_seconds > 0 時每段向兩側延伸，重疊區由 chunk_stitcher 依詞級時間戳對齊去重
+"""
+
+import os
+import difflib
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chunk_stitcher import stitch_chunks
+from model_pool import ModelKey, default_budget_mb, estimate_model_mb
+from transcription_cache import deserialize_segments, serialize_segments
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+DEFAULT_CHUNK_SECONDS = 300.0
+# 每個副本除權重外的解碼緩衝與 Python 行程開銷 (MB)
+WORKER_OVERHEAD_MB = 300
+
+
+def split_at_silences(regions: np.ndarray, duration: float,
+                      chunk_seconds: float = DEFAULT_CHUNK_SECONDS) -> List[Tuple[float, float]]:
+    """在語音區段之間的靜音中點切開，每段約 chunk_seconds
+
+    每個目標切點 (chunk_seconds 的倍數) 選擇最接近的靜音中點；
+    沒有語音區段時按固定長度切開。返回涵蓋 [0, duration] 的 (起點, 終點) 列表。
+    """
+    regions = np.asarray(regions, dtype=np.float64).reshape(-1, 2)
+    if duration <= chunk_seconds:
+        return [(0.0, float(duration))]
+
+    if len(regions) > 1:
+        candidates = (regions[:-1, 1] + regions[1:, 0]) / 2
+        candidates = candidates[regions[1:, 0] > regions[:-1, 1]]
+    else:
+        candidates = np.zeros(0)
+    if len(regions) == 0:
+        candidates = np.arange(chunk_seconds, duration, chunk_seconds)
+
+    cuts: List[float] = []
+    for target in np.arange(chunk_seconds, duration, chunk_seconds):
+        if len(candidates) == 0:
+            break
+        cut = float(candidates[np.argmin(np.abs(candidates - target))])
+        # 切點需遞增且不可產生過短的分段
+        if cut - (cuts[-1] if cuts else 0.0) >= chunk_seconds / 2 and duration - cut >= chunk_seconds / 4:
+            cuts.append(cut)
+
+    bounds = [0.0] + cuts + [float(duration)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def choose_worker_count(key: ModelKey, chunks: int, budget_mb: Optional[float] = None,
+                        max_workers: Optional[int] = None) -> int:
+    """依記憶體預算、CPU 核心數與分段數決定副本數"""
+    budget = default_budget_mb() if budget_mb is None else budget_mb
+    per_worker = estimate_model_mb(key) + WORKER_OVERHEAD_MB
+    by_memory = int(budget // per_worker)
+    cpus = os.cpu_count() or 1
+    by_cpu = cpus // key.cpu_threads if key.cpu_threads > 0 else cpus
+    count = max(1, min(by_memory, by_cpu, chunks, max_workers or chunks))
+    logger.info(f"平行轉錄副本數: {count} (記憶體允許 {by_memory}, CPU 允許 {by_cpu}, 分段 {chunks})")
+    return count
+
+
+def load_whisper_model(key: ModelKey, num_workers: int = 1):
+    """載入 faster-whisper 模型 (工作行程初始化時呼叫)"""
+    from faster_whisper import WhisperModel
+    return WhisperModel(key.model_size, device=key.device, compute_type=key.compute_type,
+                        cpu_threads=key.cpu_threads, num_workers=num_workers)
+
+
+def shift_segments(segments: List[Dict[str, Any]], offset: float) -> List[Dict[str, Any]]:
+    """將分段內的時間平移到整段音頻的時間軸"""
+    for segment in segments:
+        segment["start"] += offset
+        segment["end"] += offset
+        for word in segment.get("words") or []:
+            word["start"] += offset
+            word["end"] += offset
+    return segments
+
+
+def transcribe_chunk(model: Any, audio: np.ndarray, start: float, end: float,
+                     kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """轉錄 [start, end) 並返回整段時間軸上的段落字典"""
+    samples = audio[int(round(start * SAMPLE_RATE)):int(round(end * SAMPLE_RATE))]
+    segments, _ = model.transcribe(np.ascontiguousarray(samples, dtype=np.float32), **kwargs)
+    return shift_segments(deserialize_segments(serialize_segments(list(segments))), start)
+
+
+def extend_chunks(chunks: Sequence[Tuple[float, float]], overlap_seconds: float,
+                  duration: float) -> List[Tuple[float, float]]:
+    """每個分段向兩側各延伸 overlap_seconds / 2 (夾在 [0, duration] 內)"""
+    half = max(0.0, overlap_seconds) / 2
+    return [(max(0.0, start - half), min(float(duration), end + half)) for start, end in chunks]
+
+
+def merge_chunks(results: Dict[int, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """依分段順序合併，與完成順序無關"""
+    merged: List[Dict[str, Any]] = []
+    for index in sorted(results):
+        merged.extend(sorted(results[index], key=lambda s: (s["start"], s["end"])))
+    return merged
+
+
+class ChunkTask(NamedTuple):
+    """傳給工作行程的分段參數"""
+    index: int
+    shm_name: str
+    length: int
+    start: float
+    end: float
+    kwargs: Dict[str, Any]
+
+
+_worker_model = None
+
+
+def _init_worker(loader: Callable, key: ModelKey):
+    global _worker_model
+    _worker_model = loader(key, 1)
+
+
+def _run_chunk(task: ChunkTask) -> Tuple[int, List[Dict[str, Any]]]:
+    shm = shared_memory.SharedMemory(name=task.shm_name)
+    try:
+        audio = np.ndarray((task.length,), dtype=np.float32, buffer=shm.buf)
+        segments = transcribe_chunk(_worker_model, audio, task.start, task.end, task.kwargs)
+        del audio
+        return task.index, segments
+    finally:
+        shm.close()
+
+
+class ParallelChunkTranscriber:
+    """以多個模型副本平行轉錄單一長音頻
+
+    Args:
+        key: 模型設定；cpu_threads 為 0 時依副本數平分 CPU 核心
+        workers: 副本數 (None 時由 choose_worker_count 決定)
+        backend: "process" 或 "thread"
+        chunk_seconds: 目標分段長度
+        loader: (key, num_workers) -> 模型；process 模式下需可被 pickle
+        region_detector: audio -> (N, 2) 語音區段秒數；None 時使用 BatchedVad
+        overlap_seconds: 相鄰分段的重疊長度；大於 0 時預設開啟 word_timestamps 並以 stitch_chunks 合併
+    """
+
+    def __init__(self, key: ModelKey, workers: Optional[int] = None, backend: str = "process",
+                 chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+                 loader: Callable = load_whisper_model,
+                 region_detector: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 vad_options: Optional[Dict[str, Any]] = None,
+                 budget_mb: Optional[float] = None,
+                 overlap_seconds: float = 0.0):
+        if backend not in ("process", "thread"):
+            raise ValueError(f"不支援的 backend: {backend}")
+        self.key = key
+        self.workers = workers
+        self.backend = backend
+        self.chunk_seconds = chunk_seconds
+        self.loader = loader
+        self.region_detector = region_detector
+        self.vad_options = vad_options or {}
+        self.budget_mb = budget_mb
+        self.overlap_seconds = max(0.0, overlap_seconds)
+        self._executor: Optional[Executor] = None
+        self._executor_workers = 0
+        self._thread_model = None
+        self.stats: Dict[str, Any] = {}
+
+    def detect_regions(self, audio: np.ndarray) -> np.ndarray:
+        if self.region_detector is not None:
+            return np.asarray(self.region_detector(audio), dtype=np.float64).reshape(-1, 2)
+        from onnx_vad import FRAME_SECONDS, BatchedVad
+        from vad_probability_cache import speech_regions
+        return speech_regions(BatchedVad()(audio), FRAME_SECONDS, **self.vad_options)
+
+    def _worker_key(self, workers: int) -> ModelKey:
+        if self.key.cpu_threads > 0:
+            return self.key
+        return self.key._replace(cpu_threads=max(1, (os.cpu_count() or 1) // workers))
+
+    def _get_executor(self, workers: int) -> Executor:
+        if self._executor is not None and self._executor_workers != workers:
+            self.close()
+        if self._executor is None:
+            key = self._worker_key(workers)
+            if self.backend == "process":
+                self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                     initargs=(self.loader, key))
+            else:
+                self._thread_model = self.loader(key, workers)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe")
+            self._executor_workers = workers
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._thread_model = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def transcribe(self, audio: np.ndarray, regions: Optional[np.ndarray] = None,
+                   **kwargs) -> List[Dict[str, Any]]:
+        """轉錄 16kHz 音頻，返回整段時間軸上的段落字典"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32).reshape(-1)
+        duration = len(audio) / SAMPLE_RATE
+        if regions is None:
+            regions = self.detect_regions(audio)
+        chunks = split_at_silences(regions, duration, self.chunk_seconds)
+        ranges = chunks
+        if self.overlap_seconds > 0:
+            ranges = extend_chunks(chunks, self.overlap_seconds, duration)
+            kwargs.setdefault("word_timestamps", True)
+        workers = self.workers or choose_worker_count(self.key, len(chunks), self.budget_mb)
+        executor = self._get_executor(workers)
+
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        if self.backend == "thread":
+            futures = {executor.submit(transcribe_chunk, self._thread_model, audio, start, end, kwargs): i
+                       for i, (start, end) in enumerate(ranges)}
+            for future, index in futures.items():
+                results[index] = future.result()
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+            try:
+                shared = np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)
+                shared[:] = audio
+                tasks = [ChunkTask(i, shm.name, len(audio), start, end, kwargs)
+                         for i, (start, end) in enumerate(ranges)]
+                for index, segments in executor.map(_run_chunk, tasks):
+                    results[index] = segments
+                del shared
+            finally:
+                shm.close()
+                shm.unlink()
+
+        self.stats = {"chunks": len(chunks), "workers": workers, "backend": self.backend,
+                      "cuts": [end for _, end in chunks[:-1]], "overlap_seconds": self.overlap_seconds}
+        if self.overlap_seconds > 0:
+            return stitch_chunks([(sorted(results[i], key=lambda s: (s["start"], s["end"])), start, end)
+                                  for i, (start, end) in enumerate(ranges)])
+        return merge_chunks(results)
+
+
+def _words(segments: Sequence[Dict[str, Any]]) -> List[str]:
+    return " ".join(s["text"] for s in segments).split()
+
+
+def boundary_effects(reference: Sequence[Dict[str, Any]], candidate: Sequence[Dict[str, Any]],
+                     cuts: Sequence[float], window: float = 5.0) -> Dict[str, Any]:
+    """比較平行轉錄與順序轉錄的結果，分別量測全段與切點附近的文字相似度
+
+    Returns:
+        overall_similarity: 全段詞序列相似度 (difflib ratio)
+        boundary_similarity: 切點前後 window 秒內的詞序列相似度
+        interior_similarity: 其餘部分的相似度
+        segment_count_delta: 段落數差異
+    """
+    def near_cut(segment):
+        return any(segment["start"] - window <= cut <= segment["end"] + window for cut in cuts)
+
+    def ratio(a, b):
+        a_words, b_words = _words(a), _words(b)
+        if not a_words and not b_words:
+            return 1.0
+        return difflib.SequenceMatcher(None, a_words, b_words, autojunk=False).ratio()
+
+    reference_near = [s for s in reference if near_cut(s)]
+    candidate_near = [s for s in candidate if near_cut(s)]
+    return {
+        "overall_similarity": ratio(reference, candidate),
+        "boundary_similarity": ratio(reference_near, candidate_near),
+        "interior_similarity": ratio([s for s in reference if not near_cut(s)],
+                                     [s for s in candidate if not near_cut(s)]),
+        "boundary_segments": len(reference_near),
+        "segment_count_delta": len(candidate) - len(reference),
+    }
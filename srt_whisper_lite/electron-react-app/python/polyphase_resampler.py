@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多相重採樣器 - SRT GO
+Polyphase resampler: 有理數比例重採樣，濾波器組依 (來源, 目標) 採樣率快取
+
+濾波器設計與 scipy.signal.resample_poly 相同 (Kaiser β=5.0，半長 10×max(up, down))，
+但以串流方式逐區塊處理：保留跨區塊的輸入歷史，區塊邊界沒有接縫，
+分塊處理與一次處理整段的結果一致。
+"""
+
+import math
+import logging
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KAISER_BETA = 5.0
+
+
+class FilterBank(NamedTuple):
+    """多相濾波器組"""
+    up: int
+    down: int
+    half_len: int
+    taps: int              # 每個相位的係數數量
+    phases: np.ndarray     # (up, taps)，係數已反轉以配合滑動視窗
+
+
+@lru_cache(maxsize=16)
+def design_filter_bank(src_rate: int, dst_rate: int) -> FilterBank:
+    """設計並快取抗混疊濾波器組"""
+    g = math.gcd(int(src_rate), int(dst_rate))
+    up, down = int(dst_rate) // g, int(src_rate) // g
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    length = 2 * half_len + 1
+
+    # Kaiser 視窗 sinc 低通濾波器，截止頻率 1/max_rate (相對於上採樣後的 Nyquist)
+    cutoff = 1.0 / max_rate
+    n = np.arange(length) - half_len
+    prototype = cutoff * np.sinc(cutoff * n) * np.kaiser(length, KAISER_BETA)
+    prototype *= up / prototype.sum()
+
+    taps = -(-length // up)
+    padded = np.zeros(taps * up)
+    padded[:length] = prototype
+    # phases[p][t] = h[p + up*t]，反轉後可直接與遞增排列的輸入視窗相乘
+    phases = padded.reshape(taps, up).T[:, ::-1].astype(np.float32)
+    phases.setflags(write=False)
+    logger.debug(f"設計濾波器組 {src_rate}->{dst_rate}: up={up}, down={down}, taps={taps}")
+    return FilterBank(up, down, half_len, taps, phases)
+
+
+class PolyphaseResampler:
+    """串流多相重採樣器
+
+    輸出第 m 個樣本需要輸入至索引 (m*down + half_len) // up，因此輸出有固定延遲；
+    flush() 以零補足剩餘輸出，總長度為 ceil(輸入長度 * up / down)。
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        self.bank = design_filter_bank(self.src_rate, self.dst_rate)
+        self.reset()
+
+    def reset(self):
+        taps = self.bank.taps
+        # 緩衝區以 taps-1 個零開頭，代表訊號開始前的靜音
+        self._buffer = np.zeros(taps - 1, dtype=np.float32)
+        self._base = -(taps - 1)      # _buffer[0] 對應的輸入索引
+        self._consumed = 0            # 已輸入的樣本數
+        self._next_output = 0         # 下一個輸出樣本索引
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """輸入一個區塊，返回目前可計算的輸出樣本"""
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        if self.bank.up == self.bank.down:
+            self._consumed += len(block)
+            return block.copy()
+
+        self._buffer = np.concatenate((self._buffer, block))
+        self._consumed += len(block)
+        # 可完整計算的輸出需滿足 (m*down + half_len) // up < 已輸入樣本數
+        up, down, half_len = self.bank.up, self.bank.down, self.bank.half_len
+        end = (self._consumed * up - half_len - 1) // down + 1
+        return self._compute(max(end, self._next_output))
+
+    def flush(self) -> np.ndarray:
+        """以零補足並輸出剩餘樣本，之後可重新使用"""
+        if self.bank.up == self.bank.down:
+            self.reset()
+            return np.zeros(0, dtype=np.float32)
+
+        total = -(-self._consumed * self.bank.up // self.bank.down)
+        needed_input = (max(total - 1, 0) * self.bank.down + self.bank.half_len) // self.bank.up + 1
+        pad = max(0, needed_input - self._consumed)
+        self._buffer = np.concatenate((self._buffer, np.zeros(pad, dtype=np.float32)))
+        output = self._compute(total)
+        self.reset()
+        return output
+
+    def _compute(self, end: int) -> np.ndarray:
+        start = self._next_output
+        count = end - start
+        output = np.empty(max(count, 0), dtype=np.float32)
+        if count <= 0:
+            return output
+
+        up, down, half_len, taps, phases = self.bank
+        windows = np.lib.stride_tricks.sliding_window_view(self._buffer, taps)
+
+        # 輸出索引同餘 up 的樣本使用同一個相位，且輸入視窗每次前進 down 個樣本，
+        # 因此每個相位是一個跨步視圖與係數向量的矩陣乘法，不需要複製視窗
+        for residue in range(min(up, count)):
+            m0 = start + residue
+            n0 = m0 * down + half_len
+            first_window = n0 // up - (taps - 1) - self._base
+            outputs = output[residue::up]
+            strided = windows[first_window:first_window + (len(outputs) - 1) * down + 1:down]
+            np.matmul(strided, phases[n0 % up], out=outputs)
+
+        self._next_output = end
+        self._trim()
+        return output
+
+    def _trim(self):
+        """丟棄之後不再需要的輸入歷史"""
+        n = self._next_output * self.bank.down + self.bank.half_len
+        lowest_needed = n // self.bank.up - (self.bank.taps - 1)
+        drop = lowest_needed - self._base
+        if drop > 0:
+            self._buffer = self._buffer[drop:].copy()
+            self._base += drop
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """一次重採樣整段音頻"""
+    if int(src_rate) == int(dst_rate):
+        return np.asarray(audio, dtype=np.float32)
+    resampler = PolyphaseResampler(src_rate, dst_rate)
+    head = resampler.process(audio)
+    tail = resampler.flush()
+    return np.concatenate((head, tail))
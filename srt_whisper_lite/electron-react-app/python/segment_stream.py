@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字幕段落串流輸出 - SRT GO
+Incremental segment streaming: 每完成一個段落即輸出 SEGMENT: 事件並寫入字幕檔
+
+faster-whisper 的 transcribe() 返回惰性產生器，逐段消費即可在轉錄進行中
+產生字幕；寫出器以附加方式寫入並 flush，記憶體用量與輸入長度無關，
+處理中斷時已完成的段落仍保留在檔案中。
+"""
+
+import os
+import sys
+import json
+import logging
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STREAMABLE_FORMATS = ("srt", "vtt")
+
+
+def format_timestamp(seconds: float, fmt: str = "srt") -> str:
+    """秒數轉換為 SRT (00:00:01,000) 或 VTT (00:00:01.000) 時間格式"""
+    milliseconds = max(0, int(round(seconds * 1000)))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    separator = "," if fmt == "srt" else "."
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+def segment_fields(segment: Any) -> Dict[str, Any]:
+    """將 faster-whisper Segment 或字典統一為 {start, end, text}"""
+    if isinstance(segment, dict):
+        start, end, text = segment["start"], segment["end"], segment["text"]
+    else:
+        start, end, text = segment.start, segment.end, segment.text
+    return {"start": float(start), "end": float(end), "text": str(text).strip()}
+
+
+class SegmentStreamWriter:
+    """逐段附加寫入 SRT/VTT 字幕檔
+
+    Args:
+        path: 輸出路徑
+        fmt: "srt" 或 "vtt"
+        append: 附加到既有檔案 (續傳時使用)
+        start_index: 第一個寫入段落的 SRT 序號
+        fsync_every: 每寫入 N 段呼叫一次 os.fsync，0 表示只 flush
+    """
+
+    def __init__(self, path: str, fmt: str = "srt", append: bool = False,
+                 start_index: int = 1, fsync_every: int = 0):
+        if fmt not in STREAMABLE_FORMATS:
+            raise ValueError(f"不支援串流寫出的格式: {fmt}")
+        self.path = str(path)
+        self.fmt = fmt
+        self.index = start_index
+        self.fsync_every = fsync_every
+        self._written = 0
+
+        resume = append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        self._file: IO[str] = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if fmt == "vtt" and not resume:
+            self._file.write("WEBVTT\n\n")
+            self._file.flush()
+
+    def write_segment(self, segment: Any) -> Dict[str, Any]:
+        """寫入一個段落並 flush，返回寫入的欄位"""
+        fields = segment_fields(segment)
+        start = format_timestamp(fields["start"], self.fmt)
+        end = format_timestamp(fields["end"], self.fmt)
+
+        if self.fmt == "srt":
+            block = f"{self.index}\n{start} --> {end}\n{fields['text']}\n\n"
+        else:
+            block = f"{start} --> {end}\n{fields['text']}\n\n"
+
+        self._file.write(block)
+        self._file.flush()
+        self._written += 1
+        if self.fsync_every and self._written % self.fsync_every == 0:
+            os.fsync(self._file.fileno())
+
+        fields["index"] = self.index
+        self.index += 1
+        return fields
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SegmentStreamer:
+    """將段落產生器同時送往 SEGMENT: 事件與字幕寫出器"""
+
+    def __init__(self, writers: Optional[List[SegmentStreamWriter]] = None,
+                 source_file: Optional[str] = None,
+                 emit: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+                 checkpointer=None):
+        self.writers = writers or []
+        self.source_file = source_file
+        self.emit = emit or emit_segment_event
+        self.transform = transform
+        self.checkpointer = checkpointer
+        self.count = 0
+
+    def replay_checkpoint(self):
+        """續傳時先輸出檢查點中已完成的段落 (寫出器需以覆寫模式開啟)"""
+        if self.checkpointer is None:
+            return
+        for fields in list(self.checkpointer.segments):
+            self._deliver(fields)
+
+    def push(self, segment: Any) -> Optional[Dict[str, Any]]:
+        """處理一個已完成的段落；transform 返回 None 時略過"""
+        fields = segment_fields(segment)
+        if self.transform:
+            fields = self.transform(fields)
+            if fields is None or not fields["text"]:
+                return None
+
+        if self.checkpointer is not None:
+            self.checkpointer.record(fields)
+        return self._deliver(fields)
+
+    def _deliver(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        for writer in self.writers:
+            writer.write_segment(fields)
+
+        self.count += 1
+        event = {"index": self.count, **fields}
+        if self.source_file:
+            event["file"] = self.source_file
+        self.emit(event)
+        return event
+
+    def consume(self, segments: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        """逐段消費產生器，並原樣產出處理後的段落"""
+        for segment in segments:
+            event = self.push(segment)
+            if event is not None:
+                yield event
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+
+def emit_segment_event(event: Dict[str, Any], stream: Optional[IO[str]] = None):
+    """輸出 SEGMENT:{json} 事件"""
+    stream = stream or sys.stdout
+    stream.write(f"SEGMENT:{json.dumps(event, ensure_ascii=False)}\n")
+    stream.flush()
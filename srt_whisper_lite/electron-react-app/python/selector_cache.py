@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+選擇器決策快取 - SRT GO
+Selector cache: 以硬體指紋為鍵，將智能選擇器的決策保存到磁碟
+
+每個任務都在新行程中執行時，select_optimal_config 的硬體偵測與 compute_type 試跑
+每次都要重做；決策持久化後，只要指紋相同即可直接讀取。
+
+指紋包含 CPU 型號與指令集旗標、核心數、記憶體總量、ctranslate2 / onnxruntime /
+faster-whisper 版本與模型檔案雜湊；任何一項改變都會得到不同的鍵，舊項目依 LRU 淘汰。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import importlib.util
+import platform
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 1024 ** 2
+# 指紋內容或決策格式改變時遞增，使舊快取失效
+FINGERPRINT_VERSION = 1
+FINGERPRINT_PACKAGES = ("ctranslate2", "onnxruntime", "faster-whisper")
+MODEL_FILE_NAMES = ("model.bin", "silero_vad.onnx", "silero_encoder_v5.onnx", "silero_decoder_v5.onnx",
+                    "silero_vad_v6.onnx")
+
+_model_hashes: Dict[Tuple[str, int, int], str] = {}
+_fingerprints: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+
+def cpu_info() -> Dict[str, Any]:
+    """CPU 型號與指令集旗標；Linux 讀取 /proc/cpuinfo，其他平台使用 platform 資訊"""
+    model = platform.processor() or platform.machine()
+    flags: List[str] = []
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                name = name.strip()
+                if name in ("model name", "Processor", "cpu model") and value.strip():
+                    model = value.strip()
+                elif name in ("flags", "Features"):
+                    flags = value.split()
+                if not line.strip() and flags:
+                    break
+    except OSError:
+        pass
+    return {"model": model, "flags": sorted(set(flags))}
+
+
+def total_memory_mb() -> Optional[int]:
+    try:
+        import psutil
+        return int(psutil.virtual_memory().total // 1024 ** 2)
+    except ImportError:
+        pass
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 1024 ** 2)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def package_version(name: str) -> Optional[str]:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        return None
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def model_files(model_dirs: Iterable[str]) -> List[str]:
+    """模型目錄下的權重與 VAD 模型檔案"""
+    files = []
+    for directory in model_dirs:
+        path = Path(directory)
+        if path.is_file():
+            files.append(str(path))
+            continue
+        for name in MODEL_FILE_NAMES:
+            files.extend(str(p) for p in sorted(path.rglob(name)))
+    return files
+
+
+def model_file_hash(path: str) -> str:
+    """模型檔案的內容雜湊；同一行程內以 (路徑, 大小, mtime) 記憶"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _model_hashes:
+        from audio_cache import fast_content_hash
+        _model_hashes[key] = fast_content_hash(path)
+    return _model_hashes[key]
+
+
+def huggingface_cache_dir() -> Path:
+    """huggingface_hub 的模型快取目錄 (faster-whisper 下載模型的預設位置)"""
+    if os.environ.get("HF_HUB_CACHE"):
+        return Path(os.environ["HF_HUB_CACHE"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(str(Path.home()), ".cache")
+    return Path(os.environ.get("HF_HOME") or os.path.join(cache_home, "huggingface")) / "hub"
+
+
+def faster_whisper_assets_dir() -> Optional[str]:
+    """faster-whisper 附帶的 VAD 模型目錄；不匯入套件本身"""
+    try:
+        spec = importlib.util.find_spec("faster_whisper")
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin:
+        return None
+    assets = os.path.join(os.path.dirname(spec.origin), "assets")
+    return assets if os.path.isdir(assets) else None
+
+
+def default_model_dirs() -> List[str]:
+    """模型目錄：SRT_GO_MODEL_DIR (以 os.pathsep 分隔)、Hugging Face 快取中的 Whisper 模型
+    與 faster-whisper 附帶的 VAD 模型"""
+    value = os.environ.get("SRT_GO_MODEL_DIR", "")
+    dirs = [d for d in value.split(os.pathsep) if d and os.path.exists(d)]
+    hub = huggingface_cache_dir()
+    if hub.is_dir():
+        dirs.extend(str(p) for p in sorted(hub.glob("models--*whisper*")) if p.is_dir())
+    assets = faster_whisper_assets_dir()
+    if assets:
+        dirs.append(assets)
+    return dirs
+
+
+def hardware_fingerprint(model_dirs: Optional[Iterable[str]] = None, refresh: bool = False) -> Dict[str, Any]:
+    """目前機器與執行環境的指紋；同一行程內只計算一次"""
+    dirs = tuple(default_model_dirs() if model_dirs is None else model_dirs)
+    if not refresh and dirs in _fingerprints:
+        return _fingerprints[dirs]
+
+    cpu = cpu_info()
+    fingerprint = {
+        "version": FINGERPRINT_VERSION,
+        "platform": platform.system(),
+        "cpu_model": cpu["model"],
+        "cpu_flags": hashlib.blake2b(" ".join(cpu["flags"]).encode("ascii", "replace"),
+                                     digest_size=8).hexdigest(),
+        "cpu_count": os.cpu_count(),
+        "memory_mb": total_memory_mb(),
+        "packages": {name: package_version(name) for name in FINGERPRINT_PACKAGES},
+        "models": {os.path.basename(os.path.dirname(p)) + "/" + os.path.basename(p): model_file_hash(p)
+                   for p in model_files(dirs)},
+    }
+    _fingerprints[dirs] = fingerprint
+    return fingerprint
+
+
+def fingerprint_digest(fingerprint: Dict[str, Any]) -> str:
+    encoded = json.dumps(fingerprint, sort_keys=True, default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def preferences_key(preferences: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(preferences or {}, sort_keys=True, default=str)
+
+
+class SelectorCache:
+    """以硬體指紋分檔保存的選擇器決策
+
+    每個指紋一個 JSON 檔，內含 {偏好設定: 決策}；讀取過的檔案保留在記憶體中，
+    同一行程的後續查詢只需一次字典查找。
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 fingerprint: Optional[Callable[[], Dict[str, Any]]] = None):
+        # audio_cache 會匯入 numpy；延後到建立快取時，常駐服務啟動不需要它
+        from audio_cache import default_cache_dir
+        self.directory = Path(directory) if directory else default_cache_dir("selector")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint or hardware_fingerprint
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.json"
+
+    def _load(self, digest: str) -> Dict[str, Any]:
+        if digest in self._entries:
+            return self._entries[digest]
+        path = self._path(digest)
+        decisions: Dict[str, Any] = {}
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    decisions = json.load(f).get("decisions", {})
+                os.utime(path)
+            except (OSError, ValueError, AttributeError) as e:
+                logger.warning(f"選擇器快取損壞，移除: {path} ({e})")
+                path.unlink(missing_ok=True)
+                decisions = {}
+        self._entries[digest] = decisions
+        return decisions
+
+    def get(self, preferences: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """返回目前指紋下的決策，未命中時返回 None"""
+        record = self._load(fingerprint_digest(self.fingerprint())).get(preferences_key(preferences))
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        result = record["result"]
+        return tuple(result) if record.get("tuple") else result
+
+    def put(self, preferences: Optional[Dict[str, Any]], result: Any) -> Path:
+        """保存決策 (原子取代)；決策含無法序列化為 JSON 的值時拋出 TypeError"""
+        fingerprint = self.fingerprint()
+        digest = fingerprint_digest(fingerprint)
+        decisions = dict(self._load(digest))
+        decisions[preferences_key(preferences)] = {"result": result, "tuple": isinstance(result, tuple),
+                                                   "created": time.time()}
+        # 先序列化：失敗時磁碟與記憶體中的既有決策都不改變
+        payload = json.dumps({"fingerprint": fingerprint, "decisions": decisions}, ensure_ascii=False)
+        path = self._path(digest)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.directory), suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._entries[digest] = decisions
+
+        from audio_cache import evict_lru
+        evict_lru(self.directory, "*.json", self.max_bytes, keep=path)
+        return path
+
+    def get_or_select(self, preferences: Optional[Dict[str, Any]], select: Callable[[], Any]) -> Any:
+        """命中時返回保存的決策；否則執行 select() 並保存"""
+        cached = self.get(preferences)
+        if cached is not None:
+            return cached
+        result = select()
+        try:
+            self.put(preferences, result)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"無法寫入選擇器快取: {e}")
+        return result
+
+
+def install_persistent_selector(cache: Optional[SelectorCache] = None) -> Optional[SelectorCache]:
+    """讓 intelligent_model_selector.get_intelligent_selector 返回的選擇器使用磁碟快取
+
+    單次執行模式 (每個任務一個新行程) 在匯入 electron_backend 前呼叫；CPU 決策會套用
+    cpu_autotuner 保存的實測設定。intelligent_model_selector 不可用時返回 None。
+    """
+    try:
+        import intelligent_model_selector
+    except ImportError:
+        logger.warning("intelligent_model_selector 不可用，選擇器決策不持久化")
+        return None
+
+    original_factory = intelligent_model_selector.get_intelligent_selector
+    if getattr(original_factory, "_persistent_cache", None) is not None:
+        return original_factory._persistent_cache
+    cache = cache or SelectorCache()
+
+    def persistent_selector_factory(*args, **kwargs):
+        selector = original_factory(*args, **kwargs)
+        if not getattr(selector, "_persistent", False):
+            original_select = selector.select_optimal_config
+
+            def select_optimal_config(preferences=None, *select_args, **select_kwargs):
+                from cpu_autotuner import apply_tuned_config
+                decision = cache.get_or_select(
+                    preferences,
+                    lambda: original_select(preferences, *select_args, **select_kwargs)
+                )
+                return apply_tuned_config(decision, cache)
+
+            selector.select_optimal_config = select_optimal_config
+            selector._persistent = True
+        return selector
+
+    persistent_selector_factory._persistent_cache = cache
+    intelligent_model_selector.get_intelligent_selector = persistent_selector_factory
+    return cache
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+靜音移除與時間軸映射 - SRT GO
+Silence removal: 以逐幀 RMS 加遲滯判斷移除長靜音，並返回偏移表供字幕時間映射回原始時間軸
+
+偏移表為 (N, 2) 的 float64 陣列，每列是一段保留區域的 (縮短後起點, 原始起點) 秒數，
+依起點排序。縮短後的時間 t 落在第 j 段時，原始時間為 t - kept_start[j] + original_start[j]。
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from transcription_cache import deserialize_segments, serialize_segments
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FRAME_MS = 20.0
+
+
+def frame_rms(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """不重疊幀的 RMS (最後不足一幀的部分以實際長度計算)"""
+    n = len(audio)
+    frames = n // frame_length
+    squared = np.square(audio, dtype=np.float64)
+    energy = squared[:frames * frame_length].reshape(frames, frame_length).mean(axis=1)
+    if n % frame_length:
+        energy = np.append(energy, squared[frames * frame_length:].mean())
+    return np.sqrt(energy)
+
+
+def hysteresis(values: np.ndarray, high: float, low: float) -> np.ndarray:
+    """高於 high 進入語音、低於 low 才離開；介於兩者之間沿用前一幀狀態 (向量化)"""
+    decided = (values > high) | (values < low)
+    last = np.where(decided, np.arange(len(values)), -1)
+    np.maximum.accumulate(last, out=last)
+    return np.where(last >= 0, values[np.maximum(last, 0)] > high, False)
+
+
+def mask_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """返回 mask 中連續 True 區段的 (起點, 終點) 幀索引"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return edges[0::2], edges[1::2]
+
+
+def detect_silences(audio: np.ndarray, sample_rate: int, threshold: float = 0.01,
+                    low_threshold: Optional[float] = None, min_silence: float = 0.5,
+                    padding: float = 0.1, frame_ms: float = DEFAULT_FRAME_MS) -> np.ndarray:
+    """找出可移除的靜音區間，返回 (M, 2) 的樣本索引 [start, end)
+
+    只移除長於 min_silence 的靜音，並在兩側各保留 padding 秒，避免切掉字首字尾。
+    """
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if len(audio) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    frame_length = max(1, int(round(sample_rate * frame_ms / 1000.0)))
+    low = threshold * 0.5 if low_threshold is None else low_threshold
+    speech = hysteresis(frame_rms(audio, frame_length), threshold, low)
+
+    starts, ends = mask_runs(~speech)
+    pad_frames = int(round(padding * 1000.0 / frame_ms))
+    min_frames = max(1, int(np.ceil(min_silence * 1000.0 / frame_ms)))
+    # 檔案開頭與結尾的靜音不需要保留外側的 padding
+    starts = np.where(starts == 0, 0, starts + pad_frames)
+    ends = np.where(ends == len(speech), ends, ends - pad_frames)
+    keep = (ends - starts >= min_frames) & (ends > starts)
+
+    intervals = np.stack((starts[keep], ends[keep]), axis=1) * frame_length
+    return np.minimum(intervals, len(audio)).astype(np.int64)
+
+
+def remove_silence(audio: np.ndarray, sample_rate: int, threshold: float = 0.01,
+                   low_threshold: Optional[float] = None, min_silence: float = 0.5,
+                   padding: float = 0.1, frame_ms: float = DEFAULT_FRAME_MS
+                   ) -> Tuple[np.ndarray, np.ndarray]:
+    """移除長靜音，返回 (縮短後的音頻, 偏移表)"""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    silences = detect_silences(audio, sample_rate, threshold, low_threshold,
+                               min_silence, padding, frame_ms)
+
+    # 保留區域為靜音區間的補集
+    bounds = np.concatenate(([0], silences.reshape(-1), [len(audio)]))
+    kept = bounds.reshape(-1, 2)
+    kept = kept[kept[:, 1] > kept[:, 0]]
+    if len(kept) == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros((0, 2))
+
+    lengths = kept[:, 1] - kept[:, 0]
+    kept_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    offset_map = np.stack((kept_starts, kept[:, 0]), axis=1) / float(sample_rate)
+
+    if len(silences) == 0:
+        return audio, offset_map
+
+    trimmed = np.empty(int(lengths.sum()), dtype=np.float32)
+    for (start, end), position in zip(kept, kept_starts):
+        trimmed[position:position + end - start] = audio[start:end]
+
+    removed = (len(audio) - len(trimmed)) / sample_rate
+    logger.info(f"移除靜音 {removed:.1f} 秒 ({removed * sample_rate / max(len(audio), 1):.0%})")
+    return trimmed, offset_map
+
+
+def map_to_original(times, offset_map: np.ndarray, side: str = "right") -> np.ndarray:
+    """將縮短後時間軸上的時間映射回原始時間軸
+
+    時間恰好落在兩段保留區域的接縫時，side="right" 映射到後一段的起點 (適用段落起點)，
+    side="left" 映射到前一段的終點 (適用段落終點)，避免字幕跨越被移除的靜音。
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if len(offset_map) == 0:
+        return times.copy()
+    index = np.searchsorted(offset_map[:, 0], times, side=side) - 1
+    index = np.clip(index, 0, len(offset_map) - 1)
+    return times - offset_map[index, 0] + offset_map[index, 1]
+
+
+def remap_segments(segments: List[Any], offset_map: np.ndarray) -> List[Dict[str, Any]]:
+    """將段落 (及詞級時間戳) 映射回原始時間軸，返回新的段落字典
+
+    faster-whisper Segment 等物件先轉為完整的段落字典 (保留 words、avg_logprob 等欄位)；
+    所有詞的時間串接後以一次 searchsorted 映射。
+    """
+    if not segments:
+        return []
+    records = [dict(s) if isinstance(s, dict) else deserialize_segments(serialize_segments([s]))[0]
+               for s in segments]
+    starts = map_to_original([s["start"] for s in records], offset_map, side="right")
+    ends = map_to_original([s["end"] for s in records], offset_map, side="left")
+
+    words = [w for record in records for w in (record.get("words") or [])]
+    word_starts = map_to_original([w["start"] for w in words], offset_map, side="right")
+    word_ends = map_to_original([w["end"] for w in words], offset_map, side="left")
+
+    position = 0
+    for record, start, end in zip(records, starts, ends):
+        record["start"], record["end"] = float(start), float(end)
+        count = len(record.get("words") or [])
+        if count:
+            record["words"] = [{**w, "start": float(ws), "end": float(we)} for w, ws, we in
+                               zip(record["words"], word_starts[position:position + count],
+                                   word_ends[position:position + count])]
+            position += count
+    return records
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+兩階段推測式轉錄 - SRT GO
+Speculative transcription: 先以快速的小模型轉錄整段，只將低信心度的段落交給大模型重新解碼
+
+1. 草稿模型 (如 small/base int8) 轉錄整段音頻
+2. avg_logprob、no_speech_prob 或 compression_ratio 超出界限的段落標記為需升級，
+   前後加上少量邊界後合併相鄰區間
+3. 大模型只解碼這些區間 (第一次需要時才載入)，結果取代草稿中同一時間範圍的段落
+4. stats 回報升級的音頻比例，用於在準確度與吞吐量之間取捨
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model_pool import ModelKey, ModelPool
+from parallel_transcriber import SAMPLE_RATE, load_whisper_model, transcribe_chunk
+from transcription_cache import deserialize_segments, serialize_segments
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EscalationBounds:
+    """段落信心度界限；預設值與 faster-whisper 的 fallback 門檻相同"""
+    min_avg_logprob: float = -1.0
+    max_no_speech_prob: float = 0.6
+    max_compression_ratio: float = 2.4
+
+    def violations(self, segment: Dict[str, Any]) -> List[str]:
+        """返回段落超出的界限名稱；空列表表示信心度足夠"""
+        reasons = []
+        if segment.get("avg_logprob", 0.0) < self.min_avg_logprob:
+            reasons.append("avg_logprob")
+        if segment.get("no_speech_prob", 0.0) > self.max_no_speech_prob:
+            reasons.append("no_speech_prob")
+        if segment.get("compression_ratio", 0.0) > self.max_compression_ratio:
+            reasons.append("compression_ratio")
+        return reasons
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "EscalationBounds":
+        defaults = cls()
+        return cls(
+            min_avg_logprob=float(settings.get("escalateMinLogprob", defaults.min_avg_logprob)),
+            max_no_speech_prob=float(settings.get("escalateMaxNoSpeech", defaults.max_no_speech_prob)),
+            max_compression_ratio=float(settings.get("escalateMaxCompression", defaults.max_compression_ratio)),
+        )
+
+
+def escalation_spans(segments: Sequence[Dict[str, Any]], bounds: EscalationBounds, duration: float,
+                     padding: float = 0.2, merge_gap: float = 1.0) -> List[Tuple[float, float]]:
+    """找出需升級的段落，加上邊界並合併間隔小於 merge_gap 的區間
+
+    邊界只延伸到相鄰段落之間的間隙；時間戳重疊的段落則將區間延伸至完整涵蓋，
+    使每個草稿段落不是完全在區間內就是完全在區間外。
+    """
+    spans: List[Tuple[float, float]] = []
+    for i, segment in enumerate(segments):
+        if not bounds.violations(segment):
+            continue
+        lower = segments[i - 1]["end"] if i > 0 else 0.0
+        upper = segments[i + 1]["start"] if i + 1 < len(segments) else float(duration)
+        start = max(0.0, min(segment["start"], max(segment["start"] - padding, lower)))
+        end = min(float(duration), max(segment["end"], min(segment["end"] + padding, upper)))
+        _append_span(spans, start, end, merge_gap)
+    return _cover_segments(spans, segments, merge_gap)
+
+
+def _append_span(spans: List[Tuple[float, float]], start: float, end: float, merge_gap: float):
+    if spans and start - spans[-1][1] <= merge_gap:
+        spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+    else:
+        spans.append((start, end))
+
+
+def _cover_segments(spans: List[Tuple[float, float]], segments: Sequence[Dict[str, Any]],
+                    merge_gap: float) -> List[Tuple[float, float]]:
+    """將區間延伸至與其重疊的草稿段落邊界，直到不再有跨越區間邊緣的段落"""
+    while True:
+        covered: List[Tuple[float, float]] = []
+        for start, end in spans:
+            for segment in segments:
+                if segment["start"] < end and segment["end"] > start:
+                    start = min(start, segment["start"])
+                    end = max(end, segment["end"])
+            _append_span(covered, start, end, merge_gap)
+        if covered == spans:
+            return covered
+        spans = covered
+
+
+def replace_spans(draft: Sequence[Dict[str, Any]],
+                  refined: Sequence[Tuple[Tuple[float, float], List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """以大模型結果取代草稿中與升級區間重疊的段落
+
+    區間應來自 escalation_spans (已涵蓋完整草稿段落)；大模型段落依中點歸屬區間。
+    """
+    if not refined:
+        return list(draft)
+    bounds = np.array([span for span, _ in refined], dtype=np.float64)
+
+    def overlaps(segment):
+        index = np.searchsorted(bounds[:, 0], segment["end"], side="left") - 1
+        return index >= 0 and bounds[index, 1] > segment["start"]
+
+    merged = [s for s in draft if not overlaps(s)]
+    for (start, end), segments in refined:
+        merged.extend(s for s in segments if start <= (s["start"] + s["end"]) / 2 <= end)
+    merged.sort(key=lambda s: (s["start"], s["end"]))
+    return merged
+
+
+class SpeculativeTranscriber:
+    """草稿模型轉錄整段、大模型只重新解碼低信心度區間
+
+    Args:
+        draft_model: 快速模型 (faster-whisper WhisperModel 介面)
+        target_loader: () -> 大模型；只在有需要升級的區間時呼叫一次
+        bounds: 升級界限
+        padding: 每個升級段落前後延伸的秒數
+        merge_gap: 間隔小於此值的升級區間合併為一次解碼
+    """
+
+    def __init__(self, draft_model: Any, target_loader: Callable[[], Any],
+                 bounds: Optional[EscalationBounds] = None,
+                 padding: float = 0.2, merge_gap: float = 1.0):
+        self.draft_model = draft_model
+        self.target_loader = target_loader
+        self.bounds = bounds or EscalationBounds()
+        self.padding = padding
+        self.merge_gap = merge_gap
+        self._target_model = None
+        self.stats: Dict[str, Any] = {}
+
+    @property
+    def target_model(self) -> Any:
+        if self._target_model is None:
+            self._target_model = self.target_loader()
+        return self._target_model
+
+    def transcribe(self, audio: np.ndarray, **kwargs) -> List[Dict[str, Any]]:
+        """轉錄 16kHz 音頻，返回合併後的段落字典"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32).reshape(-1)
+        duration = len(audio) / SAMPLE_RATE
+        start_time = time.perf_counter()
+        segments, info = self.draft_model.transcribe(audio, **kwargs)
+        draft = deserialize_segments(serialize_segments(list(segments)))
+        draft_time = time.perf_counter() - start_time
+
+        # 短區間各自偵測語言可能與整段不同，自動偵測時沿用草稿偵測到的語言
+        refine_kwargs = dict(kwargs)
+        language = kwargs.get("language")
+        if language in (None, "auto"):
+            language = getattr(info, "language", None)
+            refine_kwargs["language"] = language
+
+        reasons: Dict[str, int] = {}
+        flagged = 0
+        for segment in draft:
+            violations = self.bounds.violations(segment)
+            flagged += bool(violations)
+            for reason in violations:
+                reasons[reason] = reasons.get(reason, 0) + 1
+        spans = escalation_spans(draft, self.bounds, duration, self.padding, self.merge_gap)
+
+        refine_start = time.perf_counter()
+        refined = [((start, end), transcribe_chunk(self.target_model, audio, start, end, refine_kwargs))
+                   for start, end in spans]
+        refine_time = time.perf_counter() - refine_start
+        result = replace_spans(draft, refined)
+
+        escalated = sum(end - start for start, end in spans)
+        elapsed = time.perf_counter() - start_time
+        self.stats = {
+            "audio_seconds": duration,
+            "draft_segments": len(draft),
+            "escalated_segments": flagged,
+            "escalated_spans": len(spans),
+            "escalated_seconds": escalated,
+            "escalated_fraction": escalated / duration if duration else 0.0,
+            "reasons": reasons,
+            "language": language,
+            "draft_time": draft_time,
+            "refine_time": refine_time,
+            "rtf": elapsed / duration if duration else 0.0,
+        }
+        logger.info(f"推測式轉錄: 升級 {len(spans)} 個區間 ({self.stats['escalated_fraction']:.1%} 音頻), "
+                    f"RTF {self.stats['rtf']:.3f}")
+        return result
+
+
+def open_speculative(draft_key: ModelKey, target_key: ModelKey, pool: Optional[ModelPool] = None,
+                     bounds: Optional[EscalationBounds] = None,
+                     loader: Callable = load_whisper_model) -> SpeculativeTranscriber:
+    """以模型池建立推測式轉錄器；兩個模型都經由池載入以便跨任務常駐"""
+    pool = pool if pool is not None else ModelPool()
+    draft = pool.get(draft_key, lambda: loader(draft_key))
+    return SpeculativeTranscriber(draft, lambda: pool.get(target_key, lambda: loader(target_key)), bounds)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流音頻解碼 - SRT GO
+Streaming decode: 以 PyAV 逐幀解碼並即時重採樣，輸出固定長度的 16kHz 單聲道區塊
+
+不論輸入長度，記憶體中同時只有一個輸出區塊與解碼器內部緩衝；
+3 小時 48kHz 立體聲檔案不再先展開成數 GB 的浮點陣列。
+"""
+
+import logging
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from polyphase_resampler import PolyphaseResampler
+from wav_mmap import is_fast_path_wav, open_pcm_wav, read_wav_header, to_float32
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+DEFAULT_BLOCK_SECONDS = 30.0
+
+
+class AudioBlock(NamedTuple):
+    """串流輸出的音頻區塊"""
+    offset: float          # 區塊起點在原始時間軸上的秒數
+    samples: np.ndarray    # float32 單聲道樣本
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+class BlockBuffer:
+    """將任意長度的幀重新切成固定長度的區塊"""
+
+    def __init__(self, block_size: int, sample_rate: int = TARGET_SAMPLE_RATE):
+        if block_size <= 0:
+            raise ValueError("block_size 必須大於 0")
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self._buffer = np.empty(block_size, dtype=np.float32)
+        self._filled = 0
+        self._emitted = 0
+
+    def push(self, samples: np.ndarray) -> Iterator[AudioBlock]:
+        """加入樣本，產出所有已填滿的區塊"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        position = 0
+        while position < len(samples):
+            take = min(self.block_size - self._filled, len(samples) - position)
+            self._buffer[self._filled:self._filled + take] = samples[position:position + take]
+            self._filled += take
+            position += take
+            if self._filled == self.block_size:
+                yield self._emit()
+
+    def flush(self) -> Iterator[AudioBlock]:
+        """產出最後一個未滿的區塊"""
+        if self._filled:
+            yield self._emit()
+
+    def _emit(self) -> AudioBlock:
+        block = AudioBlock(self._emitted / self.sample_rate,
+                           self._buffer[:self._filled].copy(), self.sample_rate)
+        self._emitted += self._filled
+        self._filled = 0
+        return block
+
+
+def _fast_path_info(path: str, sample_rate: int):
+    """已是目標採樣率單聲道 PCM 的 WAV 返回其標頭，否則返回 None"""
+    if not str(path).lower().endswith(".wav"):
+        return None
+    try:
+        info = read_wav_header(str(path))
+    except OSError:
+        return None
+    return info if is_fast_path_wav(info, sample_rate) else None
+
+
+def _iter_wav_blocks(path: str, info, block_size: int, sample_rate: int) -> Iterator[AudioBlock]:
+    """從 memory-map 逐區塊讀取，只有當前區塊會轉為 float32"""
+    samples = open_pcm_wav(path, info)[:, 0]
+    for start in range(0, len(samples), block_size):
+        yield AudioBlock(start / sample_rate, to_float32(samples[start:start + block_size]), sample_rate)
+
+
+def _iter_resampled_wav_blocks(path: str, info, block_size: int, sample_rate: int) -> Iterator[AudioBlock]:
+    """其他採樣率或多聲道的 PCM WAV：memory-map 後逐區塊混音並以多相濾波重採樣"""
+    frames = open_pcm_wav(path, info)
+    resampler = PolyphaseResampler(info.sample_rate, sample_rate)
+    buffer = BlockBuffer(block_size, sample_rate)
+    read_size = max(1, int(block_size * info.sample_rate / sample_rate))
+    for start in range(0, len(frames), read_size):
+        mono = to_float32(frames[start:start + read_size]).mean(axis=1)
+        yield from buffer.push(resampler.process(mono))
+    yield from buffer.push(resampler.flush())
+    yield from buffer.flush()
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """從容器標頭讀取時長 (秒)，不解碼；無法取得時返回 None"""
+    from media_probe import probe_media
+    info = probe_media(str(path))
+    return info.duration if info is not None else None
+
+
+def iter_audio_blocks(path: str, block_seconds: float = DEFAULT_BLOCK_SECONDS,
+                      sample_rate: int = TARGET_SAMPLE_RATE) -> Iterator[AudioBlock]:
+    """逐區塊解碼音頻，輸出 float32 單聲道 sample_rate 樣本
+
+    PyAV 的 AudioResampler 會保留跨幀的濾波狀態，區塊邊界沒有重採樣接縫。
+    已是目標格式的 PCM WAV 直接從 memory-map 讀取，不啟動解碼器；
+    其他 PCM WAV 以 PolyphaseResampler 串流重採樣。
+    """
+    block_size = int(round(block_seconds * sample_rate))
+    info = _fast_path_info(path, sample_rate)
+    if info is not None:
+        yield from _iter_wav_blocks(str(path), info, block_size, sample_rate)
+        return
+
+    if str(path).lower().endswith(".wav"):
+        info = read_wav_header(str(path))
+        if info is not None and info.dtype is not None and info.frames > 0:
+            yield from _iter_resampled_wav_blocks(str(path), info, block_size, sample_rate)
+            return
+
+    import av
+
+    buffer = BlockBuffer(block_size, sample_rate)
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+
+    with av.open(str(path)) as container:
+        if not container.streams.audio:
+            raise ValueError(f"檔案中沒有音訊串流: {path}")
+        stream = container.streams.audio[0]
+        # 讓 FFmpeg 以多執行緒解碼，不影響輸出順序
+        stream.thread_type = "AUTO"
+
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                yield from buffer.push(resampled.to_ndarray())
+
+        # 清空重採樣器內部的延遲樣本
+        for resampled in resampler.resample(None):
+            yield from buffer.push(resampled.to_ndarray())
+
+    yield from buffer.flush()
+
+
+def decode_to_array(path: str, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """完整解碼為單一陣列 (短檔案或需要整段音頻的流程使用)
+
+    先以時長預先配置輸出，避免逐區塊串接時的暫時複本。
+    """
+    info = _fast_path_info(path, sample_rate)
+    if info is not None:
+        return to_float32(open_pcm_wav(str(path), info)[:, 0])
+
+    duration = None
+    try:
+        duration = probe_duration(path)
+    except Exception as e:
+        logger.debug(f"無法讀取時長，改用動態配置: {e}")
+
+    if duration:
+        output = np.empty(int(duration * sample_rate) + sample_rate, dtype=np.float32)
+        length = 0
+        for block in iter_audio_blocks(path, sample_rate=sample_rate):
+            end = length + len(block.samples)
+            if end > len(output):
+                output = np.resize(output, end + sample_rate)
+            output[length:end] = block.samples
+            length = end
+        return output[:length]
+
+    blocks = [block.samples for block in iter_audio_blocks(path, sample_rate=sample_rate)]
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流頻譜降噪 - SRT GO
+Streaming denoiser: 以 STFT 逐區塊降噪，噪音輪廓只從非語音幀估計並持續更新
+
+- 記憶體用量固定：只保留一幀的重疊狀態與每個頻率 bin 的噪音功率
+- 噪音輪廓可依錄音環境鍵值 (noiseProfileKey) 保存，同一間教室的系列講座直接沿用，
+  不需要在每個檔案開頭重新估計
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from audio_cache import default_cache_dir
+from fused_preprocessor import SpectralSubtraction, StreamingSTFT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FRAME_SIZE = 512
+
+
+@dataclass
+class NoiseProfile:
+    """每個頻率 bin 的噪音功率估計"""
+    sample_rate: int
+    frame_size: int
+    power: np.ndarray
+    frames: int = 0        # 累計用於估計的非語音幀數
+
+    def matches(self, sample_rate: int, frame_size: int) -> bool:
+        return (self.sample_rate == sample_rate and self.frame_size == frame_size
+                and len(self.power) == frame_size // 2 + 1)
+
+
+class NoiseProfileStore:
+    """依錄音環境鍵值保存噪音輪廓 (.npz)"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else default_cache_dir("noise_profiles")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str, sample_rate: int, frame_size: int) -> Path:
+        digest = hashlib.blake2b(f"{key}|{sample_rate}|{frame_size}".encode("utf-8"), digest_size=16)
+        return self.directory / f"{digest.hexdigest()}.npz"
+
+    def load(self, key: str, sample_rate: int, frame_size: int) -> Optional[NoiseProfile]:
+        path = self._path(key, sample_rate, frame_size)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                profile = NoiseProfile(int(data["sample_rate"]), int(data["frame_size"]),
+                                       data["power"].astype(np.float64), int(data["frames"]))
+        except (ValueError, OSError, KeyError) as e:
+            logger.warning(f"噪音輪廓損壞，忽略: {path} ({e})")
+            return None
+        return profile if profile.matches(sample_rate, frame_size) else None
+
+    def save(self, key: str, profile: NoiseProfile) -> Path:
+        """原子寫入，避免並行處理的檔案讀到半個輪廓"""
+        path = self._path(key, profile.sample_rate, profile.frame_size)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.directory), suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, sample_rate=profile.sample_rate, frame_size=profile.frame_size,
+                         power=profile.power, frames=profile.frames)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+
+class NoiseProfileGain:
+    """以噪音輪廓計算頻譜相減增益，並用非語音幀更新輪廓
+
+    幀的總功率低於噪音總功率的 speech_ratio 倍時視為非語音，
+    其功率以指數移動平均併入輪廓 (平滑係數 smoothing)。
+    """
+
+    def __init__(self, sample_rate: int, frame_size: int, strength: float = 0.5, floor: float = 0.1,
+                 profile: Optional[NoiseProfile] = None, adapt: bool = True,
+                 smoothing: float = 0.95, speech_ratio: float = 2.5):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.over_subtraction = 1.0 + max(0.0, float(strength))
+        self.floor_sq = floor ** 2
+        self.adapt = adapt
+        self.smoothing = smoothing
+        self.speech_ratio = speech_ratio
+        if profile is not None and not profile.matches(sample_rate, frame_size):
+            logger.warning("噪音輪廓的採樣率或幀長不符，重新估計")
+            profile = None
+        self.profile = profile
+        self.speech_frames = 0
+        self.noise_frames = 0
+
+    def _bootstrap(self, power: np.ndarray):
+        """沒有輪廓時以頻率方向分組中位數初始化，開頭就有語音也不會把諧波當成噪音"""
+        estimator = SpectralSubtraction()
+        floors = np.median(estimator.noise_floor(power), axis=0)
+        initial = np.repeat(floors, estimator.median_bins)[:power.shape[1]]
+        self.profile = NoiseProfile(self.sample_rate, self.frame_size, initial.astype(np.float64), 0)
+
+    def _update(self, noise_power: np.ndarray):
+        """依序將非語音幀併入指數移動平均 (向量化的封閉形式)"""
+        k = len(noise_power)
+        a = self.smoothing
+        weights = (1.0 - a) * a ** np.arange(k - 1, -1, -1)
+        profile = self.profile
+        profile.power = profile.power * a ** k + weights @ noise_power
+        profile.frames += k
+
+    def __call__(self, spectra: np.ndarray, power: np.ndarray) -> np.ndarray:
+        if self.profile is None:
+            self._bootstrap(power)
+
+        noise_energy = self.profile.power.sum()
+        is_noise = power.sum(axis=1) < self.speech_ratio * noise_energy
+        self.noise_frames += int(is_noise.sum())
+        self.speech_frames += int(len(is_noise) - is_noise.sum())
+        if self.adapt and is_noise.any():
+            self._update(power[is_noise])
+
+        ratio = self.profile.power / np.maximum(power, 1e-12)
+        return np.sqrt(np.maximum(1.0 - self.over_subtraction * ratio, self.floor_sq)).astype(np.float32)
+
+
+class StreamingDenoiser:
+    """逐區塊降噪器
+
+    process() 可接受任意長度的區塊，輸出總長度在 flush() 後與輸入相同。
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_size: int = DEFAULT_FRAME_SIZE,
+                 strength: float = 0.5, floor: float = 0.1,
+                 profile: Optional[NoiseProfile] = None, adapt: bool = True,
+                 store: Optional[NoiseProfileStore] = None, profile_key: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.gain = NoiseProfileGain(sample_rate, frame_size, strength, floor, profile, adapt)
+        self.stft = StreamingSTFT(frame_size, [self.gain])
+        self.store = store
+        self.profile_key = profile_key
+        # 傳入相符的既有輪廓時跳過初始估計
+        self.profile_reused = self.gain.profile is not None
+
+    @property
+    def profile(self) -> Optional[NoiseProfile]:
+        return self.gain.profile
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        return self.stft.push(block)
+
+    def flush(self) -> np.ndarray:
+        return self.stft.flush()
+
+    def denoise(self, audio: np.ndarray) -> np.ndarray:
+        """一次處理整段音頻 (原地處理複本)"""
+        buffer = np.array(audio, dtype=np.float32).reshape(-1)
+        return self.stft.process(buffer)
+
+    def save_profile(self) -> Optional[Path]:
+        """將目前的噪音輪廓寫回儲存區 (未設定鍵值時不做任何事)"""
+        if self.store is None or self.profile_key is None or self.profile is None:
+            return None
+        try:
+            return self.store.save(self.profile_key, self.profile)
+        except OSError as e:
+            logger.warning(f"無法保存噪音輪廓: {e}")
+            return None
+
+
+def open_denoiser(settings: Dict[str, Any], sample_rate: int = 16000,
+                  store: Optional[NoiseProfileStore] = None) -> StreamingDenoiser:
+    """依 settings 建立降噪器；設定 noiseProfileKey 時載入並沿用該錄音環境的噪音輪廓"""
+    settings = settings or {}
+    frame_size = int(settings.get("denoiseFrameSize", DEFAULT_FRAME_SIZE))
+    key = settings.get("noiseProfileKey")
+    profile = None
+    if key:
+        store = store or NoiseProfileStore(settings.get("noiseProfileDir"))
+        profile = store.load(str(key), sample_rate, frame_size)
+        if profile is not None:
+            logger.info(f"沿用噪音輪廓: {key} ({profile.frames} 幀)")
+
+    return StreamingDenoiser(sample_rate, frame_size,
+                             strength=float(settings.get("noiseReduceStrength", 0.5)),
+                             profile=profile,
+                             adapt=bool(settings.get("noiseProfileAdapt", True)),
+                             store=store if key else None,
+                             profile_key=str(key) if key else None)
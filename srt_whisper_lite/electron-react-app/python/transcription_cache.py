@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轉錄結果快取 - SRT GO
+Transcription result cache: 以 (音頻雜湊, 模型, 解碼設定) 保存 Whisper 原始輸出
+
+只改變輸出格式、自訂修正詞或格式化選項時，直接取用快取的段落與詞級時間戳，
+只重新執行毫秒級的後處理，不必重新推理。
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from audio_cache import default_cache_dir, evict_lru, fast_content_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+CACHE_FORMAT_VERSION = 2
+
+# 影響解碼結果的設定 (前端送出的 enable_gpu/computeType/cpuThreads 與後端的 snake_case 名稱)；
+# 另外所有 vad 開頭的設定也會納入
+DECODE_SETTING_KEYS = frozenset({
+    "model", "enable_gpu", "computeType", "cpuThreads", "compute_type", "device", "cpu_threads",
+    "language", "beam_size", "best_of", "temperature", "initial_prompt", "word_timestamps",
+    "condition_on_previous_text", "enablePureVoiceMode",
+})
+# 智能選擇器決策中實際決定推理方式的欄位，覆寫同名設定
+MODEL_CONFIG_KEYS = ("compute_type", "device", "cpu_threads")
+
+# 段落欄位依序壓縮為陣列，詞級資料為 [start, end, word, probability]
+SEGMENT_FIELDS = ("start", "end", "text", "avg_logprob", "no_speech_prob", "compression_ratio")
+
+
+def decode_settings(settings: Dict[str, Any], model_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """擷取影響解碼的設定；model_config 為智能選擇器的實際決策 (compute_type/device/cpu_threads)"""
+    merged = dict(settings or {})
+    for key in MODEL_CONFIG_KEYS:
+        if model_config and key in model_config:
+            merged[key] = model_config[key]
+    return {k: v for k, v in sorted(merged.items())
+            if k in DECODE_SETTING_KEYS or k.lower().startswith("vad")}
+
+
+def _field(obj: Any, name: str, default=None):
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def serialize_segments(segments: List[Any]) -> List[list]:
+    """將 faster-whisper Segment (或字典) 轉為精簡的陣列格式"""
+    packed = []
+    for segment in segments:
+        row = [_field(segment, name) for name in SEGMENT_FIELDS]
+        words = _field(segment, "words") or []
+        row.append([[_field(w, "start"), _field(w, "end"), _field(w, "word"), _field(w, "probability")]
+                    for w in words])
+        packed.append(row)
+    return packed
+
+
+def deserialize_segments(packed: List[list]) -> List[Dict[str, Any]]:
+    """還原為段落字典，words 為詞級字典列表"""
+    segments = []
+    for row in packed:
+        segment = dict(zip(SEGMENT_FIELDS, row))
+        segment["words"] = [dict(zip(("start", "end", "word", "probability"), w)) for w in row[-1]]
+        segments.append(segment)
+    return segments
+
+
+class TranscriptionCache:
+    """gzip 壓縮的 JSON 轉錄快取"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory else default_cache_dir("transcripts")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(audio_hash: str, settings: Dict[str, Any]) -> str:
+        encoded = json.dumps({"v": CACHE_FORMAT_VERSION, "settings": settings},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(f"{audio_hash}|{encoded}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json.gz"
+
+    def get(self, audio_hash: str, settings: Dict[str, Any],
+            model_config: Optional[Dict[str, Any]] = None) -> Optional[Tuple[List[Dict], Dict]]:
+        """返回 (segments, info)，未命中時返回 None"""
+        path = self._path(self.cache_key(audio_hash, decode_settings(settings, model_config)))
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"轉錄快取損壞，移除: {path} ({e})")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self.hits += 1
+        return deserialize_segments(data["segments"]), data.get("info", {})
+
+    def put(self, audio_hash: str, settings: Dict[str, Any], segments: List[Any],
+            info: Optional[Dict[str, Any]] = None, model_config: Optional[Dict[str, Any]] = None) -> Path:
+        """寫入快取 (原子取代)"""
+        path = self._path(self.cache_key(audio_hash, decode_settings(settings, model_config)))
+        payload = {"segments": serialize_segments(segments), "info": info or {}}
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.directory), suffix=".json.gz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        evict_lru(self.directory, "*.json.gz", self.max_bytes, keep=path)
+        return path
+
+    def get_or_transcribe(self, source: str, settings: Dict[str, Any],
+                          transcribe: Callable[[], Tuple[List[Any], Dict[str, Any]]],
+                          audio_hash: Optional[str] = None,
+                          model_config: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict], Dict]:
+        """命中時返回快取；否則執行 transcribe() 並保存結果
+
+        transcribe 必須返回已完整消費的段落列表與 info 字典 (language 等)；
+        model_config 為本次推理實際使用的選擇器決策，與 settings 一起構成快取鍵。
+        """
+        audio_hash = audio_hash or fast_content_hash(source)
+        cached = self.get(audio_hash, settings, model_config)
+        if cached is not None:
+            logger.info(f"使用轉錄快取: {source}")
+            return cached
+
+        segments, info = transcribe()
+        try:
+            self.put(audio_hash, settings, segments, info, model_config)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"無法寫入轉錄快取: {e}")
+        return deserialize_segments(serialize_segments(segments)), info
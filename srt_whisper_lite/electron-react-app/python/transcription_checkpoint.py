@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轉錄檢查點 - SRT GO
+Checkpoint/resume: 長檔案轉錄期間定期保存進度，重新執行時從最後檢查點續傳
+
+檢查點內容：已處理到的音頻位置、已完成的段落、偵測到的語言與設定雜湊。
+檔案與設定都相同時才會續傳；續傳透過 faster-whisper 的 clip_timestamps
+從檢查點位置開始解碼。
+
+checkpointed_transcribe 包裝 WhisperModel.transcribe：段落產生器每完成一段即記錄，
+續傳時先產出檢查點中的段落，再從檢查點位置繼續解碼。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+DEFAULT_INTERVAL_SECONDS = 10.0
+
+# 只影響輸出格式、不影響轉錄結果的設定，不納入雜湊
+OUTPUT_ONLY_SETTINGS = frozenset({
+    "outputFormat", "customDir", "outputLanguage", "checkpointDir", "checkpointInterval",
+    "persistentBackend", "streamSegments",
+})
+
+
+def settings_hash(settings: Dict[str, Any]) -> str:
+    """計算影響轉錄結果的設定雜湊"""
+    relevant = {k: v for k, v in (settings or {}).items() if k not in OUTPUT_ONLY_SETTINGS}
+    encoded = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def file_fingerprint(path: str) -> str:
+    """以絕對路徑、大小與修改時間識別來源檔案"""
+    stat = os.stat(path)
+    identity = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class TranscriptionCheckpoint:
+    """檢查點資料"""
+    source: str
+    fingerprint: str
+    settings_hash: str
+    audio_offset: float = 0.0
+    language: Optional[str] = None
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    updated_at: float = 0.0
+    version: int = CHECKPOINT_VERSION
+
+    def transcribe_kwargs(self) -> Dict[str, Any]:
+        """續傳時傳給 WhisperModel.transcribe 的參數"""
+        kwargs: Dict[str, Any] = {}
+        if self.audio_offset > 0:
+            kwargs["clip_timestamps"] = [self.audio_offset]
+        if self.language:
+            kwargs["language"] = self.language
+        return kwargs
+
+
+class CheckpointStore:
+    """檢查點目錄，每個 (檔案, 設定) 組合一個 JSON 檔"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, fingerprint: str, settings_digest: str) -> Path:
+        return self.directory / f"{fingerprint}_{settings_digest}.json"
+
+    def load(self, source: str, settings: Dict[str, Any]) -> Optional[TranscriptionCheckpoint]:
+        """載入與檔案和設定相符的檢查點，不存在或不相符時返回 None"""
+        fingerprint = file_fingerprint(source)
+        digest = settings_hash(settings)
+        path = self.path_for(fingerprint, digest)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            checkpoint = TranscriptionCheckpoint(**data)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"檢查點損壞，忽略: {path} ({e})")
+            return None
+
+        if (checkpoint.version != CHECKPOINT_VERSION or checkpoint.fingerprint != fingerprint
+                or checkpoint.settings_hash != digest):
+            return None
+        return checkpoint
+
+    def save(self, checkpoint: TranscriptionCheckpoint):
+        """原子寫入：先寫暫存檔再取代，程序被終止時不會留下半個檔案"""
+        checkpoint.updated_at = time.time()
+        path = self.path_for(checkpoint.fingerprint, checkpoint.settings_hash)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.directory), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(asdict(checkpoint), f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def remove(self, checkpoint: TranscriptionCheckpoint):
+        path = self.path_for(checkpoint.fingerprint, checkpoint.settings_hash)
+        if path.exists():
+            path.unlink()
+
+
+class Checkpointer:
+    """轉錄過程中記錄已完成段落，並依時間間隔保存檢查點"""
+
+    def __init__(self, store: CheckpointStore, source: str, settings: Dict[str, Any],
+                 interval: float = DEFAULT_INTERVAL_SECONDS):
+        self.store = store
+        self.interval = interval
+        existing = store.load(source, settings)
+        self.resumed = existing is not None
+        self.checkpoint = existing or TranscriptionCheckpoint(
+            source=str(source),
+            fingerprint=file_fingerprint(source),
+            settings_hash=settings_hash(settings),
+        )
+        self._last_save = time.monotonic()
+        if self.resumed:
+            logger.info(f"從檢查點續傳 {source}: {self.checkpoint.audio_offset:.1f}s，"
+                        f"已完成 {len(self.checkpoint.segments)} 段")
+
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        return self.checkpoint.segments
+
+    def set_language(self, language: Optional[str]):
+        if language and not self.checkpoint.language:
+            self.checkpoint.language = language
+
+    def record(self, segment: Dict[str, Any]):
+        """記錄一個已完成段落，超過保存間隔時寫入檢查點"""
+        self.checkpoint.segments.append(dict(segment))
+        self.checkpoint.audio_offset = max(self.checkpoint.audio_offset, float(segment["end"]))
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        self.store.save(self.checkpoint)
+        self._last_save = time.monotonic()
+
+    def complete(self):
+        """轉錄完成後移除檢查點"""
+        self.store.remove(self.checkpoint)
+
+
+def open_checkpointer(source: str, settings: Dict[str, Any]) -> Optional[Checkpointer]:
+    """依 settings 中的 checkpointDir 建立 Checkpointer，未設定時返回 None"""
+    directory = (settings or {}).get("checkpointDir")
+    if not directory:
+        return None
+    interval = float(settings.get("checkpointInterval", DEFAULT_INTERVAL_SECONDS))
+    return Checkpointer(CheckpointStore(directory), source, settings, interval=interval)
+
+
+def _as_segment(record: Dict[str, Any]) -> SimpleNamespace:
+    """檢查點中的段落字典轉為與 faster-whisper Segment 相同存取方式的物件"""
+    words = [SimpleNamespace(**w) for w in record.get("words") or []]
+    return SimpleNamespace(**{**record, "words": words})
+
+
+def _checkpointed_segments(checkpointer: Checkpointer, segments: Iterable[Any]) -> Iterator[Any]:
+    from transcription_cache import deserialize_segments, serialize_segments
+
+    for record in list(checkpointer.segments):
+        yield _as_segment(record)
+    completed = False
+    try:
+        for segment in segments:
+            checkpointer.record(deserialize_segments(serialize_segments([segment]))[0])
+            yield segment
+        completed = True
+    finally:
+        if completed:
+            checkpointer.complete()
+        elif checkpointer.segments:
+            # 任務失敗或提前停止消費時保存目前進度
+            checkpointer.save()
+
+
+def checkpointed_transcribe(transcribe: Callable[..., Tuple[Iterable[Any], Any]], source: str,
+                            settings: Dict[str, Any], **kwargs) -> Tuple[Iterable[Any], Any]:
+    """以檢查點執行 transcribe(source, **kwargs)，返回 (段落產生器, info)
+
+    settings 未設定 checkpointDir 時直接呼叫。續傳時以 clip_timestamps 從檢查點位置
+    開始解碼並沿用檢查點的語言 (faster-whisper 在指定 clip_timestamps 時不執行 VAD 過濾)。
+    """
+    checkpointer = open_checkpointer(source, settings)
+    if checkpointer is None:
+        return transcribe(source, **kwargs)
+    if checkpointer.resumed:
+        kwargs.update(checkpointer.checkpoint.transcribe_kwargs())
+    segments, info = transcribe(source, **kwargs)
+    checkpointer.set_language(getattr(info, "language", None))
+    return _checkpointed_segments(checkpointer, segments), info
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VAD 機率快取 - SRT GO
+VAD probability cache: 保存語音偵測模型的逐幀語音機率，門檻調整不必重跑模型
+
+機率以 (音頻雜湊, 偵測器) 為鍵存成 .npy；之後任意 threshold / min_speech / min_silence
+組合都只是一次 numpy 運算 (一小時音頻約數毫秒)，sweep_thresholds 可一次比較多個門檻。
+參數命名與 faster-whisper 的 VadOptions 相同。
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from audio_cache import default_cache_dir, evict_lru
+from silence_removal import hysteresis, mask_runs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+DEFAULT_DETECTOR = "silero_v5"
+# Silero VAD 在 16kHz 下每 512 個樣本輸出一個機率
+DEFAULT_FRAME_SECONDS = 512 / 16000
+DEFAULT_THRESHOLD = 0.35
+
+
+class VadProbabilityCache:
+    """以 (音頻雜湊, 偵測器) 為鍵的逐幀語音機率快取"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory else default_cache_dir("vad")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, audio_hash: str, detector: str, frame_seconds: float) -> Path:
+        key = hashlib.blake2b(f"{audio_hash}|{detector}|{frame_seconds:.6f}".encode("utf-8"),
+                              digest_size=16).hexdigest()
+        return self.directory / f"{key}.npy"
+
+    def get(self, audio_hash: str, detector: str = DEFAULT_DETECTOR,
+            frame_seconds: float = DEFAULT_FRAME_SECONDS) -> Optional[np.ndarray]:
+        path = self._path(audio_hash, detector, frame_seconds)
+        if not path.exists():
+            self.misses += 1
+            return None
+        try:
+            probabilities = np.load(path, allow_pickle=False)
+        except (ValueError, OSError) as e:
+            logger.warning(f"VAD 快取損壞，移除: {path} ({e})")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self.hits += 1
+        return probabilities
+
+    def put(self, audio_hash: str, probabilities: np.ndarray, detector: str = DEFAULT_DETECTOR,
+            frame_seconds: float = DEFAULT_FRAME_SECONDS) -> Path:
+        """寫入快取 (原子取代)"""
+        path = self._path(audio_hash, detector, frame_seconds)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.directory), suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.asarray(probabilities, dtype=np.float32), allow_pickle=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        evict_lru(self.directory, "*.npy", self.max_bytes, keep=path)
+        return path
+
+    def get_or_compute(self, audio_hash: str, compute: Callable[[], np.ndarray],
+                       detector: str = DEFAULT_DETECTOR,
+                       frame_seconds: float = DEFAULT_FRAME_SECONDS) -> np.ndarray:
+        """命中時返回快取，否則執行 compute() 取得逐幀機率並寫入快取"""
+        cached = self.get(audio_hash, detector, frame_seconds)
+        if cached is not None:
+            logger.info(f"使用 VAD 機率快取: {audio_hash}")
+            return cached
+
+        probabilities = np.asarray(compute(), dtype=np.float32)
+        try:
+            self.put(audio_hash, probabilities, detector, frame_seconds)
+        except OSError as e:
+            logger.warning(f"無法寫入 VAD 快取: {e}")
+        return probabilities
+
+
+def speech_regions(probabilities: np.ndarray, frame_seconds: float = DEFAULT_FRAME_SECONDS,
+                   threshold: float = DEFAULT_THRESHOLD, neg_threshold: Optional[float] = None,
+                   min_speech_duration_ms: int = 250, min_silence_duration_ms: int = 100,
+                   speech_pad_ms: int = 30) -> np.ndarray:
+    """由逐幀機率計算語音區間，返回 (N, 2) 秒數陣列
+
+    與 Silero VAD 相同：機率高於 threshold 進入語音，低於 neg_threshold
+    (預設 threshold - 0.15) 才離開；短於 min_silence 的停頓合併，短於 min_speech 的區段捨棄。
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+    if len(probabilities) == 0:
+        return np.zeros((0, 2))
+    low = max(threshold - 0.15, 0.01) if neg_threshold is None else neg_threshold
+    starts, ends = mask_runs(hysteresis(probabilities, threshold, low))
+    if len(starts) == 0:
+        return np.zeros((0, 2))
+
+    # 合併短停頓：只保留長度足夠的間隔作為分界
+    min_silence = min_silence_duration_ms / 1000.0 / frame_seconds
+    gaps = starts[1:] - ends[:-1]
+    split = gaps >= min_silence
+    starts = np.concatenate((starts[:1], starts[1:][split]))
+    ends = np.concatenate((ends[:-1][split], ends[-1:]))
+
+    min_speech = min_speech_duration_ms / 1000.0 / frame_seconds
+    keep = (ends - starts) >= min_speech
+    regions = np.stack((starts[keep], ends[keep]), axis=1) * frame_seconds
+    if len(regions) == 0:
+        return regions
+
+    duration = len(probabilities) * frame_seconds
+    pad = speech_pad_ms / 1000.0
+    regions[:, 0] = np.maximum(regions[:, 0] - pad, 0.0)
+    regions[:, 1] = np.minimum(regions[:, 1] + pad, duration)
+    # padding 造成重疊時在中點分開
+    overlap = regions[1:, 0] < regions[:-1, 1]
+    if overlap.any():
+        middle = (regions[1:, 0] + regions[:-1, 1]) / 2
+        regions[:-1, 1] = np.where(overlap, middle, regions[:-1, 1])
+        regions[1:, 0] = np.where(overlap, middle, regions[1:, 0])
+    return regions
+
+
+def speech_ratio(probabilities: np.ndarray, frame_seconds: float = DEFAULT_FRAME_SECONDS,
+                 **options) -> float:
+    """語音區間佔總時長的比例"""
+    duration = len(probabilities) * frame_seconds
+    if duration == 0:
+        return 0.0
+    regions = speech_regions(probabilities, frame_seconds, **options)
+    return float((regions[:, 1] - regions[:, 0]).sum() / duration)
+
+
+def sweep_thresholds(probabilities: np.ndarray, thresholds: Iterable[float],
+                     frame_seconds: float = DEFAULT_FRAME_SECONDS, **options) -> List[Dict[str, float]]:
+    """一次比較多個門檻，返回每個門檻的語音比例、語音秒數與區段數"""
+    duration = len(probabilities) * frame_seconds
+    results = []
+    for threshold in thresholds:
+        regions = speech_regions(probabilities, frame_seconds, threshold=float(threshold), **options)
+        speech = float((regions[:, 1] - regions[:, 0]).sum())
+        results.append({
+            "threshold": float(threshold),
+            "speech_ratio": speech / duration if duration else 0.0,
+            "speech_seconds": speech,
+            "regions": int(len(regions)),
+        })
+    return results
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WAV 記憶體映射讀取 - SRT GO
+Zero-copy WAV fast path: 直接解析 RIFF 標頭並以 np.memmap 映射 data 區塊
+
+已是 16kHz 單聲道 PCM 的 WAV (匯入流程與測試資料的格式) 不需要啟動解碼器，
+也不會在記憶體中產生第二份完整複本；轉為 float32 的動作延後到逐區塊讀取時。
+"""
+
+import os
+import struct
+import logging
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_SAMPLE_DTYPES = {
+    (WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+    (WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+}
+
+
+class WavInfo(NamedTuple):
+    """WAV 標頭資訊"""
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+    format_tag: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.bits_per_sample // 8
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.block_align if self.block_align else 0
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def dtype(self) -> Optional[np.dtype]:
+        return _SAMPLE_DTYPES.get((self.format_tag, self.bits_per_sample))
+
+
+def read_wav_header(path: str) -> Optional[WavInfo]:
+    """解析 RIFF/WAVE 標頭，非 WAV 或格式損壞時返回 None
+
+    只讀取標頭區塊，不讀取音頻資料。
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = header[:4], struct.unpack("<I", header[4:])[0]
+
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                if len(body) < 16:
+                    return None
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    # 子格式 GUID 的前兩個位元組即實際格式代碼
+                    format_tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (format_tag, channels, sample_rate, bits)
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                data_offset = f.tell()
+                # 串流寫出的 WAV 可能以 0 或 0xFFFFFFFF 作為未知長度
+                data_size = min(chunk_size, file_size - data_offset)
+                if chunk_size in (0, 0xFFFFFFFF):
+                    data_size = file_size - data_offset
+                format_tag, channels, sample_rate, bits = fmt
+                return WavInfo(sample_rate, channels, bits, format_tag, data_offset, data_size)
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+
+def is_fast_path_wav(info: Optional[WavInfo], sample_rate: int = 16000) -> bool:
+    """是否可直接映射：目標採樣率、單聲道且為支援的樣本格式"""
+    return (info is not None and info.sample_rate == sample_rate and info.channels == 1
+            and info.dtype is not None and info.frames > 0)
+
+
+def open_pcm_wav(path: str, info: Optional[WavInfo] = None) -> np.memmap:
+    """以唯讀 memory-map 開啟 data 區塊，形狀為 (frames, channels)"""
+    info = info or read_wav_header(path)
+    if info is None or info.dtype is None:
+        raise ValueError(f"不支援的 WAV 格式: {path}")
+    return np.memmap(path, dtype=info.dtype, mode="r", offset=info.data_offset,
+                     shape=(info.frames, info.channels))
+
+
+def to_float32(samples: np.ndarray) -> np.ndarray:
+    """將 PCM 樣本轉為 [-1, 1) 範圍的 float32"""
+    if samples.dtype == np.float32:
+        return np.array(samples, dtype=np.float32)
+    scale = 1.0 / float(np.iinfo(samples.dtype).max + 1)
+    output = samples.astype(np.float32)
+    output *= scale
+    return output
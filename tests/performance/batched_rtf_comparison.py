@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次轉錄 RTF 比較 - SRT GO
+比較逐檔案順序轉錄 (WhisperModel.transcribe + vad_filter) 與 VAD 打包批次轉錄的 RTF
+需要 faster-whisper、onnxruntime 與實際音頻檔案
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# 添加項目路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root / "srt_whisper_lite" / "electron-react-app" / "python"))
+
+from batched_transcriber import BatchedTranscriber
+from streaming_decoder import decode_to_array
+
+
+def run_sequential(model, audios, **kwargs):
+    start = time.perf_counter()
+    counts = []
+    for audio in audios:
+        segments, _ = model.transcribe(audio, vad_filter=True, **kwargs)
+        counts.append(len(list(segments)))
+    return time.perf_counter() - start, counts
+
+
+def run_batched(model, audios, batch_size, **kwargs):
+    transcriber = BatchedTranscriber(model, batch_size=batch_size)
+    start = time.perf_counter()
+    results = transcriber.transcribe(audios, **kwargs)
+    return time.perf_counter() - start, [len(r) for r in results], transcriber.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="順序與批次轉錄 RTF 比較")
+    parser.add_argument('files', nargs='+', help='測試音頻檔案')
+    parser.add_argument('--model', default='small', help='Whisper 模型大小')
+    parser.add_argument('--compute-type', default='int8', help='CTranslate2 計算類型')
+    parser.add_argument('--cpu-threads', type=int, default=0, help='CPU 執行緒數 (0 為自動)')
+    parser.add_argument('--batch-size', type=int, default=8, help='批次大小')
+    parser.add_argument('--language', default=None, help='語言 (預設自動偵測)')
+    parser.add_argument('--output', type=str, help='結果 JSON 輸出路徑')
+    args = parser.parse_args()
+
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(args.model, device="cpu", compute_type=args.compute_type, cpu_threads=args.cpu_threads)
+    audios = [decode_to_array(path) for path in args.files]
+    audio_seconds = sum(len(a) for a in audios) / 16000
+    kwargs = {'language': args.language, 'word_timestamps': True}
+
+    sequential_time, sequential_counts = run_sequential(model, audios, **kwargs)
+    batched_time, batched_counts, stats = run_batched(model, audios, args.batch_size, **kwargs)
+
+    results = {
+        'files': args.files,
+        'model': args.model,
+        'compute_type': args.compute_type,
+        'audio_seconds': audio_seconds,
+        'sequential': {'time': sequential_time, 'rtf': sequential_time / audio_seconds,
+                       'segments': sequential_counts},
+        'batched': {'time': batched_time, 'rtf': batched_time / audio_seconds,
+                    'segments': batched_counts, 'batch_size': args.batch_size, **stats},
+        'speedup': sequential_time / batched_time if batched_time else None,
+    }
+
+    print(f"音頻總長: {audio_seconds:.1f}s")
+    print(f"順序轉錄: {sequential_time:.1f}s  RTF {results['sequential']['rtf']:.3f}")
+    print(f"批次轉錄: {batched_time:.1f}s  RTF {results['batched']['rtf']:.3f}  "
+          f"(打包後 {stats['packed_seconds']:.0f}s, {stats['windows']} 個視窗)")
+    print(f"加速: {results['speedup']:.2f}x")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
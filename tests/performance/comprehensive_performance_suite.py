@@ -93,14 +93,11 @@ class PerformanceTester:
             end_time = time.time()
             processing_time = end_time - start_time
             
-            # Calculate RTF (assuming we can get audio duration)
-            # For now, use known durations
-            audio_durations = {
-                "test_VIDEO/hutest.mp4": 11.3,
-                "test_VIDEO/DRLIN.mp4": 40.3
-            }
-            
-            audio_duration = audio_durations.get(audio_file, 30.0)  # Default 30s
+            # Calculate RTF from the real duration, read from the container header without decoding
+            from media_probe import probe_duration
+            audio_duration = probe_duration(audio_file)
+            if not audio_duration:
+                raise ValueError(f"Cannot probe audio duration: {audio_file}")
             rtf = processing_time / audio_duration
             
             test_result = {
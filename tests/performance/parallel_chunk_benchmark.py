@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+平行分段轉錄基準測試 - SRT GO
+比較整段順序轉錄與多副本平行轉錄的耗時，並量測切點附近的文字差異
+需要 faster-whisper、onnxruntime 與實際長音頻檔案
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# 添加項目路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root / "srt_whisper_lite" / "electron-react-app" / "python"))
+
+from model_pool import ModelKey
+from parallel_transcriber import ParallelChunkTranscriber, boundary_effects, load_whisper_model, transcribe_chunk
+from streaming_decoder import decode_to_array
+
+
+def main():
+    parser = argparse.ArgumentParser(description="平行分段轉錄基準測試")
+    parser.add_argument('file', help='測試音頻檔案 (建議 30 分鐘以上)')
+    parser.add_argument('--model', default='small', help='Whisper 模型大小')
+    parser.add_argument('--compute-type', default='int8', help='CTranslate2 計算類型')
+    parser.add_argument('--workers', type=int, help='副本數 (預設依記憶體自動決定)')
+    parser.add_argument('--backend', choices=['process', 'thread'], default='process')
+    parser.add_argument('--chunk-seconds', type=float, default=300.0, help='目標分段長度')
+    parser.add_argument('--overlap-seconds', type=float, default=0.0, help='相鄰分段重疊長度 (0 為不重疊)')
+    parser.add_argument('--language', default=None, help='語言 (預設自動偵測)')
+    parser.add_argument('--output', type=str, help='結果 JSON 輸出路徑')
+    args = parser.parse_args()
+
+    audio = decode_to_array(args.file)
+    audio_seconds = len(audio) / 16000
+    kwargs = {'language': args.language, 'vad_filter': True}
+    key = ModelKey(args.model, args.compute_type, 'cpu', 0)
+
+    model = load_whisper_model(key)
+    start = time.perf_counter()
+    sequential = transcribe_chunk(model, audio, 0.0, audio_seconds, kwargs)
+    sequential_time = time.perf_counter() - start
+    del model
+
+    with ParallelChunkTranscriber(key, workers=args.workers, backend=args.backend,
+                                  chunk_seconds=args.chunk_seconds,
+                                  overlap_seconds=args.overlap_seconds) as transcriber:
+        start = time.perf_counter()
+        parallel = transcriber.transcribe(audio, **kwargs)
+        parallel_time = time.perf_counter() - start
+        stats = transcriber.stats
+
+    report = boundary_effects(sequential, parallel, stats['cuts'])
+    results = {
+        'file': args.file,
+        'audio_seconds': audio_seconds,
+        'sequential_time': sequential_time,
+        'parallel_time': parallel_time,
+        'speedup': sequential_time / parallel_time if parallel_time else None,
+        **stats,
+        'boundary_effects': report,
+    }
+
+    print(f"音頻長度: {audio_seconds:.0f}s, 分段 {stats['chunks']}, 副本 {stats['workers']} ({args.backend})")
+    print(f"順序: {sequential_time:.1f}s  平行: {parallel_time:.1f}s  加速 {results['speedup']:.2f}x")
+    print(f"文字相似度: 全段 {report['overall_similarity']:.4f}, 切點附近 {report['boundary_similarity']:.4f}, "
+          f"其餘 {report['interior_similarity']:.4f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
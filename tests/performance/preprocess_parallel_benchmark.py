@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分塊平行預處理加速基準測試 - SRT GO
+比較串行 FusedPreprocessor 與不同工作行程數的 ParallelPreprocessor
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# 添加項目路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root / "srt_whisper_lite" / "electron-react-app" / "python"))
+
+from fused_preprocessor import FusedPreprocessor
+from parallel_preprocessor import ParallelPreprocessor, default_workers
+
+
+def synthetic_audio(seconds: float, sample_rate: int = 16000) -> np.ndarray:
+    """類語音測試訊號：調幅的諧波加白噪音"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 0.3 * t)
+    voiced = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((220, 440, 880, 1760), 1))
+    return (envelope * voiced * 0.3 + rng.normal(0, 0.05, len(t))).astype(np.float32)
+
+
+def run_benchmark(seconds: float, worker_counts, repeats: int = 3):
+    audio = synthetic_audio(seconds)
+    preprocessor = FusedPreprocessor()
+
+    def best_time(func):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = func()
+            times.append(time.perf_counter() - start)
+        return min(times), output
+
+    serial_time, serial_output = best_time(lambda: preprocessor.process(audio))
+    results = {
+        'audio_seconds': seconds,
+        'cpu_count': default_workers(),
+        'serial_time': serial_time,
+        'parallel': []
+    }
+    print(f"串行: {serial_time:.3f}s (RTF {serial_time / seconds:.4f})")
+
+    for workers in worker_counts:
+        with ParallelPreprocessor(preprocessor, workers=workers) as parallel:
+            parallel.process(audio[:16000 * 61])  # 預先啟動工作行程
+            elapsed, output = best_time(lambda: parallel.process(audio))
+        max_error = float(np.max(np.abs(output - serial_output)))
+        speedup = serial_time / elapsed
+        results['parallel'].append({
+            'workers': workers,
+            'time': elapsed,
+            'speedup': speedup,
+            'max_abs_error': max_error
+        })
+        print(f"{workers:>3} 行程: {elapsed:.3f}s  加速 {speedup:.2f}x  最大誤差 {max_error:.2e}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="平行預處理加速基準測試")
+    parser.add_argument('--seconds', type=float, default=600.0, help='測試音頻長度 (秒)')
+    parser.add_argument('--workers', type=int, nargs='+', help='要測試的工作行程數')
+    parser.add_argument('--repeats', type=int, default=3, help='每種配置重複次數')
+    parser.add_argument('--output', type=str, help='結果 JSON 輸出路徑')
+    args = parser.parse_args()
+
+    max_workers = default_workers()
+    worker_counts = args.workers or sorted({w for w in (2, 4, 8, 16, max_workers) if w <= max_workers} or {2})
+    results = run_benchmark(args.seconds, worker_counts, args.repeats)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
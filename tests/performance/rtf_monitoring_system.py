@@ -128,6 +128,14 @@ class RTFMonitoringSystem:
                 self.logger.warning(f"測試音頻檔案不存在，跳過測試: {config['name']}")
                 return None
             
+            # 只讀標頭取得實際音頻時長，RTF 與超時都依此計算
+            sys.path.insert(0, str(backend_script.parent))
+            from media_probe import probe_duration
+            audio_duration = probe_duration(str(test_audio))
+            if not audio_duration:
+                self.logger.warning(f"無法探測音頻時長，跳過測試: {config['name']}")
+                return None
+            
             # 建構測試命令
             settings = {
                 "model": config["model"],
@@ -156,14 +164,12 @@ class RTFMonitoringSystem:
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
-                timeout=300  # 5分鐘超時
+                timeout=max(300, audio_duration * 10)  # 至少 5 分鐘，長音頻依時長延長
             )
             
             end_time = time.time()
             processing_time = end_time - start_time
             
-            # 計算音頻持續時間（假設 5 秒）
-            audio_duration = 5.0
             rtf_score = processing_time / audio_duration
             
             # 檢查是否成功
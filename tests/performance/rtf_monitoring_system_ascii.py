@@ -128,6 +128,14 @@ class RTFMonitoringSystem:
                 self.logger.warning(f"Test audio file not found, skipping: {config['name']}")
                 return None
             
+            # Read the real audio duration from the header; RTF and timeout both use it
+            sys.path.insert(0, str(backend_script.parent))
+            from media_probe import probe_duration
+            audio_duration = probe_duration(str(test_audio))
+            if not audio_duration:
+                self.logger.warning(f"Cannot probe audio duration, skipping test: {config['name']}")
+                return None
+            
             # Build test command
             settings = {
                 "model": config["model"],
@@ -156,14 +164,12 @@ class RTFMonitoringSystem:
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
-                timeout=300  # 5 minutes timeout
+                timeout=max(300, audio_duration * 10)  # at least 5 minutes, longer for long audio
             )
             
             end_time = time.time()
             processing_time = end_time - start_time
             
-            # Calculate audio duration (assume 5 seconds)
-            audio_duration = 5.0
             rtf_score = processing_time / audio_duration
             
             # Check if successful
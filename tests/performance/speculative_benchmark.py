@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推測式轉錄基準測試 - SRT GO
+比較大模型整段轉錄與「小模型草稿 + 大模型升級」的耗時、升級比例與文字相似度
+需要 faster-whisper 與實際音頻檔案
+"""
+
+import sys
+import json
+import time
+import difflib
+import argparse
+from pathlib import Path
+
+# 添加項目路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root / "srt_whisper_lite" / "electron-react-app" / "python"))
+
+from model_pool import ModelKey
+from parallel_transcriber import load_whisper_model, transcribe_chunk
+from speculative_transcriber import EscalationBounds, SpeculativeTranscriber
+from streaming_decoder import decode_to_array
+
+
+def similarity(reference, candidate):
+    a = " ".join(s["text"] for s in reference).split()
+    b = " ".join(s["text"] for s in candidate).split()
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推測式轉錄基準測試")
+    parser.add_argument('file', help='測試音頻檔案')
+    parser.add_argument('--draft-model', default='small', help='草稿模型')
+    parser.add_argument('--target-model', default='large', help='升級用的大模型')
+    parser.add_argument('--compute-type', default='int8', help='CTranslate2 計算類型')
+    parser.add_argument('--min-logprob', type=float, nargs='+', default=[-1.0],
+                        help='avg_logprob 下限 (可給多個值以掃描取捨曲線)')
+    parser.add_argument('--language', default=None, help='語言 (預設自動偵測)')
+    parser.add_argument('--output', type=str, help='結果 JSON 輸出路徑')
+    args = parser.parse_args()
+
+    audio = decode_to_array(args.file)
+    audio_seconds = len(audio) / 16000
+    kwargs = {'language': args.language, 'vad_filter': True}
+    draft = load_whisper_model(ModelKey(args.draft_model, args.compute_type, 'cpu', 0))
+    target = load_whisper_model(ModelKey(args.target_model, args.compute_type, 'cpu', 0))
+
+    start = time.perf_counter()
+    reference = transcribe_chunk(target, audio, 0.0, audio_seconds, kwargs)
+    reference_time = time.perf_counter() - start
+    print(f"大模型整段: {reference_time:.1f}s  RTF {reference_time / audio_seconds:.3f}")
+
+    runs = []
+    for threshold in args.min_logprob:
+        transcriber = SpeculativeTranscriber(draft, lambda: target, EscalationBounds(min_avg_logprob=threshold))
+        start = time.perf_counter()
+        result = transcriber.transcribe(audio, **kwargs)
+        elapsed = time.perf_counter() - start
+        run = {'min_avg_logprob': threshold, 'time': elapsed, 'similarity': similarity(reference, result),
+               **transcriber.stats}
+        runs.append(run)
+        print(f"logprob >= {threshold:+.2f}: {elapsed:.1f}s  RTF {run['rtf']:.3f}  "
+              f"升級 {run['escalated_fraction']:.1%}  相似度 {run['similarity']:.4f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'file': args.file, 'audio_seconds': audio_seconds, 'reference_time': reference_time,
+                       'runs': runs}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+後端啟動時間基準測試 - SRT GO
+量測從啟動 Python 行程到第一個事件 (常駐服務的 READY、單次執行的 PROGRESS) 的時間，
+並以匯入時間報告列出啟動路徑上的重量級依賴
+
+常駐服務以 main.js 相同的參數 (backend_server.py --backend <後端腳本>，含常駐掛鉤、預載與
+決策快取) 執行到 READY，檢查該時間點已載入的模組；READY 之前不應載入 numpy 或任何重量級依賴。
+單次執行的 PROGRESS 量測需要 electron_backend.py 與 --clip，後端腳本不存在時略過。
+
+與 --baseline 指定的基準比較，超出容忍度時以狀態 1 結束，可直接放入 CI:
+    python tests/performance/startup_benchmark.py --baseline startup_baseline.json
+    python tests/performance/startup_benchmark.py --write-baseline startup_baseline.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# 添加項目路徑
+project_root = Path(__file__).parent.parent.parent
+python_dir = project_root / "srt_whisper_lite" / "electron-react-app" / "python"
+sys.path.append(str(python_dir))
+
+from import_profile import HEAVY_MODULES, profile_imports, profile_until_event, wait_for_event
+
+# READY 之前也不應載入 numpy (audio_cache 與選擇器快取在第一個任務時才建立)
+READY_HEAVY_MODULES = HEAVY_MODULES + ("numpy",)
+
+
+def time_to_event(command, prefix, timeout=120.0):
+    """啟動子行程並返回讀到第一個 prefix 事件的秒數；行程先結束或逾時時返回 None"""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=str(python_dir), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, encoding="utf-8")
+    try:
+        # 子行程沒有輸出時也在 timeout 後返回
+        elapsed = wait_for_event(process, prefix, timeout, start=start)
+    finally:
+        # 只量測啟動，收到事件後不等待任務完成
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+        process.stdin.close()
+    return elapsed
+
+
+def startup_targets(args):
+    """要量測的啟動路徑：名稱 -> (命令, 事件前綴)"""
+    entry = python_dir / "electron_backend.py"
+    # 與 main.js 的 getBackendServer 相同的啟動參數
+    targets = {
+        "backend_server_ready": ([sys.executable, "backend_server.py", "--backend", str(entry)], "READY:"),
+    }
+    if entry.exists() and args.clip:
+        settings = {"model": args.model, "language": "auto", "outputFormat": "srt", "enable_gpu": False}
+        targets["electron_backend_first_progress"] = (
+            [sys.executable, str(entry), "--files", json.dumps([args.clip]), "--settings", json.dumps(settings),
+             "--corrections", "[]"],
+            "PROGRESS:",
+        )
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="後端啟動時間基準測試")
+    parser.add_argument('--repeats', type=int, default=5, help='每個路徑的量測次數 (取中位數)')
+    parser.add_argument('--clip', help='單次執行模式使用的短音頻 (需要 electron_backend.py)')
+    parser.add_argument('--model', default='tiny', help='單次執行模式的模型')
+    parser.add_argument('--baseline', help='基準 JSON；超出容忍度時失敗')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='允許的相對退步比例')
+    parser.add_argument('--slack', type=float, default=0.05, help='允許的絕對退步秒數 (吸收量測雜訊)')
+    parser.add_argument('--write-baseline', help='將本次結果寫為基準 JSON')
+    parser.add_argument('--output', help='完整結果 JSON 輸出路徑')
+    args = parser.parse_args()
+
+    results = {'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': sys.version.split()[0],
+               'startup': {}, 'imports': {}}
+    for name, (command, prefix) in startup_targets(args).items():
+        samples = [time_to_event(command, prefix) for _ in range(max(1, args.repeats))]
+        valid = [s for s in samples if s is not None]
+        results['startup'][name] = {
+            'median': statistics.median(valid) if valid else None,
+            'min': min(valid) if valid else None,
+            'samples': samples,
+        }
+        median = results['startup'][name]['median']
+        print(f"{name}: {median * 1000:.0f}ms" if median is not None else f"{name}: 未收到 {prefix} 事件")
+
+    for module in ['backend_server'] + (['electron_backend'] if (python_dir / 'electron_backend.py').exists() else []):
+        report = profile_imports(module, top=10)
+        results['imports'][module] = report
+        heavy = ', '.join(report['heavy_imported']) or '無'
+        print(f"  import {module}: {(report['module_us'] or 0) / 1000:.1f}ms, 重量級依賴: {heavy}")
+
+    # 常駐服務在收到任務前不應載入 numpy 或任何重量級依賴：以 main.js 的參數執行到 READY，
+    # 檢查該時間點已載入的模組 (包含 main() 在 READY 之前做的所有事)
+    command, prefix = startup_targets(args)['backend_server_ready']
+    ready = profile_until_event(command[1:], prefix, cwd=str(python_dir), top=10, heavy=READY_HEAVY_MODULES)
+    results['imports']['backend_server_ready'] = ready
+    heavy = ', '.join(ready['heavy_imported']) or '無'
+    print(f"  backend_server 到 READY: {ready['module_count']} 個模組, 重量級依賴: {heavy}")
+
+    failures = []
+    if not ready['ok']:
+        failures.append(f"backend_server 未輸出 {prefix}")
+    elif ready['heavy_imported']:
+        failures.append(f"backend_server 在 READY 前載入了 {', '.join(ready['heavy_imported'])}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        for name, expected in baseline.get('startup', {}).items():
+            measured = results['startup'].get(name, {}).get('median')
+            if measured is None:
+                failures.append(f"{name}: 未量測到")
+                continue
+            limit = expected * (1 + args.tolerance) + args.slack
+            if measured > limit:
+                failures.append(f"{name}: {measured * 1000:.0f}ms > 上限 {limit * 1000:.0f}ms "
+                                f"(基準 {expected * 1000:.0f}ms)")
+        results['regressions'] = failures
+
+    if args.write_baseline:
+        with open(args.write_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'startup': {k: v['median'] for k, v in results['startup'].items() if v['median']}},
+                      f, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    for failure in failures:
+        print(f"❌ 啟動時間退步 {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
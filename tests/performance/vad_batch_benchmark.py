@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次 VAD 基準測試 - SRT GO
+比較逐視窗 (單車道) 與多車道批次執行 Silero VAD 的耗時與結果差異
+需要 onnxruntime 與 Silero VAD v5 ONNX 模型 (SRT_GO_VAD_MODEL 或 faster-whisper 附帶)
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# 添加項目路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root / "srt_whisper_lite" / "electron-react-app" / "python"))
+
+from onnx_vad import BatchedVad, find_vad_model
+
+
+def synthetic_audio(seconds: float, sample_rate: int = 16000) -> np.ndarray:
+    """間歇的諧波訊號加白噪音"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    gate = (np.sin(2 * np.pi * 0.1 * t) > -0.2).astype(np.float32)
+    voiced = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((180, 360, 720), 1))
+    return (gate * voiced * 0.2 + rng.normal(0, 0.01, len(t))).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批次 VAD 基準測試")
+    parser.add_argument('--seconds', type=float, default=7200.0, help='測試音頻長度 (秒)')
+    parser.add_argument('--lanes', type=int, nargs='+', default=[1, 16, 64, 128], help='要測試的車道數')
+    parser.add_argument('--model', type=str, help='VAD ONNX 模型路徑')
+    parser.add_argument('--output', type=str, help='結果 JSON 輸出路徑')
+    args = parser.parse_args()
+
+    model = args.model or find_vad_model()
+    if not model:
+        print("找不到 Silero VAD ONNX 模型，請以 --model 或 SRT_GO_VAD_MODEL 指定")
+        sys.exit(1)
+
+    audio = synthetic_audio(args.seconds)
+    results = {'audio_seconds': args.seconds, 'model': model, 'runs': []}
+    reference = None
+    for lanes in args.lanes:
+        vad = BatchedVad(model, lanes=lanes)
+        start = time.perf_counter()
+        probabilities = vad(audio)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = probabilities
+        max_diff = float(np.max(np.abs(probabilities - reference)))
+        results['runs'].append({'lanes': lanes, 'time': elapsed, 'rtf': elapsed / args.seconds,
+                                'max_abs_diff': max_diff})
+        print(f"{lanes:>4} 車道: {elapsed:.2f}s  RTF {elapsed / args.seconds:.5f}  與第一組最大差異 {max_diff:.4f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+解碼音頻快取單元測試
+測試內容雜湊、memory-map 載入與 LRU 淘汰
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from audio_cache import DecodedAudioCache, fast_content_hash
+
+PARAMS = {"sample_rate": 16000, "channels": 1, "dtype": "float32"}
+
+
+class TestDecodedAudioCache:
+    """解碼音頻快取測試類"""
+
+    def make_source(self, tmp_path, name="video.mp4", content=b"fake video payload"):
+        source = tmp_path / name
+        source.write_bytes(content)
+        return str(source)
+
+    def test_content_hash_tracks_content(self, tmp_path):
+        """測試內容雜湊依內容而非路徑"""
+        a = self.make_source(tmp_path, "a.mp4")
+        b = self.make_source(tmp_path, "b.mp4")
+        c = self.make_source(tmp_path, "c.mp4", b"different payload")
+        assert fast_content_hash(a) == fast_content_hash(b)
+        assert fast_content_hash(a) != fast_content_hash(c)
+
+    def test_large_file_hash_samples_middle(self, tmp_path):
+        """測試大檔案只取樣部分內容，但中段改變仍會被偵測"""
+        data = bytearray(os.urandom(64 * 1024))
+        source = tmp_path / "large.bin"
+        source.write_bytes(bytes(data))
+        original = fast_content_hash(str(source), sample_bytes=4096)
+
+        data[len(data) // 2] ^= 0xFF
+        source.write_bytes(bytes(data))
+        assert fast_content_hash(str(source), sample_bytes=4096) != original
+
+    def test_roundtrip_is_memory_mapped(self, tmp_path):
+        """測試快取命中時返回 memory-map 的陣列"""
+        cache = DecodedAudioCache(str(tmp_path / "cache"))
+        source = self.make_source(tmp_path)
+        audio = np.random.randn(16000).astype(np.float32)
+        decode_calls = []
+
+        def decode(path):
+            decode_calls.append(path)
+            return audio
+
+        first = cache.get_or_decode(source, decode, PARAMS)
+        second = cache.get_or_decode(source, decode, PARAMS)
+
+        assert len(decode_calls) == 1
+        assert isinstance(second, np.memmap)
+        np.testing.assert_array_equal(first, second)
+        assert cache.hits == 1
+
+    def test_decoder_params_are_part_of_key(self, tmp_path):
+        """測試不同解碼參數不共用快取"""
+        cache = DecodedAudioCache(str(tmp_path / "cache"))
+        source = self.make_source(tmp_path)
+        cache.put(source, PARAMS, np.zeros(10, dtype=np.float32))
+
+        assert cache.get(source, PARAMS) is not None
+        assert cache.get(source, {**PARAMS, "dtype": "int16"}) is None
+
+    def test_lru_eviction_respects_size_cap(self, tmp_path):
+        """測試超過容量時淘汰最久未使用的項目"""
+        entry_bytes = 4000 * 4
+        cache = DecodedAudioCache(str(tmp_path / "cache"), max_bytes=int(entry_bytes * 2.5))
+        sources = [self.make_source(tmp_path, f"{i}.mp4", f"content {i}".encode()) for i in range(3)]
+
+        cache.put(sources[0], PARAMS, np.zeros(4000, dtype=np.float32))
+        cache.put(sources[1], PARAMS, np.zeros(4000, dtype=np.float32))
+        time.sleep(0.02)
+        assert cache.get(sources[0], PARAMS) is not None  # 0 成為最近使用
+        time.sleep(0.02)
+        cache.put(sources[2], PARAMS, np.zeros(4000, dtype=np.float32))
+
+        assert cache.get(sources[1], PARAMS) is None
+        assert cache.get(sources[0], PARAMS) is not None
+        assert cache.get(sources[2], PARAMS) is not None
+        assert cache.total_bytes() <= cache.max_bytes
@@ -0,0 +1,361 @@
+"""
+常駐後端服務單元測試
+測試 JSON Lines 任務迴圈、事件標記與模型常駐
+"""
+
+import io
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from backend_server import BackendServer, ResidentState, ResidentModelFactory
+from cpu_autotuner import store_tuning
+from media_probe import MediaProbeCache
+from model_pool import ModelPool
+from selector_cache import SelectorCache
+
+
+def parse_events(output: str):
+    """將輸出解析為 (事件類型, payload) 列表"""
+    events = []
+    for line in output.splitlines():
+        kind, _, data = line.partition(":")
+        events.append((kind, json.loads(data)))
+    return events
+
+
+class FakeModel:
+    instances = 0
+
+    def __init__(self, size, **kwargs):
+        FakeModel.instances += 1
+        self.size = size
+        self.kwargs = kwargs
+
+
+class TranscribingModel(FakeModel):
+    """依 clip_timestamps 起點產出每秒一段的假模型"""
+    calls = []
+
+    def transcribe(self, audio, **kwargs):
+        TranscribingModel.calls.append(kwargs)
+        start = int(kwargs.get("clip_timestamps", [0])[0])
+        segments = (types.SimpleNamespace(start=float(t), end=float(t + 1), text=f"s{t}", avg_logprob=-0.1,
+                                          no_speech_prob=0.0, compression_ratio=1.0, words=[])
+                    for t in range(start, 4))
+        return segments, types.SimpleNamespace(language="en")
+
+
+class TestBackendServer:
+    """常駐後端服務測試類"""
+
+    def run_server(self, jobs, entry_point):
+        stdin = io.StringIO("\n".join(json.dumps(job) for job in jobs) + "\n")
+        stdout = io.StringIO()
+        server = BackendServer(entry_point=entry_point, input_stream=stdin, output_stream=stdout)
+        assert server.serve() == 0
+        return server, parse_events(stdout.getvalue())
+
+    def test_jobs_are_tagged_and_terminated(self):
+        """測試事件附加 job_id 並以 JOB_DONE 結尾"""
+        received_argv = []
+
+        def entry_point(argv):
+            received_argv.append(argv)
+            print('PROGRESS:{"percent": 50}')
+            print('COMPLETE:{"success": true}')
+            return 0
+
+        server, events = self.run_server(
+            [{"id": "a", "files": ["x.wav"], "settings": {"model": "small"}},
+             {"id": "b", "files": ["y.wav"]}],
+            entry_point
+        )
+
+        kinds = [kind for kind, _ in events]
+        assert kinds == ["READY", "PROGRESS", "COMPLETE", "JOB_DONE", "PROGRESS", "COMPLETE", "JOB_DONE"]
+        assert events[1][1] == {"percent": 50, "job_id": "a"}
+        assert events[6][1] == {"job_id": "b", "exit_code": 0}
+        assert json.loads(received_argv[0][received_argv[0].index("--files") + 1]) == ["x.wav"]
+        assert server.jobs_completed == 2
+
+    def test_failed_job_does_not_stop_server(self):
+        """測試任務異常時輸出 ERROR 並繼續處理下一個任務"""
+        calls = []
+
+        def entry_point(argv):
+            calls.append(argv)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            sys.exit(0)
+
+        _, events = self.run_server([{"id": 1}, {"id": 2}], entry_point)
+
+        assert ("ERROR", {"success": False, "message": "boom", "job_id": 1}) in events
+        done = [payload for kind, payload in events if kind == "JOB_DONE"]
+        assert done == [{"job_id": 1, "exit_code": 1}, {"job_id": 2, "exit_code": 0}]
+
+    def test_preload_uses_key_learned_from_previous_job(self, tmp_path):
+        """測試模型鍵未知時不預載；重新啟動後依上次實際使用的模型鍵預載，任務直接取用預載的模型"""
+        cache = SelectorCache(str(tmp_path), fingerprint=lambda: {"cpu_model": "test"})
+        settings = {"model": "small", "enable_gpu": False, "language": "auto"}
+
+        def run(job_settings):
+            state = ResidentState(ModelPool(budget_mb=100000), cache)
+            factory = ResidentModelFactory(FakeModel, state)
+
+            def entry_point(argv):
+                # 後端依選擇器決策建立模型，參數不一定與任務設定同名
+                model = factory("small", device="auto", compute_type="int8_float32", cpu_threads=4)
+                print(f'COMPLETE:{{"success": true, "model": "{model.size}"}}')
+                return 0
+
+            stdin = io.StringIO(json.dumps({"id": "p", "settings": job_settings}) + "\n")
+            stdout = io.StringIO()
+            BackendServer(entry_point=entry_point, input_stream=stdin, output_stream=stdout,
+                          state=state, preload=True, model_factory=factory).serve()
+            return state, dict(parse_events(stdout.getvalue()))["COMPLETE"]
+
+        before = FakeModel.instances
+        state, first = run(settings)
+        assert first["preload"]["key"] is None
+        assert "vad" in first["preload"]
+        assert FakeModel.instances == before + 1
+        assert state.model_pool.misses == 1
+
+        state, second = run(dict(settings, language="ja"))
+        assert FakeModel.instances == before + 2
+        assert state.model_pool.misses == 1
+        assert second["preload"]["key"] == ["small", "int8_float32", "auto", 4]
+        assert second["preload"]["load_time"] is not None
+        assert second["preload"]["wait_time"] is not None
+
+        state, third = run({"model": "large"})
+        assert third["preload"]["key"] is None
+
+    def test_duration_event_precedes_job(self, tmp_path):
+        """測試任務開始前輸出探測時長，COMPLETE 附帶實際 RTF"""
+        import wave
+        path = tmp_path / "clip.wav"
+        with wave.open(str(path), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(16000)
+            f.writeframes(b"\x00\x00" * 24000)
+
+        def entry_point(argv):
+            print('COMPLETE:{"success": true}')
+            return 0
+
+        stdin = io.StringIO(json.dumps({"id": "d", "files": [str(path)]}) + "\n")
+        stdout = io.StringIO()
+        server = BackendServer(entry_point=entry_point, input_stream=stdin, output_stream=stdout,
+                               probe_cache=MediaProbeCache(str(tmp_path / "probe")))
+        server.serve()
+        events = parse_events(stdout.getvalue())
+
+        assert [kind for kind, _ in events] == ["READY", "DURATION", "COMPLETE", "JOB_DONE"]
+        assert events[1][1]["total_duration"] == pytest.approx(1.5)
+        assert events[1][1]["files"][0]["sample_rate"] == 16000
+        assert events[2][1]["media_duration"] == pytest.approx(1.5)
+        assert events[2][1]["rtf"] >= 0
+
+    def test_shutdown_command(self):
+        """測試 shutdown 指令停止服務"""
+        _, events = self.run_server(
+            [{"command": "ping"}, {"command": "shutdown"}, {"id": "never"}],
+            lambda argv: pytest.fail("shutdown 後不應執行任務")
+        )
+        assert [kind for kind, _ in events] == ["READY", "PONG"]
+
+
+class TestResidentState:
+    """常駐狀態測試類"""
+
+    def test_model_is_reused_for_same_key(self):
+        """測試相同設定重用模型，設定改變時重新載入"""
+        FakeModel.instances = 0
+        state = ResidentState(ModelPool(budget_mb=10000))
+        factory = ResidentModelFactory(FakeModel, state)
+
+        first = factory("medium", device="cuda", compute_type="int8")
+        second = factory("medium", device="cuda", compute_type="int8")
+        third = factory("large", device="cuda", compute_type="int8")
+
+        assert first is second
+        assert third is not first
+        assert FakeModel.instances == 2
+        assert state.model_pool.hits == 1
+        assert state.model_pool.misses == 2
+
+    def test_complete_event_reports_pool_stats(self):
+        """測試 COMPLETE 事件附加模型池計數"""
+        server = BackendServer(entry_point=lambda argv: None, state=ResidentState(ModelPool(budget_mb=100)))
+        payload = server.transform_event("COMPLETE", {"success": True})
+        assert payload["model_pool"]["hits"] == 0
+        assert payload["model_pool"]["budget_mb"] == 100
+
+    def test_selector_decision_is_cached(self):
+        """測試選擇器決策依偏好設定快取，且返回副本"""
+        state = ResidentState()
+        calls = []
+
+        def select():
+            calls.append(1)
+            return {"device": "cpu"}, "CPU INT8"
+
+        config, _ = state.get_selector_decision({"enable_gpu": False}, select)
+        config["device"] = "mutated"
+        config, _ = state.get_selector_decision({"enable_gpu": False}, select)
+
+        assert config["device"] == "cpu"
+        assert len(calls) == 1
+        assert state.stats["selector_reuses"] == 1
+
+    def test_selector_decision_persisted(self, tmp_path):
+        """測試指定磁碟快取時，重新啟動的服務不再執行選擇器"""
+        calls = []
+
+        def select():
+            calls.append(1)
+            return {"device": "cpu"}, "CPU INT8"
+
+        fingerprint = lambda: {"cpu_model": "test"}
+        ResidentState(selector_cache=SelectorCache(str(tmp_path), fingerprint=fingerprint)) \
+            .get_selector_decision({}, select)
+        restarted = ResidentState(selector_cache=SelectorCache(str(tmp_path), fingerprint=fingerprint))
+        config, explanation = restarted.get_selector_decision({}, select)
+
+        assert (config, explanation) == ({"device": "cpu"}, "CPU INT8")
+        assert len(calls) == 1
+
+    def test_resident_job_uses_tuned_cpu_config(self, tmp_path, monkeypatch):
+        """測試常駐服務的任務經由選擇器掛鉤取得自動調校後的 CPU 設定"""
+        selector = types.SimpleNamespace(
+            select_optimal_config=lambda preferences=None: ({"device": "cpu", "compute_type": "int8",
+                                                             "model_size": "small"}, "CPU INT8"))
+        module = types.ModuleType("intelligent_model_selector")
+        module.get_intelligent_selector = lambda: selector
+        monkeypatch.setitem(sys.modules, "intelligent_model_selector", module)
+        monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=FakeModel))
+
+        cache = SelectorCache(str(tmp_path), fingerprint=lambda: {"cpu_model": "test"})
+        store_tuning({"model_size": "small",
+                      "best": {"compute_type": "int8_float32", "cpu_threads": 6, "num_workers": 2}}, cache)
+
+        def entry_point(argv):
+            import intelligent_model_selector
+            config, _ = intelligent_model_selector.get_intelligent_selector().select_optimal_config({})
+            print("COMPLETE:" + json.dumps({"success": True, "config": config}))
+            return 0
+
+        stdin = io.StringIO(json.dumps({"id": "t"}) + "\n")
+        stdout = io.StringIO()
+        server = BackendServer(entry_point=entry_point, input_stream=stdin, output_stream=stdout,
+                               state=ResidentState(ModelPool(budget_mb=100), cache), resident_hooks=True)
+        # 掛鉤延後到第一個任務才安裝，READY 之前不匯入 faster_whisper
+        assert sys.modules["faster_whisper"].WhisperModel is FakeModel
+        server.serve()
+        assert isinstance(sys.modules["faster_whisper"].WhisperModel, ResidentModelFactory)
+        config = dict(parse_events(stdout.getvalue()))["COMPLETE"]["config"]
+
+        assert (config["compute_type"], config["cpu_threads"], config["num_workers"]) == ("int8_float32", 6, 2)
+        assert config["tuned"] is True
+
+    def test_runs_selected_backend_script(self, tmp_path, monkeypatch):
+        """測試以 --backend 指定的腳本執行任務，而不是固定匯入 electron_backend"""
+        script = tmp_path / "enhanced_backend_for_test.py"
+        script.write_text(
+            "import json, sys\n"
+            "def main():\n"
+            "    print('COMPLETE:' + json.dumps({'success': True, 'argv': sys.argv}))\n"
+            "    return 0\n",
+            encoding="utf-8")
+        monkeypatch.setattr(sys, "path", list(sys.path))
+        monkeypatch.delitem(sys.modules, "enhanced_backend_for_test", raising=False)
+
+        stdin = io.StringIO(json.dumps({"id": "b", "files": ["a.wav"]}) + "\n")
+        stdout = io.StringIO()
+        BackendServer(input_stream=stdin, output_stream=stdout, backend=str(script)).serve()
+        sys.modules.pop("enhanced_backend_for_test", None)
+        events = dict(parse_events(stdout.getvalue()))
+
+        assert events["COMPLETE"]["argv"][:3] == [str(script), "--files", '["a.wav"]']
+        assert events["JOB_DONE"]["exit_code"] == 0
+
+    def test_selector_cache_created_on_first_job(self, tmp_path):
+        """測試磁碟決策快取在第一個任務時才建立，READY 之前不匯入 audio_cache (numpy)"""
+        created = []
+
+        def factory():
+            created.append(SelectorCache(str(tmp_path), fingerprint=lambda: {"cpu_model": "test"}))
+            return created[-1]
+
+        stdin = io.StringIO("\n".join(json.dumps({"id": i}) for i in ("a", "b")) + "\n")
+        server = BackendServer(entry_point=lambda argv: 0, input_stream=stdin, output_stream=io.StringIO(),
+                               selector_cache_factory=factory)
+        assert server.state.selector_cache is None
+        server.serve()
+
+        assert len(created) == 1
+        assert server.state.selector_cache is created[0]
+
+    def test_stopped_job_resumes_from_checkpoint(self, tmp_path):
+        """測試任務中斷後，相同檔案與設定的任務從檢查點續傳，不重新解碼已完成的段落"""
+        source = tmp_path / "lecture.wav"
+        source.write_bytes(b"RIFF" + b"\0" * 100)
+        settings = {"model": "small", "checkpointDir": str(tmp_path / "ckpt"), "checkpointInterval": 0}
+        state = ResidentState(ModelPool(budget_mb=10000))
+        factory = ResidentModelFactory(TranscribingModel, state)
+        TranscribingModel.calls = []
+
+        def interrupted(argv):
+            segments, _ = factory("small").transcribe(str(source), language=None)
+            next(segments), next(segments)
+            raise KeyboardInterrupt("stopped")
+
+        def complete(argv):
+            segments, info = factory("small").transcribe(str(source), language=None)
+            print("COMPLETE:" + json.dumps({"success": True, "texts": [s.text for s in segments]}))
+            return 0
+
+        with pytest.raises(KeyboardInterrupt):
+            BackendServer(entry_point=interrupted, state=state, output_stream=io.StringIO(),
+                          input_stream=io.StringIO(json.dumps({"id": "a", "settings": settings}) + "\n")).serve()
+        assert list((tmp_path / "ckpt").glob("*.json"))
+
+        stdout = io.StringIO()
+        BackendServer(entry_point=complete, state=state, output_stream=stdout,
+                      input_stream=io.StringIO(json.dumps({"id": "b", "settings": settings}) + "\n")).serve()
+
+        assert dict(parse_events(stdout.getvalue()))["COMPLETE"]["texts"] == ["s0", "s1", "s2", "s3"]
+        assert TranscribingModel.calls[1] == {"language": "en", "clip_timestamps": [2.0]}
+        assert not list((tmp_path / "ckpt").glob("*.json"))
+
+    def test_preload_starts_from_selector_decision(self):
+        """測試模型鍵未知的第一個任務在取得選擇器決策時就開始預載，後端建立模型時直接取用"""
+        state = ResidentState(ModelPool(budget_mb=100000))
+        factory = ResidentModelFactory(FakeModel, state)
+        decision = ({"model_size": "medium", "compute_type": "int8", "device": "cpu", "cpu_threads": 2}, "CPU")
+
+        def entry_point(argv):
+            config, _ = state.get_selector_decision({}, lambda: decision)
+            model = factory(config["model_size"], device=config["device"], compute_type=config["compute_type"],
+                            cpu_threads=config["cpu_threads"])
+            print(f'COMPLETE:{{"success": true, "model": "{model.size}"}}')
+            return 0
+
+        before = FakeModel.instances
+        stdout = io.StringIO()
+        BackendServer(entry_point=entry_point, input_stream=io.StringIO(json.dumps({"id": "d"}) + "\n"),
+                      output_stream=stdout, state=state, preload=True, model_factory=factory).serve()
+        complete = dict(parse_events(stdout.getvalue()))["COMPLETE"]
+
+        assert complete["preload"]["key"] == ["medium", "int8", "cpu", 2]
+        assert complete["preload"]["wait_time"] is not None
+        assert FakeModel.instances == before + 1
@@ -0,0 +1,123 @@
+"""
+批次管線單元測試
+測試階段重疊、順序、預取上限與錯誤隔離
+"""
+
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from batch_pipeline import BatchPipeline
+
+
+class TestBatchPipeline:
+    """批次管線測試類"""
+
+    def test_results_keep_input_order(self):
+        """測試結果順序與輸入一致，且每個檔案都寫出"""
+        written = []
+        pipeline = BatchPipeline(
+            prepare=lambda path: path.upper(),
+            infer=lambda path, prepared: prepared + "!",
+            write=lambda path, result: written.append(result) or result,
+        )
+
+        results = pipeline.run(["a", "b", "c"])
+
+        assert [r.output for r in results] == ["A!", "B!", "C!"]
+        assert written == ["A!", "B!", "C!"]
+        assert all(r.success for r in results)
+
+    def test_stages_overlap(self):
+        """測試解碼與推理重疊執行，總時間小於各階段相加"""
+        def prepare(path):
+            time.sleep(0.05)
+            return path
+
+        def infer(path, prepared):
+            time.sleep(0.05)
+            return prepared
+
+        def write(path, result):
+            time.sleep(0.02)
+            return result
+
+        pipeline = BatchPipeline(prepare, infer, write, prepare_workers=2)
+        results = pipeline.run([str(i) for i in range(6)])
+
+        assert all(r.success for r in results)
+        assert pipeline.stats["wall_time"] < pipeline.stats["serial_time"] * 0.8
+
+    def test_prefetch_is_bounded(self):
+        """測試預先準備的檔案數不超過 max_prefetch"""
+        lock = threading.Lock()
+        state = {"prepared": 0, "consumed": 0, "max_ahead": 0}
+
+        def prepare(path):
+            with lock:
+                state["prepared"] += 1
+                state["max_ahead"] = max(state["max_ahead"], state["prepared"] - state["consumed"])
+            return path
+
+        def infer(path, prepared):
+            time.sleep(0.01)
+            with lock:
+                state["consumed"] += 1
+            return prepared
+
+        pipeline = BatchPipeline(prepare, infer, lambda path, result: result,
+                                 prepare_workers=4, max_prefetch=2)
+        pipeline.run([str(i) for i in range(10)])
+
+        assert state["max_ahead"] <= 3  # 預取 2 個 + 正在推理的 1 個
+
+    def test_failures_are_isolated(self):
+        """測試單一檔案失敗不影響其他檔案"""
+        def prepare(path):
+            if path == "bad_decode":
+                raise ValueError("decode failed")
+            return path
+
+        def infer(path, prepared):
+            if path == "bad_infer":
+                raise RuntimeError("infer failed")
+            return prepared
+
+        events = []
+        pipeline = BatchPipeline(prepare, infer, lambda path, result: result,
+                                 on_event=lambda stage, result: events.append((stage, result.path)))
+        results = pipeline.run(["ok1", "bad_decode", "bad_infer", "ok2"])
+
+        assert [r.success for r in results] == [True, False, False, True]
+        assert results[1].stage == "prepare"
+        assert results[2].stage == "infer"
+        assert results[2].error == "infer failed"
+        assert ("failed", "bad_decode") in events
+
+    def test_prepared_data_freed_after_infer(self):
+        """測試推理完成後解碼資料即被釋放，不被已完成的 future 保留"""
+        class Decoded:
+            pass
+
+        refs = {}
+        alive_after_infer = []
+
+        def prepare(path):
+            decoded = Decoded()
+            refs[path] = weakref.ref(decoded)
+            return decoded
+
+        def on_event(stage, result):
+            if stage == "inferred" and refs[result.path]() is not None:
+                alive_after_infer.append(result.path)
+
+        pipeline = BatchPipeline(prepare, lambda path, prepared: path,
+                                 lambda path, result: result, on_event=on_event)
+        results = pipeline.run(["0", "1", "2"])
+
+        assert all(r.success for r in results)
+        assert alive_after_infer == []
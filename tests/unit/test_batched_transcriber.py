@@ -0,0 +1,124 @@
+"""
+批次轉錄單元測試
+測試語音區段打包、多檔案時間軸與時間戳映射
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from batched_transcriber import BatchedTranscriber, PackedTimeline, pack_regions
+
+SR = 16000
+
+
+class BurstModel:
+    """每個連續非零區段輸出一個段落，模擬 WhisperModel.transcribe 的介面"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(len(audio) / SR)
+        active = np.abs(audio) > 0.05
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+        segments = []
+        for start, end in zip(edges[0::2] / SR, edges[1::2] / SR):
+            word = SimpleNamespace(start=start, end=end, word=" burst", probability=0.9)
+            segments.append(SimpleNamespace(start=start, end=end, text="burst", avg_logprob=-0.2,
+                                            no_speech_prob=0.01, compression_ratio=1.2, words=[word]))
+        return iter(segments), SimpleNamespace(language="en")
+
+
+class SlicingPipeline:
+    """模擬 faster-whisper ≥1.1 的 BatchedInferencePipeline：clip_timestamps 為樣本索引"""
+
+    def __init__(self):
+        self.model = BurstModel()
+        self.clips = None
+
+    def transcribe(self, audio, clip_timestamps, vad_filter, batch_size, **kwargs):
+        self.clips = clip_timestamps
+        segments = []
+        for clip in clip_timestamps:
+            offset = clip["start"] / SR
+            chunk_segments, _ = self.model.transcribe(audio[clip["start"]:clip["end"]])
+            for segment in chunk_segments:
+                words = [SimpleNamespace(**dict(vars(w), start=w.start + offset, end=w.end + offset))
+                         for w in segment.words]
+                segments.append(SimpleNamespace(**dict(vars(segment), start=segment.start + offset,
+                                                       end=segment.end + offset, words=words)))
+        return iter(segments), SimpleNamespace(language="en")
+
+
+def bursts(seconds, regions):
+    audio = np.zeros(int(seconds * SR), dtype=np.float32)
+    for start, end in regions:
+        audio[int(start * SR):int(end * SR)] = 0.5
+    return audio
+
+
+class TestBatchedTranscriber:
+    """批次轉錄測試類"""
+
+    def test_pack_regions_respects_window(self):
+        """測試打包不超過視窗長度且長區段會被切開"""
+        windows = pack_regions(np.array([[0, 10], [20, 35], [40, 100]]), window_seconds=30, gap_seconds=0.1)
+        for pieces in windows:
+            assert sum(e - s for s, e in pieces) + 0.1 * (len(pieces) - 1) <= 30 + 1e-9
+        covered = sum(e - s for pieces in windows for s, e in pieces)
+        assert covered == pytest.approx(10 + 15 + 60)
+        assert windows[0] == [(0.0, 10.0), (20.0, 35.0), (40.0, pytest.approx(44.8))]
+
+    def test_timestamps_map_back_to_original(self):
+        """測試跨檔案打包後，段落與詞級時間戳回到各自檔案的原始時間"""
+        regions_a = [(5.0, 7.0), (60.0, 61.5)]
+        regions_b = [(2.0, 3.0)]
+        audio_a, audio_b = bursts(90, regions_a), bursts(10, regions_b)
+
+        transcriber = BatchedTranscriber(BurstModel())
+        results = transcriber.transcribe([audio_a, audio_b], regions=[np.array(regions_a), np.array(regions_b)])
+
+        assert [(round(s["start"], 2), round(s["end"], 2)) for s in results[0]] == regions_a
+        assert [(round(s["start"], 2), round(s["end"], 2)) for s in results[1]] == regions_b
+        assert results[0][1]["words"][0]["start"] == pytest.approx(60.0, abs=0.01)
+        assert transcriber.stats["packed_seconds"] < 5.0
+        assert transcriber.stats["windows"] == 2
+
+    def test_batched_pipeline_receives_sample_indices(self):
+        """測試 BatchedInferencePipeline 路徑：視窗以樣本索引傳入，段落時間回到原始時間"""
+        regions_a = [(5.0, 7.0), (60.0, 61.5)]
+        regions_b = [(2.0, 3.0)]
+        audio_a, audio_b = bursts(90, regions_a), bursts(10, regions_b)
+
+        transcriber = BatchedTranscriber(BurstModel())
+        transcriber._pipeline = pipeline = SlicingPipeline()
+        results = transcriber.transcribe([audio_a, audio_b], regions=[np.array(regions_a), np.array(regions_b)])
+
+        assert all(isinstance(c["start"], int) and isinstance(c["end"], int) for c in pipeline.clips)
+        assert pipeline.clips[-1]["end"] == int(round(transcriber.stats["packed_seconds"] * SR))
+        assert [(round(s["start"], 2), round(s["end"], 2)) for s in results[0]] == regions_a
+        assert [(round(s["start"], 2), round(s["end"], 2)) for s in results[1]] == regions_b
+        assert results[0][1]["words"][0]["start"] == pytest.approx(60.0, abs=0.01)
+
+    def test_gap_times_clamp_to_piece_end(self):
+        """測試落在片段間隙的時間不會超出前一片段"""
+        timeline = PackedTimeline(gap_seconds=1.0)
+        timeline.add_window(0, np.zeros(SR * 20), [(2.0, 4.0), (10.0, 12.0)])
+        owners, ends = timeline.locate([2.5, 3.0, 3.5], side="left")
+        _, starts = timeline.locate([3.0], side="right")
+        np.testing.assert_allclose(ends, [4.0, 4.0, 10.5])   # 終點停在接縫之前
+        np.testing.assert_allclose(starts, [10.0])            # 起點從下一片段開始
+        assert owners.tolist() == [0, 0, 0]
+
+    def test_no_speech(self):
+        """測試沒有語音區段時不呼叫模型"""
+        model = BurstModel()
+        results = BatchedTranscriber(model).transcribe([np.zeros(SR)], regions=[np.zeros((0, 2))])
+        assert results == [[]]
+        assert model.calls == []
@@ -0,0 +1,115 @@
+"""
+重疊分段拼接單元測試
+測試詞對齊、重疊區去重與信心度選擇
+"""
+
+import sys
+from pathlib import Path
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+import chunk_stitcher
+from chunk_stitcher import align_words, normalize_word, stitch_chunks, stitch_pair, words_similar
+
+
+def make_segment(words, probability=0.9):
+    """words: [(文字, 起點, 終點) 或 (文字, 起點, 終點, 信心度)]"""
+    items = [{"word": f" {w[0]}", "start": w[1], "end": w[2],
+              "probability": w[3] if len(w) > 3 else probability} for w in words]
+    return {"start": items[0]["start"], "end": items[-1]["end"],
+            "text": "".join(w["word"] for w in items).strip(),
+            "avg_logprob": -0.2, "no_speech_prob": 0.0, "compression_ratio": 1.2, "words": items}
+
+
+def texts(segments):
+    return " ".join(s["text"] for s in segments).split()
+
+
+class TestChunkStitcher:
+    """重疊分段拼接測試類"""
+
+    def test_word_similarity(self):
+        """測試標點、大小寫與截斷詞的比對"""
+        assert normalize_word(" Hello,") == "hello"
+        assert words_similar("World.", "world")
+        assert words_similar("transcrip", "transcription")
+        assert not words_similar("a", "and")
+        assert not words_similar("cat", "dog")
+
+    def test_align_is_monotonic(self):
+        """測試對齊結果為遞增的錨點"""
+        left = make_segment([("the", 0.0, 0.2), ("quick", 0.3, 0.5), ("brown", 0.6, 0.8)])["words"]
+        right = make_segment([("uick", 0.35, 0.5), ("brown", 0.62, 0.8), ("fox", 0.9, 1.1)])["words"]
+        assert align_words(left, right) == [(2, 1)]
+
+    def test_overlap_words_not_duplicated(self):
+        """測試重疊區內的詞只出現一次"""
+        left = [make_segment([("one", 8.0, 8.4), ("two", 8.5, 8.9)]),
+                make_segment([("three", 9.5, 9.9), ("four", 10.1, 10.5), ("fi", 10.8, 11.0, 0.2)])]
+        right = [make_segment([("three", 9.52, 9.9), ("four", 10.1, 10.5), ("five", 10.8, 11.2)]),
+                 make_segment([("six", 11.5, 11.9)])]
+        stitched = stitch_pair(left, right, 9.0, 11.0)
+
+        assert texts(stitched) == ["one", "two", "three", "four", "five", "six"]
+        starts = [w["start"] for s in stitched for w in s["words"]]
+        assert starts == sorted(starts)
+
+    def test_higher_confidence_side_kept(self):
+        """測試接縫選在保留信心度較高版本的錨點"""
+        left = [make_segment([("alpha", 4.0, 4.4), ("bet", 4.6, 4.9, 0.3), ("gamma", 5.2, 5.6)])]
+        right = [make_segment([("alpha", 4.0, 4.4), ("beta", 4.6, 5.0, 0.95), ("gamma", 5.2, 5.6),
+                               ("delta", 6.5, 6.9)])]
+        stitched = stitch_pair(left, right, 3.5, 6.0)
+        assert texts(stitched) == ["alpha", "beta", "gamma", "delta"]
+
+    def test_sentence_across_seam_stays_one_segment(self):
+        """測試信心度交錯時仍只有一個接縫，跨越接縫的句子保持為一個段落"""
+        words = ["hello", "there", "big", "world", "again", "today"]
+        times = [(7.0 + 0.5 * i, 7.4 + 0.5 * i) for i in range(len(words))]
+        left = [make_segment([(w, s, e, 0.9 if i % 2 else 0.6)
+                              for i, (w, (s, e)) in enumerate(zip(words[:5], times))])]
+        right = [make_segment([(w, s, e, 0.6 if i % 2 else 0.9)
+                               for i, (w, (s, e)) in enumerate(zip(words, times))])]
+        stitched = stitch_pair(left, right, 7.0, 9.5)
+
+        assert len(stitched) == 1
+        assert stitched[0]["text"] == "hello there big world again today"
+        assert (stitched[0]["start"], stitched[0]["end"]) == (7.0, 9.9)
+
+    def test_only_tail_is_restitched(self, monkeypatch):
+        """測試每次拼接只傳入與重疊區相交的尾端段落"""
+        calls = []
+        original = chunk_stitcher.stitch_pair
+        monkeypatch.setattr(chunk_stitcher, "stitch_pair",
+                            lambda left, *args: calls.append(len(left)) or original(left, *args))
+        chunks = []
+        for index in range(20):
+            start = index * 10.0
+            segments = [make_segment([(f"w{index}{k}", start + 2 * k + 0.5, start + 2 * k + 1.0)])
+                        for k in range(6)]
+            chunks.append((segments, start - 2.0 if index else 0.0, start + 12.0))
+        stitched = stitch_chunks(chunks)
+
+        assert max(calls) <= 2
+        assert len(stitched) == 20 * 5 + 1
+        starts = [s["start"] for s in stitched]
+        assert starts == sorted(starts)
+
+    def test_whole_segment_keeps_original_text(self):
+        """測試未被切開的段落保留原始文字與欄位"""
+        segment = make_segment([("hello", 1.0, 1.4), ("world", 1.5, 1.9)])
+        segment["text"] = "Hello, world!"
+        later = make_segment([("again", 20.0, 20.4)])
+        stitched = stitch_chunks([([segment], 0.0, 10.0), ([later], 10.0, 30.0)])
+        assert stitched[0]["text"] == "Hello, world!"
+        assert stitched[0]["avg_logprob"] == -0.2
+        assert len(stitched) == 2
+
+    def test_fallback_without_words(self):
+        """測試沒有詞級時間戳時以重疊區中點切開"""
+        left = [{"start": 1.0, "end": 2.0, "text": "a", "words": []},
+                {"start": 9.0, "end": 9.8, "text": "b", "words": []}]
+        right = [{"start": 9.05, "end": 9.8, "text": "b", "words": []},
+                 {"start": 10.5, "end": 11.0, "text": "c", "words": []}]
+        stitched = stitch_chunks([(left, 0.0, 10.5), (right, 9.5, 20.0)])
+        assert [s["text"] for s in stitched] == ["a", "b", "c"]
@@ -0,0 +1,145 @@
+"""
+CPU 參數自動調校單元測試
+測試候選組合、準確度容忍度、結果保存與選擇器套用
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from cpu_autotuner import (TuneConfig, apply_tuned_config, autotune, candidate_grid, store_tuning,
+                           synthetic_clip, tuned_config)
+from selector_cache import SelectorCache
+
+# 每種 compute_type 的模擬解碼耗時 (秒) 與輸出文字
+COSTS = {"float32": 4.0, "int8_float32": 2.0, "int8": 1.0}
+TEXTS = {"float32": "the quick brown fox", "int8_float32": "the quick brown fox", "int8": "a quack brawn fax"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CostModel:
+    """解碼時推進假時鐘；執行緒越多越快"""
+
+    def __init__(self, key, clock):
+        self.key = key
+        self.clock = clock
+
+    def transcribe(self, audio, **options):
+        assert options["beam_size"] == 1 and options["temperature"] == 0.0
+        self.clock.now += COSTS[self.key.compute_type] / self.key.cpu_threads
+        return iter([SimpleNamespace(text=TEXTS[self.key.compute_type])]), None
+
+
+# 合成音頻上每種 compute_type 都輸出空白文字，只有 encoder 輸出看得出量化誤差
+ENCODER_NOISE = {"float32": 0.0, "int8_float32": 0.02, "int8": 0.3}
+
+
+class EncoderModel(CostModel):
+    """文字全部為空、encoder 輸出依 compute_type 偏離參考的假模型"""
+
+    def __init__(self, key, clock):
+        super().__init__(key, clock)
+        self.feature_extractor = lambda audio: np.ones((80, len(audio) // 160), dtype=np.float32)
+        self.feature_extractor.nb_max_frames = 3000
+
+    def transcribe(self, audio, **options):
+        self.clock.now += COSTS[self.key.compute_type] / self.key.cpu_threads
+        return iter([]), None
+
+    def encode(self, features):
+        assert features.shape == (80, 3000)
+        reference = np.linspace(-1, 1, 1500 * 4, dtype=np.float32).reshape(1, 1500, 4)
+        return reference * (1 + ENCODER_NOISE[self.key.compute_type])
+
+
+def fake_loader(clock, loaded, model_cls=CostModel):
+    def load(key, num_workers=1):
+        loaded.append((key, num_workers))
+        return model_cls(key, clock)
+    return load
+
+
+class TestCpuAutotuner:
+    """CPU 參數自動調校測試類"""
+
+    def test_synthetic_clip_is_deterministic(self):
+        """測試合成音頻固定且振幅正規化"""
+        a, b = synthetic_clip(), synthetic_clip()
+        np.testing.assert_array_equal(a, b)
+        assert a.dtype == np.float32 and abs(np.max(np.abs(a)) - 0.5) < 1e-6
+        assert len(a) == 8 * 16000
+
+    def test_grid_respects_cores(self):
+        """測試候選組合的總執行緒數不超過邏輯核心數"""
+        grid = candidate_grid(logical=8, physical=4)
+        assert TuneConfig("int8", 2, 1) in grid and TuneConfig("int8", 8, 1) in grid
+        assert TuneConfig("float32", 1, 4) in grid
+        assert all(c.cpu_threads * c.num_workers <= 8 for c in grid)
+        assert candidate_grid(logical=1, physical=1, compute_types=["int8"]) == [TuneConfig("int8", 1, 1)]
+
+    def test_fastest_within_tolerance(self):
+        """測試選出容忍度內最快的設定，文字偏差過大的設定被排除"""
+        clock, loaded = FakeClock(), []
+        grid = [TuneConfig(ct, threads, 1) for ct in COSTS for threads in (2, 4)]
+        result = autotune("small", loader=fake_loader(clock, loaded), grid=grid,
+                          audio=np.zeros(16000 * 4, dtype=np.float32), timer=clock)
+
+        assert result["best"] == {"compute_type": "int8_float32", "cpu_threads": 4, "num_workers": 1}
+        assert abs(result["best_rtf"] - 0.125) < 1e-9
+        rejected = [r for r in result["results"] if not r["accepted"]]
+        assert {r["compute_type"] for r in rejected} == {"int8"}
+        # 參考設定最先量測
+        assert loaded[0][0].compute_type == "float32" and loaded[0][0].cpu_threads == 4
+
+        loose = autotune("small", loader=fake_loader(clock, []), grid=grid, tolerance=1.0,
+                         audio=np.zeros(16000 * 4, dtype=np.float32), timer=clock)
+        assert loose["best"]["compute_type"] == "int8"
+
+    def test_workers_measure_throughput(self):
+        """測試多副本的 RTF 以總音頻長度計算"""
+        clock = FakeClock()
+        result = autotune("small", loader=fake_loader(clock, []), grid=[TuneConfig("float32", 2, 2)],
+                          audio=np.zeros(16000 * 4, dtype=np.float32), timer=clock)
+        assert abs(result["results"][0]["rtf"] - 0.5) < 1e-9
+
+    def test_stored_result_applied_to_selector(self, tmp_path):
+        """測試保存的結果覆寫選擇器的 CPU 決策，GPU 決策不受影響"""
+        cache = SelectorCache(str(tmp_path), fingerprint=lambda: {"cpu_model": "test"})
+        assert apply_tuned_config(({"device": "cpu", "compute_type": "int8"}, "CPU INT8"), cache)[0] \
+            == {"device": "cpu", "compute_type": "int8"}
+
+        store_tuning({"model_size": "small",
+                      "best": {"compute_type": "int8_float32", "cpu_threads": 6, "num_workers": 2}}, cache)
+        assert tuned_config("small", cache)["cpu_threads"] == 6
+        assert tuned_config("medium", cache)["cpu_threads"] == 6
+
+        config, explanation = apply_tuned_config(({"device": "cpu", "compute_type": "int8"}, "CPU INT8"), cache)
+        assert config == {"device": "cpu", "compute_type": "int8_float32", "cpu_threads": 6,
+                          "num_workers": 2, "tuned": True}
+        assert explanation == "CPU INT8"
+        gpu = {"device": "cuda", "compute_type": "float16"}
+        assert apply_tuned_config(gpu, cache) is gpu
+
+    def test_encoder_divergence_rejects_quantization_without_speech(self):
+        """測試文字都為空 (合成音頻) 時，仍以 encoder 輸出誤差排除偏離過大的 int8"""
+        clock = FakeClock()
+        grid = [TuneConfig(ct, 4, 1) for ct in COSTS]
+        result = autotune("small", loader=fake_loader(clock, [], EncoderModel), grid=grid,
+                          audio=np.zeros(16000 * 4, dtype=np.float32), timer=clock)
+
+        errors = {r["compute_type"]: r["encoder_error"] for r in result["results"]}
+        assert errors["float32"] == 0.0
+        assert abs(errors["int8"] - 0.3) < 1e-6
+        assert result["best"]["compute_type"] == "int8_float32"
+        assert all("encoder" not in r for r in result["results"])
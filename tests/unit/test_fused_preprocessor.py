@@ -0,0 +1,88 @@
+"""
+融合式預處理單元測試
+測試 STFT 完美重建、原地處理，以及壓縮、語音增強與降噪效果
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from fused_preprocessor import FusedPreprocessor, StreamingSTFT
+
+
+def calculate_snr(signal, noise):
+    return 10 * np.log10(np.mean(signal ** 2) / np.mean(noise ** 2))
+
+
+class TestFusedPreprocessor:
+    """融合式預處理測試類"""
+
+    @pytest.mark.parametrize("length", [1, 255, 16000, 16000 * 3 + 123])
+    def test_stft_unity_gain_reconstructs_input(self, length):
+        """測試單位增益時 STFT/重疊相加完美重建，包含首尾樣本"""
+        audio = np.random.default_rng(0).standard_normal(length).astype(np.float32)
+        processed = StreamingSTFT(512, [lambda spectra, power: 1.0], frames_per_batch=7).process(audio.copy())
+        np.testing.assert_allclose(processed, audio, atol=1e-5)
+
+    def test_inplace_reuses_buffer(self):
+        """測試 inplace=True 時不配置新的完整長度陣列"""
+        audio = np.random.default_rng(1).standard_normal(16000).astype(np.float32)
+        processed = FusedPreprocessor().process(audio, inplace=True)
+        assert processed is audio
+
+        original = np.random.default_rng(1).standard_normal(16000)
+        copy = original.copy()
+        processed = FusedPreprocessor().process(original)
+        assert processed.dtype == np.float32
+        np.testing.assert_array_equal(original, copy)
+
+    def test_normalize_and_compress(self):
+        """測試正規化與壓縮後峰值受控且動態範圍縮小"""
+        t = np.linspace(0, 1, 16000)
+        audio = (np.sin(2 * np.pi * 440 * t) * np.linspace(0.05, 3.0, len(t))).astype(np.float32)
+        processed = FusedPreprocessor(enable_enhancement=False, enable_denoise=False).process(audio)
+
+        assert np.max(np.abs(processed)) <= 1.0
+        crest_before = np.max(np.abs(audio)) / np.sqrt(np.mean(audio ** 2))
+        crest_after = np.max(np.abs(processed)) / np.sqrt(np.mean(processed ** 2))
+        assert crest_after < crest_before
+
+    def test_speech_band_enhancement(self):
+        """測試 300-3000 Hz 頻段能量佔比提高"""
+        from scipy import signal
+
+        sr = 16000
+        audio = np.random.default_rng(2).normal(0, 0.1, sr * 2).astype(np.float32)
+        processed = FusedPreprocessor(enable_normalize=False, enable_compression=False,
+                                      enable_denoise=False).process(audio)
+
+        def band_fraction(x):
+            freqs, power = signal.periodogram(x, sr)
+            band = (freqs >= 300) & (freqs <= 3000)
+            return power[band].sum() / power.sum()
+
+        assert band_fraction(processed) > band_fraction(audio) * 1.1
+
+    def test_denoise_improves_snr(self):
+        """測試降噪提升正弦波加白噪音的信噪比"""
+        sr = 16000
+        t = np.linspace(0, 2, 2 * sr)
+        clean = np.sin(2 * np.pi * 440 * t)
+        noisy = clean + np.random.default_rng(3).normal(0, 0.5, len(t))
+
+        denoised = FusedPreprocessor(enable_normalize=False, enable_compression=False,
+                                     enable_enhancement=False).process(noisy)
+
+        assert calculate_snr(clean, denoised - clean) > calculate_snr(clean, noisy - clean) + 1.0
+
+    def test_edge_cases(self):
+        """測試空陣列與靜音"""
+        processor = FusedPreprocessor()
+        assert len(processor.process(np.zeros(0, dtype=np.float32))) == 0
+        silent = processor.process(np.zeros(4000, dtype=np.float32))
+        assert np.all(np.isfinite(silent))
+        assert np.max(np.abs(silent)) == 0
@@ -0,0 +1,85 @@
+"""
+匯入時間報告單元測試
+測試 -X importtime 輸出解析，並確認後端模組匯入時不載入重量級依賴
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from import_profile import parse_importtime, profile_imports, profile_until_event, summarize, wait_for_event
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2100 | site
+import time:       300 |        300 |       numpy._core
+import time:       900 |       1200 |     numpy
+import time:        50 |         50 |     torch.version
+import time:       400 |       1650 |   heavy_user
+import time:       100 |       1750 | backend
+"""
+
+
+class TestImportProfile:
+    """匯入時間報告測試類"""
+
+    def test_parse_importtime(self):
+        """測試解析自身/累計耗時與巢狀深度"""
+        records = parse_importtime(SAMPLE)
+        assert [r["module"] for r in records] == ["_io", "site", "numpy._core", "numpy", "torch.version",
+                                                   "heavy_user", "backend"]
+        assert records[0] == {"module": "_io", "self_us": 120, "cumulative_us": 120, "depth": 1}
+        assert [r["depth"] for r in records[2:]] == [3, 2, 2, 1, 0]
+
+    def test_summarize(self):
+        """測試依套件彙總並列出重量級依賴"""
+        summary = summarize(parse_importtime(SAMPLE), top=2)
+        assert summary["total_us"] == 2100 + 1750
+        assert summary["packages"] == {"site": 2000, "numpy": 1200}
+        assert summary["heavy_imported"] == ["torch"]
+        assert summary["slowest_modules"][0]["module"] == "site"
+
+    @pytest.mark.parametrize("module", ["backend_server", "model_preloader", "selector_cache",
+                                        "streaming_decoder", "parallel_transcriber", "onnx_vad"])
+    def test_backend_modules_import_lazily(self, module):
+        """測試後端模組匯入時不載入 torch、faster_whisper、onnxruntime 等重量級依賴"""
+        report = profile_imports(module)
+        assert report["ok"], report.get("error")
+        assert report["heavy_imported"] == []
+        assert report["module_us"] > 0
+
+    def test_server_does_not_import_numpy(self):
+        """測試常駐服務在收到任務前不需要 numpy"""
+        report = profile_imports("backend_server", top=1000)
+        assert "numpy" not in report["packages"]
+
+    def test_server_ready_without_heavy_imports(self, tmp_path, monkeypatch):
+        """測試以 main.js 的參數 (含常駐掛鉤與決策快取) 啟動服務時，READY 之前不匯入 faster_whisper 與 numpy"""
+        package = tmp_path / "faster_whisper"
+        package.mkdir()
+        (package / "__init__.py").write_text("class WhisperModel:\n    pass\n", encoding="utf-8")
+        monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+
+        report = profile_until_event(["backend_server.py", "--backend", str(tmp_path / "electron_backend.py")],
+                                     "READY:", timeout=60, top=1000)
+        assert report["ok"]
+        assert report["heavy_imported"] == []
+        assert "numpy" not in report["packages"]
+
+    def test_wait_for_event_times_out_on_silent_child(self):
+        """測試子行程不輸出任何內容時在逾時後返回"""
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"],
+                                   stdout=subprocess.PIPE, text=True)
+        try:
+            start = time.perf_counter()
+            assert wait_for_event(process, "READY:", 0.5) is None
+            assert time.perf_counter() - start < 5
+        finally:
+            process.kill()
+            process.wait()
+            process.stdout.close()
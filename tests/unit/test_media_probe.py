@@ -0,0 +1,72 @@
+"""
+媒體標頭探測單元測試
+測試 WAV 標頭解析、(路徑, mtime, 大小) 快取與多檔案探測
+"""
+
+import os
+import sys
+import wave
+from pathlib import Path
+
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+import media_probe
+from media_probe import MediaProbeCache, probe_duration, probe_files, probe_media
+
+
+def write_wav(path, seconds, sample_rate=16000, channels=1):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\x00\x00" * channels * int(seconds * sample_rate))
+    return str(path)
+
+
+class TestMediaProbe:
+    """媒體標頭探測測試類"""
+
+    def test_wav_header(self, tmp_path):
+        """測試 WAV 只讀標頭取得時長、取樣率與聲道數"""
+        info = probe_media(write_wav(tmp_path / "a.wav", 2.0, sample_rate=44100, channels=2))
+
+        assert info.duration == pytest.approx(2.0)
+        assert info.sample_rate == 44100
+        assert info.channels == 2
+        assert info.container == "wav"
+
+    def test_cache_hit_skips_probe(self, tmp_path, monkeypatch):
+        """測試同一檔案第二次探測命中快取 (含新的快取實例讀取磁碟)"""
+        path = write_wav(tmp_path / "a.wav", 1.0)
+        cache_dir = str(tmp_path / "cache")
+        assert MediaProbeCache(cache_dir).get(path).duration == pytest.approx(1.0)
+
+        monkeypatch.setattr(media_probe, "probe_media", lambda p: pytest.fail("不應重新探測"))
+        cache = MediaProbeCache(cache_dir)
+        assert cache.get(path).duration == pytest.approx(1.0)
+        assert cache.get(path).duration == pytest.approx(1.0)
+        assert (cache.hits, cache.misses) == (2, 0)
+
+    def test_modified_file_invalidates(self, tmp_path):
+        """測試檔案內容改變 (大小與 mtime) 時重新探測"""
+        path = write_wav(tmp_path / "a.wav", 1.0)
+        cache = MediaProbeCache(str(tmp_path / "cache"))
+        cache.get(path)
+        write_wav(path, 3.0)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+
+        assert cache.get(path).duration == pytest.approx(3.0)
+        assert cache.misses == 2
+
+    def test_probe_files_tolerates_missing(self, tmp_path):
+        """測試多檔案探測：缺失檔案不影響其他檔案，total_duration 為已知部分總和"""
+        cache = MediaProbeCache(str(tmp_path / "cache"))
+        result = probe_files([write_wav(tmp_path / "a.wav", 1.5), str(tmp_path / "missing.wav")], cache)
+
+        assert result["total_duration"] == pytest.approx(1.5)
+        assert result["complete"] is False
+        assert result["files"][1]["duration"] is None
+        assert "error" in result["files"][1]
+        assert probe_duration(str(tmp_path / "missing.wav"), cache) is None
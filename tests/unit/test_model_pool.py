@@ -0,0 +1,119 @@
+"""
+模型常駐池單元測試
+測試 LRU 淘汰、記憶體預算與計數
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from model_pool import ModelPool, ModelKey, estimate_model_mb
+
+
+def fixed_size(size_mb):
+    return lambda key: size_mb
+
+
+class TestModelPool:
+    """模型池測試類"""
+
+    def test_hit_and_miss_counters(self):
+        """測試命中與未命中計數"""
+        pool = ModelPool(budget_mb=1000, estimator=fixed_size(100))
+        key = ("small", "int8", "cuda", 0)
+
+        first = pool.get(key, object)
+        second = pool.get(key, object)
+
+        assert first is second
+        assert pool.stats()["hits"] == 1
+        assert pool.stats()["misses"] == 1
+        assert key in pool
+
+    def test_lru_eviction_within_budget(self):
+        """測試超出預算時淘汰最久未使用的模型"""
+        pool = ModelPool(budget_mb=250, estimator=fixed_size(100))
+        small = ("small", "int8", "cuda", 0)
+        medium = ("medium", "int8", "cuda", 0)
+        large = ("large", "float16", "cuda", 0)
+
+        pool.get(small, object)
+        pool.get(medium, object)
+        pool.get(small, object)  # small 成為最近使用
+        pool.get(large, object)  # 需淘汰 medium
+
+        assert small in pool
+        assert large in pool
+        assert medium not in pool
+        assert pool.evictions == 1
+        assert pool.used_mb <= pool.budget_mb
+
+    def test_oversized_model_still_loads(self):
+        """測試單一模型超過預算時仍可載入，並淘汰其他模型"""
+        pool = ModelPool(budget_mb=50, estimator=fixed_size(100))
+        pool.get(("small", "int8", "cuda", 0), object)
+        pool.get(("large", "int8", "cuda", 0), object)
+
+        assert len(pool) == 1
+        assert pool.evictions == 1
+
+    def test_estimates_scale_with_compute_type(self):
+        """測試估算值依 compute_type 縮放"""
+        int8 = estimate_model_mb(ModelKey("large-v3", "int8", "cpu", 4))
+        fp32 = estimate_model_mb(ModelKey("large-v3", "float32", "cpu", 4))
+        small = estimate_model_mb(ModelKey("small", "int8", "cpu", 4))
+
+        assert fp32 == int8 * 4
+        assert small < int8
+
+    def test_load_does_not_hold_pool_lock(self):
+        """測試載入期間其他鍵的 get 與 stats 不被阻塞，同一鍵只載入一次"""
+        pool = ModelPool(budget_mb=1000, estimator=fixed_size(100))
+        slow = ("large", "int8", "cuda", 0)
+        fast = ("small", "int8", "cuda", 0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_loader():
+            calls.append(slow)
+            started.set()
+            assert release.wait(5)
+            return "large-model"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(pool.get, slow, slow_loader)
+            assert started.wait(5)
+            second = executor.submit(pool.get, slow, slow_loader)
+
+            # 慢載入進行中：其他鍵與 stats 立即返回
+            assert pool.get(fast, lambda: "small-model") == "small-model"
+            assert pool.stats()["loading"] == [list(slow)]
+
+            release.set()
+            assert first.result(5) == "large-model"
+            assert second.result(5) == "large-model"
+
+        assert calls == [slow]
+        assert pool.stats()["misses"] == 2
+        assert pool.stats()["loading"] == []
+
+    def test_failed_load_is_not_cached(self):
+        """測試載入失敗時不留下載入中狀態，之後可重試"""
+        pool = ModelPool(budget_mb=1000, estimator=fixed_size(100))
+        key = ("small", "int8", "cuda", 0)
+
+        def broken():
+            raise RuntimeError("load failed")
+
+        with pytest.raises(RuntimeError):
+            pool.get(key, broken)
+
+        assert key not in pool
+        assert pool.get(key, object) is not None
+        assert pool.stats()["loading"] == []
@@ -0,0 +1,97 @@
+"""
+背景模型預載單元測試
+測試載入與前景工作重疊、錯誤延後拋出與模型設定索引
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from model_pool import ModelKey
+import onnx_vad
+from model_preloader import VAD, WHISPER, Preloader, model_key_from_decision, model_settings, start_preload
+
+
+class SlowModel:
+    def __init__(self, size, device, compute_type, cpu_threads):
+        time.sleep(0.2)
+        self.key = ModelKey(size, compute_type, device, cpu_threads)
+        self.thread = threading.current_thread().name
+
+
+class TestModelPreloader:
+    """背景模型預載測試類"""
+
+    def test_load_overlaps_foreground_work(self):
+        """測試模型載入與前景工作同時進行"""
+        start = time.perf_counter()
+        key = ModelKey("small", "int8", "cpu", 0)
+        with start_preload(key, model_factory=SlowModel) as preloader:
+            time.sleep(0.2)  # 前景解碼與預處理
+            model = preloader.get(WHISPER)
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.35
+        assert model.key == key
+        assert model.thread.startswith("preload")
+        stats = preloader.stats()[WHISPER]
+        assert stats["load_time"] >= 0.2
+        assert stats["wait_time"] < 0.1
+        assert stats["hidden_time"] > 0.1
+
+    def test_start_is_idempotent(self):
+        """測試同名資源只載入一次"""
+        calls = []
+        with Preloader() as preloader:
+            first = preloader.start("x", lambda: calls.append(1) or "loaded")
+            assert preloader.start("x", lambda: calls.append(2)) is first
+            assert preloader.get("x") == "loaded"
+            assert preloader.get_or_load("y", lambda: "direct") == "direct"
+        assert calls == [1]
+
+    def test_errors_raised_when_needed(self):
+        """測試載入失敗時由 get() 拋出原本的例外"""
+        def broken(*args, **kwargs):
+            raise FileNotFoundError("missing model")
+
+        with start_preload(ModelKey("medium", "int8", "cpu", 0), model_factory=broken) as preloader:
+            with pytest.raises(FileNotFoundError):
+                preloader.get(WHISPER)
+            with pytest.raises(KeyError):
+                preloader.get("unknown")
+
+    def test_model_settings(self):
+        """測試只有影響模型選擇的設定會成為索引"""
+        assert model_settings({"model": "large", "enable_gpu": True, "language": "ja", "customDir": "/x"}) \
+            == {"model": "large", "enable_gpu": True}
+        assert model_settings({}) == {"model": None, "enable_gpu": False}
+
+    def test_model_key_from_decision(self):
+        """測試由選擇器決策取得模型鍵，缺少欄位時不猜測"""
+        decision = ({"model_size": "large", "compute_type": "float16", "device": "cuda"}, "GPU")
+        assert model_key_from_decision(decision) == ModelKey("large", "float16", "cuda", 0)
+        assert model_key_from_decision({"model_size": "small", "compute_type": "int8", "device": "cpu",
+                                        "cpu_threads": 4}) == ModelKey("small", "int8", "cpu", 4)
+        assert model_key_from_decision({"compute_type": "int8", "device": "cpu"}) is None
+        assert model_key_from_decision("CPU INT8") is None
+
+    def test_vad_session_preloaded_through_cache(self, monkeypatch):
+        """測試 VAD session 經由 get_session 在背景載入，之後相同參數的呼叫直接命中快取"""
+        calls = []
+
+        def fake_get_session(path, intra, inter=1):
+            calls.append((path, intra, inter, threading.current_thread().name))
+            return "session"
+
+        monkeypatch.setattr(onnx_vad, "find_vad_model", lambda: "/models/silero_encoder_v5.onnx")
+        monkeypatch.setattr(onnx_vad, "get_session", fake_get_session)
+        with start_preload(vad=True) as preloader:
+            assert preloader.get(VAD) == "session"
+            assert WHISPER not in preloader
+        assert calls[0][:3] == ("/models/silero_encoder_v5.onnx", onnx_vad.default_intra_op_threads(), 1)
+        assert calls[0][3].startswith("preload")
@@ -0,0 +1,156 @@
+"""
+批次 VAD 單元測試
+以小型遞迴模型測試車道批次與逐視窗執行的結果一致，以及機率快取整合
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+import onnx_vad
+from onnx_vad import (CONTEXT_SIZE, WINDOW_SIZE, BatchedVad, SplitVadSession, cached_speech_probabilities,
+                      find_vad_model, get_session)
+from vad_probability_cache import VadProbabilityCache
+
+
+class RecurrentSession:
+    """與 Silero v5 相同介面的遞迴模型：狀態以 0.5 衰減累積視窗能量"""
+
+    def __init__(self):
+        self.calls = 0
+        self.batch_sizes = []
+
+    def run(self, output_names, feeds):
+        window, state = feeds["input"], feeds["state"]
+        assert window.shape[1] == CONTEXT_SIZE + WINDOW_SIZE
+        assert state.shape == (2, len(window), 128)
+        self.calls += 1
+        self.batch_sizes.append(len(window))
+
+        energy = np.sqrt(np.mean(window[:, CONTEXT_SIZE:] ** 2, axis=1))
+        context = np.mean(np.abs(window[:, :CONTEXT_SIZE]), axis=1)
+        new_state = state * 0.5
+        new_state[0, :, 0] += energy + 0.1 * context
+        output = 1.0 / (1.0 + np.exp(-10 * (new_state[0, :, 0] - 0.3)))
+        return output[:, None].astype(np.float32), new_state.astype(np.float32)
+
+
+class EncoderSession:
+    """拆分模型的 encoder：[B, 576] → [B, 128, 1]"""
+
+    def run(self, output_names, feeds):
+        window = feeds["input"]
+        features = np.zeros((len(window), 128, 1), dtype=np.float32)
+        features[:, 0, 0] = np.sqrt(np.mean(window[:, CONTEXT_SIZE:] ** 2, axis=1))
+        features[:, 1, 0] = np.mean(np.abs(window[:, :CONTEXT_SIZE]), axis=1)
+        return [features]
+
+
+class DecoderSession:
+    """拆分模型的 decoder：input [B, 128]、state [2, B, 128] → output [B, 1, 1]、state"""
+
+    def run(self, output_names, feeds):
+        features, state = feeds["input"], feeds["state"]
+        assert features.shape == (len(state[0]), 128)
+        new_state = state * 0.5
+        new_state[0, :, 0] += features[:, 0] + 0.1 * features[:, 1]
+        output = 1.0 / (1.0 + np.exp(-10 * (new_state[0, :, 0] - 0.3)))
+        return output[:, None, None].astype(np.float32), new_state.astype(np.float32)
+
+
+def fake_faster_whisper(root, version, assets):
+    """在 root 下建立與 faster-whisper 發行版相同的 assets 目錄結構"""
+    package = root / version / "faster_whisper"
+    (package / "assets").mkdir(parents=True)
+    for name in assets:
+        (package / "assets" / name).write_bytes(b"onnx")
+    return types.SimpleNamespace(__file__=str(package / "__init__.py"))
+
+
+def speech_like(seconds, sample_rate=16000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    gate = (np.sin(2 * np.pi * 0.2 * t) > 0).astype(np.float32)
+    noise = np.random.default_rng(0).normal(0, 0.01, len(t))
+    return (gate * np.sin(2 * np.pi * 300 * t) * 0.5 + noise).astype(np.float32)
+
+
+class TestBatchedVad:
+    """批次 VAD 測試類"""
+
+    def test_batched_matches_sequential(self):
+        """測試多車道批次與單車道逐視窗執行的機率一致"""
+        audio = speech_like(70.0)
+        sequential = BatchedVad(lanes=1, session=RecurrentSession())(audio)
+
+        session = RecurrentSession()
+        batched = BatchedVad(lanes=8, warmup_frames=32, session=session)(audio)
+
+        assert len(batched) == -(-len(audio) // WINDOW_SIZE)
+        np.testing.assert_allclose(batched, sequential, atol=1e-5)
+        assert max(session.batch_sizes) == 8
+        assert session.calls < len(batched) / 7
+
+    def test_lane_plan_covers_all_frames(self):
+        """測試車道涵蓋全部視窗且不重疊輸出"""
+        plan = BatchedVad(lanes=16, warmup_frames=10, session=RecurrentSession()).lane_plan(5000)
+        assert plan[0] == (0, 0, plan[0][2])
+        assert plan[-1][2] == 5000
+        for (_, _, end), (begin, start, _) in zip(plan, plan[1:]):
+            assert start == end and begin == start - 10
+
+    def test_short_and_empty_audio(self):
+        """測試短於一個視窗與空輸入"""
+        vad = BatchedVad(session=RecurrentSession())
+        assert len(vad(np.zeros(0))) == 0
+        assert len(vad(np.zeros(100))) == 1
+
+    def test_probabilities_are_cached(self, tmp_path):
+        """測試相同音頻雜湊不重跑模型"""
+        audio = speech_like(3.0)
+        session = RecurrentSession()
+        vad = BatchedVad(session=session)
+        cache = VadProbabilityCache(str(tmp_path))
+
+        first = cached_speech_probabilities(audio, "hash", vad, cache)
+        calls = session.calls
+        second = cached_speech_probabilities(audio, "hash", vad, cache)
+
+        assert session.calls == calls
+        np.testing.assert_array_equal(first, second)
+
+    def test_split_session_matches_single_graph(self):
+        """測試 encoder/decoder 包裝後與單一圖的遞迴模型結果一致"""
+        audio = speech_like(20.0)
+        single = BatchedVad(lanes=4, session=RecurrentSession())(audio)
+        split = BatchedVad(lanes=4, session=SplitVadSession(EncoderSession(), DecoderSession()))(audio)
+        np.testing.assert_allclose(split, single, atol=1e-5)
+
+    @pytest.mark.parametrize("version, assets, expected", [
+        ("1.0.3", ["__init__.py", "silero_vad.onnx"], None),
+        ("1.1.1", ["__init__.py", "silero_decoder_v5.onnx", "silero_encoder_v5.onnx"],
+         "silero_encoder_v5.onnx"),
+    ])
+    def test_discovery_in_package_layout(self, tmp_path, monkeypatch, version, assets, expected):
+        """測試 faster-whisper 各版本附帶的模型：1.0.x 的 v4 不使用，1.1.x 找到 encoder/decoder"""
+        monkeypatch.delenv("SRT_GO_VAD_MODEL", raising=False)
+        monkeypatch.setitem(sys.modules, "faster_whisper", fake_faster_whisper(tmp_path, version, assets))
+        found = find_vad_model()
+        assert (Path(found).name if found else None) == expected
+        if expected:
+            assert onnx_vad.split_decoder_path(found) == str(Path(found).parent / "silero_decoder_v5.onnx")
+
+    def test_installed_package_model_loads(self):
+        """測試已安裝的 faster-whisper 附帶模型可直接建立 session 並輸出機率"""
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("faster_whisper")
+        model = find_vad_model()
+        assert model is not None
+        vad = BatchedVad(session=get_session(model, 1))
+        probabilities = vad(speech_like(2.0))
+        assert probabilities.shape == (-(-32000 // WINDOW_SIZE),)
+        assert np.all((probabilities >= 0) & (probabilities <= 1))
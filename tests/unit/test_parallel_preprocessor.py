@@ -0,0 +1,59 @@
+"""
+分塊平行預處理單元測試
+測試與串行路徑的數值一致性、交叉淡化權重與區塊規劃
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from fused_preprocessor import FusedPreprocessor
+from parallel_preprocessor import BlockTask, ParallelPreprocessor, crossfade_weights, plan_blocks
+
+
+class TestParallelPreprocessor:
+    """平行預處理測試類"""
+
+    @pytest.fixture
+    def audio(self):
+        rng = np.random.default_rng(0)
+        t = np.arange(16000 * 10) / 16000
+        return (np.sin(2 * np.pi * 440 * t) * (1 + 0.5 * np.sin(t)) + rng.normal(0, 0.3, len(t))).astype(np.float32)
+
+    @pytest.mark.parametrize("settings", [{"enable_denoise": False}, {}])
+    def test_matches_serial_path(self, audio, settings):
+        """測試平行處理與串行處理數值一致"""
+        preprocessor = FusedPreprocessor(**settings)
+        expected = preprocessor.process(audio)
+
+        with ParallelPreprocessor(preprocessor, workers=2, block_seconds=2.7) as parallel:
+            result = parallel.process(audio)
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected, atol=1e-5)
+
+    def test_single_worker_uses_serial_path(self, audio):
+        """測試 workers=1 時不建立行程池"""
+        parallel = ParallelPreprocessor(workers=1, block_seconds=1.0)
+        result = parallel.process(audio)
+        assert parallel._executor is None
+        np.testing.assert_array_equal(result, FusedPreprocessor().process(audio))
+
+    def test_crossfade_weights_sum_to_one(self):
+        """測試相鄰區塊的權重在重疊區相加為 1"""
+        length, half = 1000, 50
+        total = np.zeros(length)
+        for start, end in plan_blocks(length, 300, 2 * half):
+            task = BlockTask("", "", length, start, end, half, 0, 0, 16000, 1.0, None)
+            out_start, out_end = max(0, start - half), min(length, end + half)
+            total[out_start:out_end] += crossfade_weights(task, out_start, out_end)
+        np.testing.assert_allclose(total, 1.0, atol=1e-6)
+
+    def test_short_tail_block_is_merged(self):
+        """測試短於重疊長度的尾塊併入前一塊"""
+        assert plan_blocks(1050, 500, 100) == [(0, 500), (500, 1050)]
+        assert plan_blocks(1200, 500, 100) == [(0, 500), (500, 1000), (1000, 1200)]
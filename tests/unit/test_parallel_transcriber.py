@@ -0,0 +1,119 @@
+"""
+平行分段轉錄單元測試
+測試靜音切點、副本數選擇、確定性合併與切點影響量測
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from model_pool import ModelKey
+from parallel_transcriber import (ParallelChunkTranscriber, boundary_effects, choose_worker_count,
+                                  merge_chunks, split_at_silences, transcribe_chunk)
+
+SR = 16000
+
+
+class BurstModel:
+    """每個非零區段輸出一個段落，文字由振幅決定"""
+
+    def transcribe(self, audio, **kwargs):
+        active = np.abs(audio) > 0.01
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+        segments = []
+        for start, end in zip(edges[0::2], edges[1::2]):
+            text = f"word{int(round(audio[start] * 100))}"
+            segments.append(SimpleNamespace(start=start / SR, end=end / SR, text=text, avg_logprob=-0.1,
+                                            no_speech_prob=0.0, compression_ratio=1.0, words=[]))
+        return iter(segments), None
+
+
+def load_burst_model(key, num_workers=1):
+    return BurstModel()
+
+
+@pytest.fixture
+def long_audio():
+    regions = np.array([[t, t + 4.0] for t in np.arange(1.0, 60.0, 6.0)])
+    audio = np.zeros(SR * 62, dtype=np.float32)
+    for i, (start, end) in enumerate(regions):
+        audio[int(start * SR):int(end * SR)] = (i + 10) / 100
+    return audio, regions
+
+
+class TestParallelTranscriber:
+    """平行分段轉錄測試類"""
+
+    def test_split_at_silence_midpoints(self, long_audio):
+        """測試切點落在靜音中點且分段涵蓋全長"""
+        _, regions = long_audio
+        chunks = split_at_silences(regions, 62.0, chunk_seconds=20.0)
+
+        assert chunks[0][0] == 0.0 and chunks[-1][1] == 62.0
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            assert end == start
+            assert not np.any((regions[:, 0] < end) & (regions[:, 1] > end))
+        assert len(chunks) == 4
+
+    def test_worker_count_limited_by_memory(self, monkeypatch):
+        """測試副本數受記憶體預算與分段數限制"""
+        monkeypatch.setattr("parallel_transcriber.os.cpu_count", lambda: 32)
+        key = ModelKey("medium", "int8", "cpu", 1)
+        assert choose_worker_count(key, chunks=16, budget_mb=3000) == 2
+        assert choose_worker_count(key, chunks=1, budget_mb=100000) == 1
+        assert choose_worker_count(key, chunks=16, budget_mb=10) == 1
+        assert choose_worker_count(key._replace(cpu_threads=8), chunks=16, budget_mb=100000) == 4
+
+    @pytest.mark.parametrize("backend", ["thread", "process"])
+    def test_matches_sequential(self, long_audio, backend):
+        """測試平行結果與整段順序轉錄一致"""
+        audio, regions = long_audio
+        expected = transcribe_chunk(BurstModel(), audio, 0.0, len(audio) / SR, {})
+
+        key = ModelKey("tiny", "int8", "cpu", 1)
+        with ParallelChunkTranscriber(key, workers=2, backend=backend, chunk_seconds=20.0,
+                                      loader=load_burst_model) as transcriber:
+            result = transcriber.transcribe(audio, regions=regions)
+
+        assert [s["text"] for s in result] == [s["text"] for s in expected]
+        np.testing.assert_allclose([s["start"] for s in result], [s["start"] for s in expected], atol=1e-4)
+        assert transcriber.stats["chunks"] == 4
+
+        report = boundary_effects(expected, result, transcriber.stats["cuts"])
+        assert report["overall_similarity"] == 1.0
+        assert report["boundary_similarity"] == 1.0
+
+    def test_overlap_does_not_duplicate(self, long_audio):
+        """測試帶重疊的分段拼接後不產生重複段落"""
+        audio, regions = long_audio
+        expected = transcribe_chunk(BurstModel(), audio, 0.0, len(audio) / SR, {})
+
+        key = ModelKey("tiny", "int8", "cpu", 1)
+        with ParallelChunkTranscriber(key, workers=2, backend="thread", chunk_seconds=20.0,
+                                      loader=load_burst_model, overlap_seconds=1.0) as transcriber:
+            result = transcriber.transcribe(audio, regions=regions)
+
+        assert [s["text"] for s in result] == [s["text"] for s in expected]
+        assert transcriber.stats["overlap_seconds"] == 1.0
+
+    def test_merge_is_order_independent(self):
+        """測試合併結果與完成順序無關"""
+        a = {1: [{"start": 10.0, "end": 11.0, "text": "b"}], 0: [{"start": 1.0, "end": 2.0, "text": "a"}]}
+        b = {0: a[0], 1: a[1]}
+        assert merge_chunks(a) == merge_chunks(b)
+        assert [s["text"] for s in merge_chunks(a)] == ["a", "b"]
+
+    def test_boundary_effects_detects_differences(self):
+        """測試切點附近的差異只影響 boundary_similarity"""
+        reference = [{"start": 0.0, "end": 2.0, "text": "one two"},
+                     {"start": 29.0, "end": 31.0, "text": "three four"}]
+        candidate = [{"start": 0.0, "end": 2.0, "text": "one two"},
+                     {"start": 29.0, "end": 31.0, "text": "three"}]
+        report = boundary_effects(reference, candidate, cuts=[30.0], window=2.0)
+        assert report["interior_similarity"] == 1.0
+        assert report["boundary_similarity"] < 1.0
@@ -0,0 +1,68 @@
+"""
+多相重採樣器單元測試
+測試與 scipy 的一致性、串流分塊無接縫與濾波器組快取
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from polyphase_resampler import PolyphaseResampler, design_filter_bank, resample
+
+
+class TestPolyphaseResampler:
+    """多相重採樣器測試類"""
+
+    @pytest.mark.parametrize("sample_rate", [8000, 16000, 22050, 44100, 48000])
+    def test_matches_resample_poly(self, sample_rate):
+        """測試輸出長度與數值和 scipy.signal.resample_poly 一致"""
+        from scipy import signal
+
+        audio = np.random.default_rng(0).standard_normal(sample_rate).astype(np.float32)
+        g = math.gcd(sample_rate, 16000)
+        expected = signal.resample_poly(audio.astype(np.float64), 16000 // g, sample_rate // g)
+
+        resampled = resample(audio, sample_rate, 16000)
+
+        assert resampled.dtype == np.float32
+        assert len(resampled) == len(expected)
+        np.testing.assert_allclose(resampled, expected, atol=1e-5)
+
+    @pytest.mark.parametrize("block_size", [1, 997, 4410, 100_000])
+    def test_streaming_has_no_block_artifacts(self, block_size):
+        """測試任意區塊大小的串流輸出與一次處理一致"""
+        audio = np.sin(2 * np.pi * 440 * np.arange(44100) / 44100).astype(np.float32)
+        expected = resample(audio, 44100, 16000)
+
+        resampler = PolyphaseResampler(44100, 16000)
+        parts = [resampler.process(audio[i:i + block_size]) for i in range(0, len(audio), block_size)]
+        parts.append(resampler.flush())
+
+        np.testing.assert_allclose(np.concatenate(parts), expected, atol=1e-5)
+
+    def test_anti_aliasing(self):
+        """測試高於目標 Nyquist 的頻率被濾除"""
+        t = np.arange(48000) / 48000
+        audio = np.sin(2 * np.pi * 12000 * t).astype(np.float32)  # 16kHz 下會混疊
+        resampled = resample(audio, 48000, 16000)
+        assert np.sqrt(np.mean(resampled[1000:-1000] ** 2)) < 0.01
+
+    def test_filter_bank_is_cached(self):
+        """測試相同採樣率組合重用濾波器組"""
+        assert design_filter_bank(44100, 16000) is design_filter_bank(44100, 16000)
+        bank = design_filter_bank(44100, 16000)
+        assert (bank.up, bank.down) == (160, 441)
+        assert not bank.phases.flags.writeable
+
+    def test_resampler_is_reusable_after_flush(self):
+        """測試 flush 後可處理下一段音頻"""
+        audio = np.random.default_rng(1).standard_normal(22050).astype(np.float32)
+        resampler = PolyphaseResampler(22050, 16000)
+        first = np.concatenate([resampler.process(audio), resampler.flush()])
+        second = np.concatenate([resampler.process(audio), resampler.flush()])
+        np.testing.assert_array_equal(first, second)
@@ -0,0 +1,81 @@
+"""
+字幕段落串流單元測試
+測試逐段寫出、SEGMENT 事件與時間格式
+"""
+
+import io
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from segment_stream import (
+    SegmentStreamWriter, SegmentStreamer, emit_segment_event, format_timestamp
+)
+
+
+class TestSegmentStream:
+    """字幕段落串流測試類"""
+
+    def test_format_timestamp(self):
+        """測試 SRT 與 VTT 時間格式"""
+        assert format_timestamp(3723.456, "srt") == "01:02:03,456"
+        assert format_timestamp(3723.456, "vtt") == "01:02:03.456"
+        assert format_timestamp(-1, "srt") == "00:00:00,000"
+
+    def test_srt_is_readable_after_each_segment(self, tmp_path):
+        """測試每寫入一段後檔案即包含完整段落"""
+        output = tmp_path / "out.srt"
+        with SegmentStreamWriter(str(output), "srt") as writer:
+            writer.write_segment({"start": 0.0, "end": 1.5, "text": " Hello "})
+            assert output.read_text(encoding="utf-8") == "1\n00:00:00,000 --> 00:00:01,500\nHello\n\n"
+
+            writer.write_segment(SimpleNamespace(start=1.5, end=3.0, text="World"))
+            assert output.read_text(encoding="utf-8").endswith("2\n00:00:01,500 --> 00:00:03,000\nWorld\n\n")
+
+    def test_vtt_header_and_append(self, tmp_path):
+        """測試 VTT 標頭只寫一次，附加模式延續既有內容"""
+        output = tmp_path / "out.vtt"
+        with SegmentStreamWriter(str(output), "vtt") as writer:
+            writer.write_segment({"start": 0, "end": 1, "text": "a"})
+        with SegmentStreamWriter(str(output), "vtt", append=True) as writer:
+            writer.write_segment({"start": 1, "end": 2, "text": "b"})
+
+        content = output.read_text(encoding="utf-8")
+        assert content.count("WEBVTT") == 1
+        assert "00:00:01.000 --> 00:00:02.000\nb" in content
+
+    def test_unsupported_format(self, tmp_path):
+        """測試不支援的格式"""
+        with pytest.raises(ValueError):
+            SegmentStreamWriter(str(tmp_path / "out.txt"), "txt")
+
+    def test_streamer_emits_events_and_skips_filtered(self, tmp_path):
+        """測試串流器輸出 SEGMENT 事件並略過被過濾的段落"""
+        stream = io.StringIO()
+        writer = SegmentStreamWriter(str(tmp_path / "out.srt"))
+        streamer = SegmentStreamer(
+            writers=[writer],
+            source_file="lecture.mp4",
+            emit=lambda event: emit_segment_event(event, stream),
+            transform=lambda fields: None if fields["text"] == "skip" else fields,
+        )
+
+        segments = [{"start": 0, "end": 1, "text": "first"},
+                    {"start": 1, "end": 2, "text": "skip"},
+                    {"start": 2, "end": 3, "text": "second"}]
+        events = list(streamer.consume(iter(segments)))
+        streamer.close()
+
+        assert [e["text"] for e in events] == ["first", "second"]
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 2
+        assert lines[1].startswith("SEGMENT:")
+        assert json.loads(lines[1][len("SEGMENT:"):]) == {
+            "index": 2, "start": 2.0, "end": 3.0, "text": "second", "file": "lecture.mp4"
+        }
+        assert "2\n00:00:02,000 --> 00:00:03,000\nsecond" in (tmp_path / "out.srt").read_text(encoding="utf-8")
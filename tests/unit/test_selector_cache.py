@@ -0,0 +1,122 @@
+"""
+選擇器決策快取單元測試
+測試硬體指紋、決策持久化與指紋改變時的失效
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from selector_cache import (SelectorCache, default_model_dirs, fingerprint_digest, hardware_fingerprint,
+                            install_persistent_selector)
+
+
+class CountingSelector:
+    """記錄呼叫次數的假選擇器"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def select_optimal_config(self, preferences=None):
+        self.calls += 1
+        return {"device": "cpu", "compute_type": "int8"}, "CPU INT8"
+
+
+class TestSelectorCache:
+    """選擇器決策快取測試類"""
+
+    def test_fingerprint_fields(self, tmp_path):
+        """測試指紋包含硬體、套件版本與模型雜湊"""
+        model_dir = tmp_path / "small"
+        model_dir.mkdir()
+        (model_dir / "model.bin").write_bytes(b"weights")
+        fingerprint = hardware_fingerprint([str(tmp_path)], refresh=True)
+
+        assert fingerprint["cpu_count"] >= 1
+        assert set(fingerprint["packages"]) == {"ctranslate2", "onnxruntime", "faster-whisper"}
+        assert list(fingerprint["models"]) == ["small/model.bin"]
+        assert hardware_fingerprint([str(tmp_path)]) is fingerprint
+
+        (model_dir / "model.bin").write_bytes(b"retrained weights")
+        changed = hardware_fingerprint([str(tmp_path)], refresh=True)
+        assert fingerprint_digest(changed) != fingerprint_digest(fingerprint)
+
+    def test_default_dirs_include_huggingface_models(self, tmp_path, monkeypatch):
+        """測試未設定 SRT_GO_MODEL_DIR 時，指紋涵蓋 Hugging Face 快取中的 Whisper 模型"""
+        snapshot = tmp_path / "hub" / "models--Systran--faster-whisper-small" / "snapshots" / "abc123"
+        snapshot.mkdir(parents=True)
+        (snapshot / "model.bin").write_bytes(b"weights")
+        (tmp_path / "hub" / "models--bert-base-uncased").mkdir()
+        monkeypatch.delenv("SRT_GO_MODEL_DIR", raising=False)
+        monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+
+        dirs = default_model_dirs()
+        assert str(snapshot.parents[1]) in dirs
+        assert not any("bert" in d for d in dirs)
+        assert "abc123/model.bin" in hardware_fingerprint(refresh=True)["models"]
+
+    def test_non_json_decision_not_persisted(self, tmp_path):
+        """測試無法序列化的決策不會被轉成字串保存，既有決策不受影響"""
+        cache = SelectorCache(str(tmp_path), fingerprint=lambda: {"cpu_model": "test"})
+        cache.put({"a": 1}, {"compute_type": "int8"})
+        with pytest.raises(TypeError):
+            cache.put({"b": 1}, {"device": object()})
+
+        decision = {"device": object()}
+        assert cache.get_or_select({"c": 1}, lambda: decision) is decision
+        assert cache.get({"b": 1}) is None and cache.get({"c": 1}) is None
+        assert cache.get({"a": 1}) == {"compute_type": "int8"}
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_persisted_across_instances(self, tmp_path):
+        """測試決策寫入磁碟後由新實例讀取，tuple 結構保留"""
+        fingerprint = lambda: {"cpu_model": "test", "cpu_count": 8}
+        selector = CountingSelector()
+        first = SelectorCache(str(tmp_path), fingerprint=fingerprint)
+        first.get_or_select({"enable_gpu": False}, lambda: selector.select_optimal_config())
+
+        second = SelectorCache(str(tmp_path), fingerprint=fingerprint)
+        result = second.get_or_select({"enable_gpu": False}, lambda: selector.select_optimal_config())
+
+        assert result == ({"device": "cpu", "compute_type": "int8"}, "CPU INT8")
+        assert selector.calls == 1
+        assert second.hits == 1
+        assert second.get({"enable_gpu": True}) is None
+
+    def test_invalidated_when_fingerprint_changes(self, tmp_path):
+        """測試硬體或套件版本改變時重新選擇"""
+        state = {"packages": {"ctranslate2": "4.4.0"}}
+        cache = SelectorCache(str(tmp_path), fingerprint=lambda: dict(state))
+        cache.put({}, "old")
+        assert cache.get({}) == "old"
+
+        state["packages"] = {"ctranslate2": "4.5.0"}
+        assert cache.get({}) is None
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        """測試損壞的快取檔被移除"""
+        fingerprint = lambda: {"cpu_model": "test"}
+        path = tmp_path / f"{fingerprint_digest(fingerprint())}.json"
+        path.write_text("{broken", encoding="utf-8")
+        assert SelectorCache(str(tmp_path), fingerprint=fingerprint).get({}) is None
+        assert not path.exists()
+
+    def test_install_wraps_selector(self, tmp_path, monkeypatch):
+        """測試掛鉤後 get_intelligent_selector 的選擇器使用磁碟快取"""
+        selector = CountingSelector()
+        module = types.ModuleType("intelligent_model_selector")
+        module.get_intelligent_selector = lambda: selector
+        monkeypatch.setitem(sys.modules, "intelligent_model_selector", module)
+
+        cache = SelectorCache(str(tmp_path), fingerprint=lambda: {"cpu_model": "test"})
+        assert install_persistent_selector(cache) is cache
+        assert install_persistent_selector() is cache
+
+        for _ in range(3):
+            config, _ = module.get_intelligent_selector().select_optimal_config({})
+        assert config["compute_type"] == "int8"
+        assert selector.calls == 1
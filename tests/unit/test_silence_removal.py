@@ -0,0 +1,94 @@
+"""
+靜音移除單元測試
+測試 RMS 遲滯判斷、偏移表與時間戳映射
+"""
+
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from silence_removal import hysteresis, map_to_original, remap_segments, remove_silence
+
+# 與 faster-whisper 的 Segment/Word 相同欄位的 namedtuple
+Word = namedtuple("Word", ["start", "end", "word", "probability"])
+Segment = namedtuple("Segment", ["id", "seek", "start", "end", "text", "tokens", "avg_logprob",
+                                 "compression_ratio", "no_speech_prob", "words", "temperature"])
+
+
+class TestSilenceRemoval:
+    """靜音移除測試類"""
+
+    @pytest.fixture
+    def speech_silence_speech(self):
+        sr = 16000
+        speech = np.sin(2 * np.pi * 440 * np.arange(sr) / sr).astype(np.float32)
+        return np.concatenate([speech, np.zeros(2 * sr, dtype=np.float32), speech]), sr
+
+    def test_removes_long_silence(self, speech_silence_speech):
+        """測試移除中間的長靜音但保留兩側 padding"""
+        audio, sr = speech_silence_speech
+        trimmed, offset_map = remove_silence(audio, sr, threshold=0.01, padding=0.1)
+
+        assert len(trimmed) == pytest.approx(2.2 * sr, abs=sr * 0.02)
+        np.testing.assert_allclose(offset_map, [[0.0, 0.0], [1.1, 2.9]], atol=0.02)
+
+    def test_short_silence_is_kept(self):
+        """測試短於 min_silence 的停頓不移除"""
+        sr = 16000
+        tone = np.sin(2 * np.pi * 440 * np.arange(sr) / sr).astype(np.float32)
+        audio = np.concatenate([tone, np.zeros(sr // 4, dtype=np.float32), tone])
+        trimmed, offset_map = remove_silence(audio, sr, min_silence=0.5)
+        assert len(trimmed) == len(audio)
+        assert offset_map.tolist() == [[0.0, 0.0]]
+
+    def test_hysteresis(self):
+        """測試介於高低門檻之間的幀沿用前一個狀態"""
+        values = np.array([0.0, 0.05, 0.2, 0.05, 0.05, 0.001, 0.05])
+        assert hysteresis(values, high=0.1, low=0.01).tolist() == [False, False, True, True, True, False, False]
+
+    def test_map_times_back(self, speech_silence_speech):
+        """測試縮短後的時間映射回原始時間軸，且段落不跨越被移除的靜音"""
+        audio, sr = speech_silence_speech
+        _, offset_map = remove_silence(audio, sr, padding=0.1)
+        seam = offset_map[1, 0]
+
+        mapped = map_to_original([0.5, seam + 0.5], offset_map)
+        np.testing.assert_allclose(mapped, [0.5, offset_map[1, 1] + 0.5])
+
+        segments = remap_segments([
+            {"start": 0.2, "end": seam, "text": "a", "words": [{"start": 0.2, "end": seam, "word": "a"}]},
+            {"start": seam, "end": seam + 0.5, "text": "b"},
+        ], offset_map)
+        assert segments[0]["end"] == pytest.approx(seam)            # 前段結束於接縫之前
+        assert segments[1]["start"] == pytest.approx(offset_map[1, 1])  # 後段從靜音之後開始
+        assert segments[0]["words"][0]["end"] == pytest.approx(seam)
+
+    def test_edge_cases(self):
+        """測試空音頻與全靜音"""
+        trimmed, offset_map = remove_silence(np.zeros(0), 16000)
+        assert len(trimmed) == 0 and len(offset_map) == 0
+
+        trimmed, offset_map = remove_silence(np.zeros(16000 * 2), 16000)
+        assert len(trimmed) == 0
+        np.testing.assert_array_equal(map_to_original([1.0], offset_map), [1.0])
+
+    def test_remap_segment_objects_keeps_words(self):
+        """測試 Segment 物件保留詞級時間戳與信心欄位，且詞的時間同樣映射"""
+        offset_map = np.array([[0.0, 0.0], [1.0, 3.0]])
+        segment = Segment(0, 0, 0.5, 1.5, " hi there", [], -0.2, 1.3, 0.01,
+                          [Word(0.5, 0.9, " hi", 0.9), Word(1.1, 1.5, " there", 0.8)], 0.0)
+        plain = {"start": 1.6, "end": 1.8, "text": "x", "words": [{"start": 1.6, "end": 1.8, "word": "x"}]}
+
+        first, second = remap_segments([segment, plain], offset_map)
+
+        assert (first["start"], first["end"]) == (0.5, 3.5)
+        assert (first["avg_logprob"], first["no_speech_prob"]) == (-0.2, 0.01)
+        assert [(w["start"], w["end"], w["word"]) for w in first["words"]] == [(0.5, 0.9, " hi"),
+                                                                              (3.1, 3.5, " there")]
+        assert first["words"][1]["probability"] == 0.8
+        assert [(w["start"], w["end"]) for w in second["words"]] == [(3.6, 3.8)]
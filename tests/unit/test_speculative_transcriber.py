@@ -0,0 +1,139 @@
+"""
+推測式轉錄單元測試
+測試信心度界限、升級區間合併與大模型結果的替換
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from model_pool import ModelKey, ModelPool
+from speculative_transcriber import (EscalationBounds, SpeculativeTranscriber, escalation_spans,
+                                     open_speculative, replace_spans)
+
+SR = 16000
+
+
+class BurstModel:
+    """每個非零區段輸出一個段落；振幅低於 quiet 的段落回報低信心度"""
+
+    def __init__(self, name, quiet=0.0, language=None):
+        self.name = name
+        self.quiet = quiet
+        self.language = language
+        self.calls = 0
+        self.kwargs = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls += 1
+        self.kwargs.append(kwargs)
+        active = np.abs(audio) > 0.01
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+        segments = []
+        for start, end in zip(edges[0::2], edges[1::2]):
+            level = float(np.abs(audio[start]))
+            segments.append(SimpleNamespace(start=start / SR, end=end / SR, text=f"{self.name}{int(level * 100)}",
+                                            avg_logprob=-1.5 if level < self.quiet else -0.2,
+                                            no_speech_prob=0.0, compression_ratio=1.2, words=[]))
+        return iter(segments), SimpleNamespace(language=kwargs.get("language") or self.language)
+
+
+def burst_audio(levels):
+    audio = np.zeros(SR * (len(levels) * 3 + 1), dtype=np.float32)
+    for i, level in enumerate(levels):
+        audio[(i * 3 + 1) * SR:(i * 3 + 3) * SR] = level
+    return audio
+
+
+def segment(start, end, **fields):
+    return dict({"start": start, "end": end, "text": "x", "avg_logprob": -0.2,
+                 "no_speech_prob": 0.0, "compression_ratio": 1.2}, **fields)
+
+
+class TestSpeculativeTranscriber:
+    """推測式轉錄測試類"""
+
+    def test_bounds(self):
+        """測試三種界限各自觸發升級"""
+        bounds = EscalationBounds()
+        assert bounds.violations(segment(0, 1)) == []
+        assert bounds.violations(segment(0, 1, avg_logprob=-1.2)) == ["avg_logprob"]
+        assert bounds.violations(segment(0, 1, no_speech_prob=0.9)) == ["no_speech_prob"]
+        assert bounds.violations(segment(0, 1, compression_ratio=3.0)) == ["compression_ratio"]
+        custom = EscalationBounds.from_settings({"escalateMinLogprob": -0.1})
+        assert custom.violations(segment(0, 1)) == ["avg_logprob"]
+
+    def test_spans_are_padded_and_merged(self):
+        """測試升級區間加上邊界並合併相鄰區間"""
+        segments = [segment(1.0, 2.0, avg_logprob=-2.0), segment(2.5, 3.0, avg_logprob=-2.0),
+                    segment(5.0, 6.0), segment(9.0, 9.9, compression_ratio=5.0)]
+        spans = escalation_spans(segments, EscalationBounds(), duration=10.0, padding=0.2, merge_gap=1.0)
+        assert spans == [(0.8, 3.2), (8.8, 10.0)]
+
+    def test_replace_spans(self):
+        """測試只有升級區間內的草稿段落被取代"""
+        draft = [segment(1.0, 2.0, text="a"), segment(4.0, 5.0, text="b"), segment(7.0, 8.0, text="c")]
+        refined = [((3.8, 5.2), [segment(4.0, 5.0, text="B")])]
+        assert [s["text"] for s in replace_spans(draft, refined)] == ["a", "B", "c"]
+
+    def test_padding_stops_at_adjacent_segments(self):
+        """測試邊界不切入相鄰段落"""
+        segments = [segment(1.0, 2.0), segment(2.0, 3.0, avg_logprob=-2.0), segment(3.1, 4.0)]
+        spans = escalation_spans(segments, EscalationBounds(), duration=10.0, padding=0.2, merge_gap=0.0)
+        assert spans == [(2.0, 3.1)]
+
+    def test_edge_straddling_segment_neither_duplicated_nor_lost(self):
+        """測試跨越區間邊緣的草稿段落整段交給大模型，不重複也不遺失"""
+        draft = [segment(1.0, 2.4, text="a"), segment(2.0, 3.0, text="b", avg_logprob=-2.0),
+                 segment(5.0, 6.0, text="c")]
+        spans = escalation_spans(draft, EscalationBounds(), duration=10.0, padding=0.2, merge_gap=0.0)
+        assert spans == [(1.0, 3.2)]
+
+        refined = [(spans[0], [segment(1.0, 2.0, text="A"), segment(2.0, 3.0, text="B")])]
+        assert [s["text"] for s in replace_spans(draft, refined)] == ["A", "B", "c"]
+
+    def test_only_low_confidence_escalated(self):
+        """測試只有低信心度段落交給大模型，且回報升級比例"""
+        audio = burst_audio([0.5, 0.05, 0.5, 0.05])
+        draft = BurstModel("draft", quiet=0.1)
+        target = BurstModel("target")
+        transcriber = SpeculativeTranscriber(draft, lambda: target, padding=0.2)
+        result = transcriber.transcribe(audio)
+
+        assert [s["text"] for s in result] == ["draft50", "target5", "draft50", "target5"]
+        np.testing.assert_allclose([s["start"] for s in result], [1.0, 4.0, 7.0, 10.0], atol=1e-4)
+        assert target.calls == 2
+        assert transcriber.stats["escalated_segments"] == 2
+        assert transcriber.stats["reasons"] == {"avg_logprob": 2}
+        assert abs(transcriber.stats["escalated_fraction"] - 4.8 / 13.0) < 1e-6
+
+    def test_target_not_loaded_when_confident(self):
+        """測試沒有低信心度段落時不載入大模型"""
+        loads = []
+        transcriber = SpeculativeTranscriber(BurstModel("draft"), lambda: loads.append(1))
+        transcriber.transcribe(burst_audio([0.5, 0.5]))
+        assert loads == []
+        assert transcriber.stats["escalated_fraction"] == 0.0
+
+    def test_models_from_pool(self):
+        """測試兩個模型經由模型池載入並常駐"""
+        pool = ModelPool(budget_mb=100000)
+        draft_key = ModelKey("small", "int8", "cpu", 0)
+        target_key = ModelKey("large", "int8", "cpu", 0)
+        transcriber = open_speculative(draft_key, target_key, pool,
+                                       loader=lambda key: BurstModel(key.model_size, quiet=0.1))
+        transcriber.transcribe(burst_audio([0.05]))
+        assert draft_key in pool and target_key in pool
+
+    def test_refine_uses_draft_language(self):
+        """測試自動偵測語言時，升級區間沿用草稿偵測到的語言"""
+        target = BurstModel("large", language="en")
+        transcriber = SpeculativeTranscriber(BurstModel("tiny", quiet=0.3, language="ja"), lambda: target)
+        transcriber.transcribe(burst_audio([0.5, 0.2]), language=None, word_timestamps=True)
+
+        assert target.kwargs == [{"language": "ja", "word_timestamps": True}]
+        assert transcriber.stats["language"] == "ja"
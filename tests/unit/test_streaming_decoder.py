@@ -0,0 +1,59 @@
+"""
+串流音頻解碼單元測試
+測試區塊重組與時間偏移
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from streaming_decoder import BlockBuffer
+
+
+class TestBlockBuffer:
+    """區塊重組測試類"""
+
+    def test_irregular_frames_become_fixed_blocks(self):
+        """測試不規則長度的幀被切成固定長度區塊，內容與順序不變"""
+        rng = np.random.default_rng(0)
+        signal = rng.standard_normal(10_000).astype(np.float32)
+        buffer = BlockBuffer(block_size=1600, sample_rate=16000)
+
+        blocks = []
+        position = 0
+        for frame_size in rng.integers(1, 900, size=100):
+            frame = signal[position:position + frame_size]
+            position += frame_size
+            blocks.extend(buffer.push(frame))
+            if position >= len(signal):
+                break
+        blocks.extend(buffer.push(signal[position:]))
+        blocks.extend(buffer.flush())
+
+        assert all(len(b.samples) == 1600 for b in blocks[:-1])
+        np.testing.assert_array_equal(np.concatenate([b.samples for b in blocks]), signal)
+        assert [b.offset for b in blocks[:3]] == [0.0, 0.1, 0.2]
+        assert blocks[-1].duration == pytest.approx((10_000 % 1600) / 16000)
+
+    def test_blocks_are_independent_copies(self):
+        """測試輸出區塊不會被後續寫入覆蓋"""
+        buffer = BlockBuffer(block_size=4)
+        first = list(buffer.push(np.ones(4)))[0]
+        list(buffer.push(np.zeros(4)))
+        assert np.all(first.samples == 1.0)
+        assert first.samples.dtype == np.float32
+
+    def test_multichannel_input_is_flattened(self):
+        """測試 (1, N) 形狀的幀 (PyAV 單聲道輸出) 被攤平"""
+        buffer = BlockBuffer(block_size=3)
+        blocks = list(buffer.push(np.arange(6, dtype=np.float32).reshape(1, 6)))
+        assert [b.samples.tolist() for b in blocks] == [[0, 1, 2], [3, 4, 5]]
+
+    def test_invalid_block_size(self):
+        """測試無效區塊大小"""
+        with pytest.raises(ValueError):
+            BlockBuffer(block_size=0)
@@ -0,0 +1,83 @@
+"""
+串流降噪單元測試
+測試逐區塊降噪效果、固定狀態大小與噪音輪廓的保存與沿用
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from streaming_denoiser import NoiseProfile, NoiseProfileStore, StreamingDenoiser, open_denoiser
+
+
+def calculate_snr(signal, noise):
+    return 10 * np.log10(np.mean(signal ** 2) / np.mean(noise ** 2))
+
+
+class TestStreamingDenoiser:
+    """串流降噪測試類"""
+
+    @pytest.fixture
+    def noisy_speech(self):
+        """間歇的「語音」(正弦波，2 秒有、2 秒無) 加上穩定白噪音"""
+        sr = 16000
+        t = np.arange(sr * 8) / sr
+        gate = (np.sin(2 * np.pi * 0.25 * t) > 0).astype(np.float64)
+        clean = gate * np.sin(2 * np.pi * 440 * t) * 0.5
+        noise = np.random.default_rng(0).normal(0, 0.1, len(t))
+        return clean, (clean + noise).astype(np.float32)
+
+    @pytest.mark.parametrize("block_size", [333, 16000])
+    def test_block_streaming_improves_snr(self, noisy_speech, block_size):
+        """測試任意區塊大小的串流輸出長度正確且提升信噪比"""
+        clean, noisy = noisy_speech
+        denoiser = StreamingDenoiser()
+        parts = [denoiser.process(noisy[i:i + block_size]) for i in range(0, len(noisy), block_size)]
+        output = np.concatenate(parts + [denoiser.flush()])
+
+        assert len(output) == len(noisy)
+        assert calculate_snr(clean, output - clean) > calculate_snr(clean, noisy - clean) + 3.0
+        assert denoiser.gain.noise_frames > 0 and denoiser.gain.speech_frames > 0
+
+    def test_state_is_constant_size(self, noisy_speech):
+        """測試串流狀態不隨輸入長度增加"""
+        _, noisy = noisy_speech
+        denoiser = StreamingDenoiser()
+        for i in range(0, len(noisy), 1000):
+            denoiser.process(noisy[i:i + 1000])
+            assert len(denoiser.stft._carry) == 256
+            assert len(denoiser.stft._remainder) < 256
+
+    def test_profile_persisted_and_reused(self, tmp_path, noisy_speech):
+        """測試相同 noiseProfileKey 的檔案沿用已保存的噪音輪廓"""
+        _, noisy = noisy_speech
+        settings = {"noiseProfileKey": "room-101", "noiseProfileDir": str(tmp_path)}
+
+        first = open_denoiser(settings)
+        assert not first.profile_reused
+        first.denoise(noisy)
+        assert first.save_profile() is not None
+
+        second = open_denoiser(settings)
+        assert second.profile_reused
+        np.testing.assert_allclose(second.profile.power, first.profile.power)
+
+        # 不同錄音環境或不同幀長不沿用
+        assert not open_denoiser({**settings, "noiseProfileKey": "room-202"}).profile_reused
+        assert not open_denoiser({**settings, "denoiseFrameSize": 1024}).profile_reused
+
+    def test_mismatched_profile_is_ignored(self):
+        """測試採樣率不符的輪廓會被忽略並重新估計"""
+        profile = NoiseProfile(8000, 512, np.ones(257))
+        denoiser = StreamingDenoiser(sample_rate=16000, profile=profile)
+        assert denoiser.profile is None
+
+    def test_store_ignores_corrupt_file(self, tmp_path):
+        """測試損壞的輪廓檔案不會中斷處理"""
+        store = NoiseProfileStore(str(tmp_path))
+        store._path("room", 16000, 512).write_bytes(b"garbage")
+        assert store.load("room", 16000, 512) is None
@@ -0,0 +1,93 @@
+"""
+轉錄結果快取單元測試
+測試快取鍵、序列化與命中行為
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from audio_cache import fast_content_hash
+from transcription_cache import TranscriptionCache, decode_settings
+
+SETTINGS = {"model": "large", "language": "auto", "vad_threshold": 0.35,
+            "enablePureVoiceMode": True, "outputFormat": "srt", "customDir": "/out"}
+
+
+def make_segment(start, end, text):
+    words = [SimpleNamespace(start=start, end=end, word=text, probability=0.9)]
+    return SimpleNamespace(start=start, end=end, text=text, avg_logprob=-0.2,
+                           no_speech_prob=0.01, compression_ratio=1.3, words=words)
+
+
+class TestTranscriptionCache:
+    """轉錄結果快取測試類"""
+
+    def test_decode_settings_ignore_output_options(self):
+        """測試輸出格式與目錄不屬於解碼設定，選擇器決策會覆寫"""
+        selected = decode_settings(SETTINGS, {"compute_type": "int8", "device": "cpu"})
+        assert "outputFormat" not in selected
+        assert "customDir" not in selected
+        assert selected["vad_threshold"] == 0.35
+        assert selected["compute_type"] == "int8"
+
+    def test_reexport_hits_cache(self, tmp_path):
+        """測試只改輸出格式時命中快取，不重新推理"""
+        cache = TranscriptionCache(str(tmp_path / "cache"))
+        source = tmp_path / "a.wav"
+        source.write_bytes(b"audio")
+        calls = []
+
+        def transcribe():
+            calls.append(1)
+            return [make_segment(0.0, 1.0, "hello")], {"language": "en"}
+
+        first, info = cache.get_or_transcribe(str(source), SETTINGS, transcribe)
+        second, info2 = cache.get_or_transcribe(str(source), {**SETTINGS, "outputFormat": "vtt"}, transcribe)
+
+        assert len(calls) == 1
+        assert first == second
+        assert info2 == {"language": "en"}
+        assert second[0]["words"][0] == {"start": 0.0, "end": 1.0, "word": "hello", "probability": 0.9}
+
+    def test_decode_changes_miss_cache(self, tmp_path):
+        """測試模型、VAD 參數或純人聲模式改變時不命中"""
+        cache = TranscriptionCache(str(tmp_path / "cache"))
+        cache.put("hash", SETTINGS, [make_segment(0.0, 1.0, "hi")])
+
+        assert cache.get("hash", SETTINGS) is not None
+        assert cache.get("hash", {**SETTINGS, "model": "medium"}) is None
+        assert cache.get("hash", {**SETTINGS, "vad_threshold": 0.1}) is None
+        assert cache.get("hash", {**SETTINGS, "enablePureVoiceMode": False}) is None
+        assert cache.get("other", SETTINGS) is None
+
+    def test_device_and_precision_are_part_of_key(self, tmp_path):
+        """測試 CPU int8 的結果不會提供給 GPU float16 的請求"""
+        cache = TranscriptionCache(str(tmp_path / "cache"))
+        cpu_settings = {**SETTINGS, "enable_gpu": False}
+        cache.put("hash", cpu_settings, [make_segment(0.0, 1.0, "hi")],
+                  model_config={"device": "cpu", "compute_type": "int8"})
+
+        assert cache.get("hash", cpu_settings, {"device": "cpu", "compute_type": "int8"}) is not None
+        assert cache.get("hash", {**SETTINGS, "enable_gpu": True}, {"device": "cpu", "compute_type": "int8"}) is None
+        assert cache.get("hash", cpu_settings, {"device": "cuda", "compute_type": "float16"}) is None
+        assert cache.get("hash", {**cpu_settings, "computeType": "float32"},
+                         {"device": "cpu", "compute_type": "int8"}) is None
+        assert cache.get("hash", {**cpu_settings, "cpuThreads": 8},
+                         {"device": "cpu", "compute_type": "int8"}) is None
+
+    def test_unserializable_info_does_not_fail_transcription(self, tmp_path):
+        """測試 info 含無法序列化的值時，快取寫入失敗但轉錄結果照常返回"""
+        cache = TranscriptionCache(str(tmp_path / "cache"))
+        source = tmp_path / "a.wav"
+        source.write_bytes(b"audio")
+
+        segments, info = cache.get_or_transcribe(
+            str(source), SETTINGS, lambda: ([make_segment(0.0, 1.0, "hi")], {"options": object()}))
+
+        assert segments[0]["text"] == "hi"
+        assert "options" in info
+        assert cache.get(fast_content_hash(str(source)), SETTINGS) is None
+        assert not list((tmp_path / "cache").glob("*.tmp"))
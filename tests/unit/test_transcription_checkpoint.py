@@ -0,0 +1,86 @@
+"""
+轉錄檢查點單元測試
+測試保存、續傳條件與串流整合
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from transcription_checkpoint import CheckpointStore, Checkpointer, open_checkpointer, settings_hash
+from segment_stream import SegmentStreamWriter, SegmentStreamer
+
+
+class TestTranscriptionCheckpoint:
+    """轉錄檢查點測試類"""
+
+    def make_source(self, tmp_path):
+        source = tmp_path / "lecture.wav"
+        source.write_bytes(b"RIFF" + b"\0" * 100)
+        return str(source)
+
+    def test_settings_hash_ignores_output_options(self):
+        """測試輸出格式不影響設定雜湊，模型設定會影響"""
+        base = {"model": "large", "language": "auto", "outputFormat": "srt"}
+        assert settings_hash(base) == settings_hash({**base, "outputFormat": "vtt", "customDir": "/x"})
+        assert settings_hash(base) != settings_hash({**base, "model": "medium"})
+
+    def test_resume_from_saved_checkpoint(self, tmp_path):
+        """測試相同檔案與設定時從檢查點續傳"""
+        source = self.make_source(tmp_path)
+        settings = {"model": "large", "checkpointDir": str(tmp_path / "ckpt"), "checkpointInterval": 0}
+
+        checkpointer = open_checkpointer(source, settings)
+        assert not checkpointer.resumed
+        checkpointer.set_language("zh")
+        checkpointer.record({"start": 0.0, "end": 4.2, "text": "第一段"})
+        checkpointer.record({"start": 4.2, "end": 9.5, "text": "第二段"})
+
+        resumed = open_checkpointer(source, settings)
+        assert resumed.resumed
+        assert len(resumed.segments) == 2
+        assert resumed.checkpoint.transcribe_kwargs() == {"clip_timestamps": [9.5], "language": "zh"}
+
+        resumed.complete()
+        assert not open_checkpointer(source, settings).resumed
+
+    def test_changed_settings_or_file_do_not_resume(self, tmp_path):
+        """測試設定或檔案改變時不續傳"""
+        source = self.make_source(tmp_path)
+        store = CheckpointStore(str(tmp_path / "ckpt"))
+        checkpointer = Checkpointer(store, source, {"model": "large"}, interval=0)
+        checkpointer.record({"start": 0.0, "end": 1.0, "text": "a"})
+
+        assert store.load(source, {"model": "medium"}) is None
+
+        with open(source, "ab") as f:
+            f.write(b"more data")
+        os.utime(source, ns=(1, 1))
+        assert store.load(source, {"model": "large"}) is None
+
+    def test_no_checkpoint_dir_disables_checkpointing(self, tmp_path):
+        """測試未設定 checkpointDir 時不建立檢查點"""
+        assert open_checkpointer(self.make_source(tmp_path), {"model": "large"}) is None
+
+    def test_streamer_replays_checkpoint(self, tmp_path):
+        """測試續傳時字幕檔包含檢查點段落與新段落"""
+        source = self.make_source(tmp_path)
+        settings = {"model": "large", "checkpointDir": str(tmp_path / "ckpt"), "checkpointInterval": 0}
+        output = tmp_path / "out.srt"
+
+        first = SegmentStreamer([SegmentStreamWriter(str(output))], emit=lambda e: None,
+                                checkpointer=open_checkpointer(source, settings))
+        first.push({"start": 0.0, "end": 2.0, "text": "before crash"})
+        first.close()
+
+        second = SegmentStreamer([SegmentStreamWriter(str(output))], emit=lambda e: None,
+                                 checkpointer=open_checkpointer(source, settings))
+        second.replay_checkpoint()
+        second.push({"start": 2.0, "end": 3.0, "text": "after resume"})
+        second.close()
+
+        content = output.read_text(encoding="utf-8")
+        assert content.count("before crash") == 1
+        assert "2\n00:00:02,000 --> 00:00:03,000\nafter resume" in content
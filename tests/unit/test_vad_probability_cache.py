@@ -0,0 +1,75 @@
+"""
+VAD 機率快取單元測試
+測試快取讀寫、門檻重新套用與門檻掃描
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from vad_probability_cache import VadProbabilityCache, speech_ratio, speech_regions, sweep_thresholds
+
+FRAME = 0.032
+
+
+class TestVadProbabilityCache:
+    """VAD 機率快取測試類"""
+
+    @pytest.fixture
+    def probabilities(self):
+        # 1 秒靜音、2 秒高機率語音、1 秒中等機率、1 秒靜音
+        return np.concatenate([np.full(31, 0.05), np.full(63, 0.9), np.full(31, 0.3), np.full(31, 0.02)]).astype(np.float32)
+
+    def test_get_or_compute_runs_model_once(self, tmp_path, probabilities):
+        """測試相同音頻雜湊只執行一次 VAD 模型"""
+        cache = VadProbabilityCache(str(tmp_path))
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return probabilities
+
+        first = cache.get_or_compute("hash-a", compute)
+        second = cache.get_or_compute("hash-a", compute)
+
+        assert len(calls) == 1
+        np.testing.assert_array_equal(first, second)
+        assert cache.hits == 1
+        assert cache.get("hash-a", detector="other") is None
+
+    def test_threshold_changes_regions(self, probabilities):
+        """測試不同門檻與遲滯的語音區間"""
+        strict = speech_regions(probabilities, FRAME, threshold=0.5, neg_threshold=0.35, speech_pad_ms=0)
+        loose = speech_regions(probabilities, FRAME, threshold=0.25, speech_pad_ms=0)
+
+        np.testing.assert_allclose(strict, [[31 * FRAME, 94 * FRAME]])
+        np.testing.assert_allclose(loose, [[31 * FRAME, 125 * FRAME]])
+
+    def test_min_durations(self):
+        """測試短停頓合併與短語音捨棄"""
+        probabilities = np.zeros(100, dtype=np.float32)
+        probabilities[10:30] = 0.9
+        probabilities[32:50] = 0.9      # 64ms 停頓，應合併
+        probabilities[80:83] = 0.9      # 96ms 語音，應捨棄
+        regions = speech_regions(probabilities, FRAME, threshold=0.5, min_silence_duration_ms=100,
+                                 min_speech_duration_ms=250, speech_pad_ms=0)
+        np.testing.assert_allclose(regions, [[10 * FRAME, 50 * FRAME]])
+
+    def test_sweep_thresholds(self, probabilities):
+        """測試一次掃描多個門檻，語音比例隨門檻單調不增"""
+        results = sweep_thresholds(probabilities, [0.1, 0.25, 0.5, 0.95], FRAME)
+        ratios = [r["speech_ratio"] for r in results]
+
+        assert [r["threshold"] for r in results] == [0.1, 0.25, 0.5, 0.95]
+        assert ratios == sorted(ratios, reverse=True)
+        assert ratios[-1] == 0.0 and results[-1]["regions"] == 0
+        assert ratios[2] == pytest.approx(speech_ratio(probabilities, FRAME, threshold=0.5))
+
+    def test_empty_probabilities(self):
+        """測試空輸入"""
+        assert speech_regions(np.zeros(0), FRAME).shape == (0, 2)
+        assert sweep_thresholds(np.zeros(0), [0.5])[0]["speech_ratio"] == 0.0
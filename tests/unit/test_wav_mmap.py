@@ -0,0 +1,94 @@
+"""
+WAV 記憶體映射單元測試
+測試 RIFF 標頭解析、memory-map 讀取與串流解碼快速路徑
+"""
+
+import struct
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 導入測試模組
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "srt_whisper_lite" / "electron-react-app" / "python"))
+from wav_mmap import read_wav_header, is_fast_path_wav, open_pcm_wav, to_float32
+from streaming_decoder import decode_to_array, iter_audio_blocks, probe_duration
+
+
+def write_wav(path, samples, sample_rate=16000, channels=1):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return str(path)
+
+
+class TestWavMmap:
+    """WAV 記憶體映射測試類"""
+
+    @pytest.fixture
+    def pcm_samples(self):
+        rng = np.random.default_rng(1)
+        return rng.integers(-32768, 32767, size=40_000).astype(np.int16)
+
+    def test_header_and_memmap(self, tmp_path, pcm_samples):
+        """測試標頭資訊正確且 memory-map 內容與原始樣本一致"""
+        path = write_wav(tmp_path / "a.wav", pcm_samples)
+        info = read_wav_header(path)
+
+        assert info.sample_rate == 16000
+        assert info.channels == 1
+        assert info.frames == len(pcm_samples)
+        assert info.duration == pytest.approx(2.5)
+        assert is_fast_path_wav(info)
+
+        mapped = open_pcm_wav(path, info)
+        assert isinstance(mapped, np.memmap)
+        np.testing.assert_array_equal(mapped[:, 0], pcm_samples)
+
+    def test_extra_chunks_and_extensible_format(self, tmp_path):
+        """測試略過 LIST 區塊並支援 WAVE_FORMAT_EXTENSIBLE"""
+        samples = np.arange(100, dtype="<i2")
+        fmt = struct.pack("<HHIIHHHHI", 0xFFFE, 1, 16000, 32000, 2, 16, 22, 16, 4)
+        fmt += struct.pack("<H", 1) + b"\x00" * 14  # 子格式 PCM GUID
+        chunks = (b"fmt " + struct.pack("<I", len(fmt)) + fmt
+                  + b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+                  + b"data" + struct.pack("<I", samples.nbytes) + samples.tobytes())
+        path = tmp_path / "ext.wav"
+        path.write_bytes(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+        info = read_wav_header(str(path))
+        assert info.format_tag == 1
+        np.testing.assert_array_equal(open_pcm_wav(str(path), info)[:, 0], samples)
+
+    def test_non_matching_files_skip_fast_path(self, tmp_path, pcm_samples):
+        """測試立體聲、其他採樣率與非 WAV 檔案不走快速路徑"""
+        stereo = write_wav(tmp_path / "stereo.wav", pcm_samples, channels=2)
+        resample = write_wav(tmp_path / "44k.wav", pcm_samples, sample_rate=44100)
+        other = tmp_path / "fake.wav"
+        other.write_bytes(b"not a riff file")
+
+        assert not is_fast_path_wav(read_wav_header(stereo))
+        assert not is_fast_path_wav(read_wav_header(resample))
+        assert read_wav_header(str(other)) is None
+
+    def test_to_float32_range(self):
+        """測試 PCM 轉 float32 的範圍"""
+        converted = to_float32(np.array([-32768, 0, 16384], dtype=np.int16))
+        assert converted.dtype == np.float32
+        np.testing.assert_allclose(converted, [-1.0, 0.0, 0.5])
+
+    def test_streaming_decoder_uses_fast_path(self, tmp_path, pcm_samples):
+        """測試串流解碼器對 16kHz 單聲道 WAV 不需 PyAV 即可輸出區塊"""
+        path = write_wav(tmp_path / "fast.wav", pcm_samples)
+
+        blocks = list(iter_audio_blocks(path, block_seconds=1.0))
+        expected = to_float32(pcm_samples)
+
+        assert [b.offset for b in blocks] == [0.0, 1.0, 2.0]
+        np.testing.assert_array_equal(np.concatenate([b.samples for b in blocks]), expected)
+        np.testing.assert_array_equal(decode_to_array(path), expected)
+        assert probe_duration(path) == pytest.approx(2.5)